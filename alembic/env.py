@@ -7,7 +7,8 @@ import os
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from app.models import Base
+from app.database import Base
+import app.models  # noqa: F401 - register models on Base.metadata
 from app.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,36 @@
+"""Add (name, id) index for keyset pagination
+
+Revision ID: 002_product_keyset_index
+Revises: 001_initial
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_product_keyset_index'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build concurrently so a live products table is not write-locked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_products_name_id',
+            'products',
+            ['name', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_products_name_id',
+            table_name='products',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,54 @@
+"""Add pg_trgm GIN indexes for substring filters
+
+Revision ID: 003_product_trigram_indexes
+Revises: 002_product_keyset_index
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_product_trigram_indexes'
+down_revision = '002_product_keyset_index'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ['sku', 'name', 'category', 'brand']
+
+
+def upgrade() -> None:
+    # Trigram indexes are PostgreSQL-only; other backends keep plain scans
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if not available:
+        print("pg_trgm is not available on this server; skipping trigram indexes")
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'idx_products_{column}_trgm',
+                'products',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_COLUMNS:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS idx_products_{column}_trgm')
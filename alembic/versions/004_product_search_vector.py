@@ -0,0 +1,89 @@
+"""Add trigger-maintained search_vector column for full-text product search
+
+Revision ID: 004_product_search_vector
+Revises: 003_product_trigram_indexes
+Create Date: 2026-10-19 11:00:00.000000
+
+A STORED generated column would rewrite the products table under an
+exclusive lock, so search_vector is a plain column kept current by a
+trigger on every insert and update (including bulk imports), with existing
+rows backfilled in batches.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_product_search_vector'
+down_revision = '003_product_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+# Rows per backfill UPDATE; each batch commits on its own so row locks stay short
+BACKFILL_BATCH_SIZE = 10000
+
+# {row} is the trigger's NEW. prefix, or empty in the backfill
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}brand, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}category, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce({row}description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # Every step is idempotent, so an interrupted migration can be rerun
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector')
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION products_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute('DROP TRIGGER IF EXISTS products_search_vector ON products')
+        op.execute("""
+            CREATE TRIGGER products_search_vector
+            BEFORE INSERT OR UPDATE OF name, brand, category, description ON products
+            FOR EACH ROW EXECUTE FUNCTION products_search_vector()
+        """)
+
+        # Rows written from here on are maintained by the trigger; backfill the
+        # rest in primary key ranges
+        max_id = bind.execute(sa.text('SELECT max(id) FROM products')).scalar() or 0
+        for low in range(0, max_id, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    f"UPDATE products SET search_vector = {SEARCH_VECTOR_SQL.format(row='')} "
+                    f"WHERE id > :low AND id <= :high AND search_vector IS NULL"
+                ),
+                {'low': low, 'high': low + BACKFILL_BATCH_SIZE}
+            )
+
+        # A failed concurrent build leaves an invalid index behind; start over
+        invalid = bind.execute(sa.text("""
+            SELECT 1 FROM pg_index
+            WHERE indexrelid = to_regclass('idx_products_search_vector') AND NOT indisvalid
+        """)).scalar()
+        if invalid:
+            op.execute('DROP INDEX CONCURRENTLY idx_products_search_vector')
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_search_vector '
+            'ON products USING gin (search_vector)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_products_search_vector')
+        op.execute('DROP TRIGGER IF EXISTS products_search_vector ON products')
+        op.execute('DROP FUNCTION IF EXISTS products_search_vector()')
+        op.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
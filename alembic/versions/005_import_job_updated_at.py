@@ -0,0 +1,28 @@
+"""Add updated_at to import_jobs for conditional GETs
+
+Revision ID: 005_import_job_updated_at
+Revises: 004_product_search_vector
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_import_job_updated_at'
+down_revision = '004_product_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'import_jobs',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True)
+    )
+    # Best guess at the last change for existing jobs
+    op.execute("UPDATE import_jobs SET updated_at = COALESCE(completed_at, started_at, created_at)")
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'updated_at')
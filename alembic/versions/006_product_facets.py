@@ -0,0 +1,68 @@
+"""Add product facet rollup, delta and state tables
+
+Revision ID: 006_product_facets
+Revises: 005_import_job_updated_at
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_product_facets'
+down_revision = '005_import_job_updated_at'
+branch_labels = None
+depends_on = None
+
+# Keep in sync with app.facets.PRICE_BUCKET_EDGES
+PRICE_BUCKET_EDGES = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'product_facet_counts',
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('brand', sa.String(length=100), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('price_bucket', sa.Integer(), nullable=False),
+        sa.Column('product_count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('category', 'brand', 'is_active', 'price_bucket')
+    )
+    op.create_table(
+        'product_facet_deltas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('brand', sa.String(length=100), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('price_bucket', sa.Integer(), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_facet_deltas_created_at', 'product_facet_deltas', ['created_at'], unique=False)
+    op.create_table(
+        'product_facet_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('folded_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Initial rollup from the existing catalog
+    whens = " ".join(
+        f"WHEN price < {edge} THEN {index}" for index, edge in enumerate(PRICE_BUCKET_EDGES[1:])
+    )
+    bucket = f"CASE WHEN price IS NULL THEN -1 {whens} ELSE {len(PRICE_BUCKET_EDGES) - 1} END"
+    op.execute(f"""
+        INSERT INTO product_facet_counts (category, brand, is_active, price_bucket, product_count)
+        SELECT COALESCE(category, ''), COALESCE(brand, ''), is_active, {bucket}, count(*)
+        FROM products
+        GROUP BY 1, 2, 3, 4
+    """)
+    op.execute("INSERT INTO product_facet_state (id, folded_at) VALUES (1, now())")
+
+
+def downgrade() -> None:
+    op.drop_table('product_facet_state')
+    op.drop_index('ix_product_facet_deltas_created_at', table_name='product_facet_deltas')
+    op.drop_table('product_facet_deltas')
+    op.drop_table('product_facet_counts')
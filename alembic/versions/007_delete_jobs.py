@@ -0,0 +1,45 @@
+"""Add delete_jobs for chunked background product deletes
+
+Revision ID: 007_delete_jobs
+Revises: 006_product_facets
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_delete_jobs'
+down_revision = '006_product_facets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'delete_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.String(length=255), nullable=False),
+        sa.Column('filters', sa.JSON(), nullable=False),
+        sa.Column('max_product_id', sa.Integer(), nullable=True),
+        sa.Column('total_records', sa.Integer(), nullable=True),
+        sa.Column('deleted_records', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('progress_percentage', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_delete_jobs_id'), 'delete_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_delete_jobs_task_id'), 'delete_jobs', ['task_id'], unique=True)
+    op.create_index(op.f('ix_delete_jobs_status'), 'delete_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_delete_jobs_status'), table_name='delete_jobs')
+    op.drop_index(op.f('ix_delete_jobs_task_id'), table_name='delete_jobs')
+    op.drop_index(op.f('ix_delete_jobs_id'), table_name='delete_jobs')
+    op.drop_table('delete_jobs')
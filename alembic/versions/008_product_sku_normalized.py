@@ -0,0 +1,113 @@
+"""Add products.sku_normalized with a unique index for case-insensitive upserts
+
+Revision ID: 008_product_sku_normalized
+Revises: 007_delete_jobs
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_product_sku_normalized'
+down_revision = '007_delete_jobs'
+branch_labels = None
+depends_on = None
+
+# Rows per backfill UPDATE; each batch commits on its own so row locks stay short
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # A STORED generated column would rewrite the table under an exclusive
+    # lock, so add a plain column and let a trigger keep it current instead.
+    # Every step is idempotent: if the duplicate check below fails, fix the
+    # data and rerun the migration.
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE products ADD COLUMN IF NOT EXISTS sku_normalized VARCHAR(100)')
+        op.execute("""
+            CREATE OR REPLACE FUNCTION products_sku_normalized() RETURNS trigger AS $$
+            BEGIN
+                NEW.sku_normalized := lower(NEW.sku);
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute('DROP TRIGGER IF EXISTS products_sku_normalized ON products')
+        op.execute("""
+            CREATE TRIGGER products_sku_normalized
+            BEFORE INSERT OR UPDATE OF sku ON products
+            FOR EACH ROW EXECUTE FUNCTION products_sku_normalized()
+        """)
+
+        # Rows written from here on are maintained by the trigger; backfill the
+        # rest in primary key ranges
+        max_id = bind.execute(sa.text('SELECT max(id) FROM products')).scalar() or 0
+        for low in range(0, max_id, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    'UPDATE products SET sku_normalized = lower(sku) '
+                    'WHERE id > :low AND id <= :high AND sku_normalized IS NULL'
+                ),
+                {'low': low, 'high': low + BACKFILL_BATCH_SIZE}
+            )
+
+        duplicates = bind.execute(sa.text("""
+            SELECT sku_normalized, string_agg(sku, ', ' ORDER BY id)
+            FROM products
+            GROUP BY sku_normalized
+            HAVING count(*) > 1
+            LIMIT 20
+        """)).all()
+        if duplicates:
+            listed = '; '.join(skus for _, skus in duplicates)
+            raise RuntimeError(
+                f"Products whose SKUs differ only by case must be merged or renamed "
+                f"before the unique index can be built (first {len(duplicates)}): {listed}"
+            )
+
+        # A failed concurrent build leaves an invalid index behind; start over
+        invalid = bind.execute(sa.text("""
+            SELECT 1 FROM pg_index
+            WHERE indexrelid = to_regclass('uq_products_sku_normalized') AND NOT indisvalid
+        """)).scalar()
+        if invalid:
+            op.execute('DROP INDEX CONCURRENTLY uq_products_sku_normalized')
+        op.execute(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_products_sku_normalized '
+            'ON products (sku_normalized)'
+        )
+
+        # SET NOT NULL skips its full-table scan when a validated CHECK already
+        # proves it, and VALIDATE does not block writes
+        op.execute(
+            'ALTER TABLE products DROP CONSTRAINT IF EXISTS products_sku_normalized_not_null'
+        )
+        op.execute(
+            'ALTER TABLE products ADD CONSTRAINT products_sku_normalized_not_null '
+            'CHECK (sku_normalized IS NOT NULL) NOT VALID'
+        )
+        op.execute('ALTER TABLE products VALIDATE CONSTRAINT products_sku_normalized_not_null')
+        op.execute('ALTER TABLE products ALTER COLUMN sku_normalized SET NOT NULL')
+        op.execute('ALTER TABLE products DROP CONSTRAINT products_sku_normalized_not_null')
+
+        # Superseded: lookups use sku_normalized, and its uniqueness implies sku's
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_products_sku_lower')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_products_sku')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_products_sku ON products (sku)')
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_sku_lower ON products (lower(sku))')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS uq_products_sku_normalized')
+        op.execute('DROP TRIGGER IF EXISTS products_sku_normalized ON products')
+        op.execute('DROP FUNCTION IF EXISTS products_sku_normalized()')
+        op.execute('ALTER TABLE products DROP COLUMN IF EXISTS sku_normalized')
@@ -0,0 +1,65 @@
+"""Add the product change feed: sequenced changes, change log and state
+
+Revision ID: 009_product_change_feed
+Revises: 008_product_sku_normalized
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_product_change_feed'
+down_revision = '008_product_sku_normalized'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'product_changes',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.Column('sku', sa.String(length=100), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index(op.f('ix_product_changes_seq'), 'product_changes', ['seq'], unique=True)
+    op.create_table(
+        'product_change_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.Column('sku', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_change_log_created_at', 'product_change_log', ['created_at'], unique=False)
+    op.create_table(
+        'product_change_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('last_seq', sa.BigInteger(), nullable=False),
+        sa.Column('reset_seq', sa.BigInteger(), nullable=False),
+        sa.Column('folded_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Start the feed with the existing catalog, sequenced by id
+    op.execute("""
+        INSERT INTO product_changes (product_id, seq, deleted, changed_at)
+        SELECT id, id, false, COALESCE(updated_at, now())
+        FROM products
+    """)
+    op.execute("""
+        INSERT INTO product_change_state (id, last_seq, reset_seq, folded_at)
+        SELECT 1, COALESCE(max(seq), 0), 0, now() FROM product_changes
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('product_change_state')
+    op.drop_index('ix_product_change_log_created_at', table_name='product_change_log')
+    op.drop_table('product_change_log')
+    op.drop_index(op.f('ix_product_changes_seq'), table_name='product_changes')
+    op.drop_table('product_changes')
@@ -0,0 +1,40 @@
+"""Add webhook batching settings and the pending event buffer
+
+Revision ID: 010_webhook_batching
+Revises: 009_product_change_feed
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_webhook_batching'
+down_revision = '009_product_change_feed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('webhooks', sa.Column('batch_window_seconds', sa.Integer(), nullable=True))
+    op.add_column('webhooks', sa.Column('batch_max_events', sa.Integer(), server_default='100', nullable=False))
+    op.create_table(
+        'webhook_pending_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('webhook_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'idx_webhook_pending_events_webhook_id', 'webhook_pending_events', ['webhook_id', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_webhook_pending_events_webhook_id', table_name='webhook_pending_events')
+    op.drop_table('webhook_pending_events')
+    op.drop_column('webhooks', 'batch_max_events')
+    op.drop_column('webhooks', 'batch_window_seconds')
@@ -0,0 +1,25 @@
+"""Split webhook delivery time into connection setup and server time
+
+Revision ID: 011_webhook_log_timing
+Revises: 010_webhook_batching
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_webhook_log_timing'
+down_revision = '010_webhook_batching'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_logs', sa.Column('connect_time_ms', sa.Integer(), nullable=True))
+    op.add_column('webhook_logs', sa.Column('server_time_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('webhook_logs', 'server_time_ms')
+    op.drop_column('webhook_logs', 'connect_time_ms')
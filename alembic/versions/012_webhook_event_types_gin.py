@@ -0,0 +1,35 @@
+"""Add a GIN index on webhooks.event_types for subscription lookups
+
+Revision ID: 012_webhook_event_types_gin
+Revises: 011_webhook_log_timing
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_webhook_event_types_gin'
+down_revision = '011_webhook_log_timing'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # event_types is a json column, so index its jsonb cast: matches
+    # CAST(event_types AS JSONB) @> '["product.created"]'
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_webhooks_event_types '
+            'ON webhooks USING gin ((CAST(event_types AS jsonb)) jsonb_path_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_webhooks_event_types')
@@ -0,0 +1,47 @@
+"""Add webhook circuit breaker state and the deferred delivery queue
+
+Revision ID: 013_webhook_circuit_breaker
+Revises: 012_webhook_event_types_gin
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_webhook_circuit_breaker'
+down_revision = '012_webhook_event_types_gin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('webhooks', sa.Column('circuit_state', sa.String(length=20), server_default='closed', nullable=False))
+    op.add_column('webhooks', sa.Column('consecutive_failures', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('webhooks', sa.Column('circuit_trips', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('webhooks', sa.Column('circuit_opened_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('webhooks', sa.Column('circuit_retry_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('webhooks', sa.Column('skipped_deliveries', sa.Integer(), server_default='0', nullable=False))
+    op.create_table(
+        'webhook_deferred_deliveries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('webhook_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'idx_webhook_deferred_deliveries_webhook_id', 'webhook_deferred_deliveries', ['webhook_id', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_webhook_deferred_deliveries_webhook_id', table_name='webhook_deferred_deliveries')
+    op.drop_table('webhook_deferred_deliveries')
+    op.drop_column('webhooks', 'skipped_deliveries')
+    op.drop_column('webhooks', 'circuit_retry_at')
+    op.drop_column('webhooks', 'circuit_opened_at')
+    op.drop_column('webhooks', 'circuit_trips')
+    op.drop_column('webhooks', 'consecutive_failures')
+    op.drop_column('webhooks', 'circuit_state')
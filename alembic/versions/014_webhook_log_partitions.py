@@ -0,0 +1,149 @@
+"""Partition webhook_logs by day and store each payload once
+
+Revision ID: 014_webhook_log_partitions
+Revises: 013_webhook_circuit_breaker
+Create Date: 2026-10-19 21:00:00.000000
+
+On PostgreSQL webhook_logs becomes a table range-partitioned on created_at,
+one partition per UTC day plus a default partition for days that have none
+yet; logs older than WEBHOOK_LOG_RETENTION_DAYS are not carried over. Other
+databases keep a plain table.
+
+"""
+from datetime import datetime, time, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+# revision identifiers, used by Alembic.
+revision = '014_webhook_log_partitions'
+down_revision = '013_webhook_circuit_breaker'
+branch_labels = None
+depends_on = None
+
+# Migrated payloads are keyed by a digest of their stored JSON text rather
+# than the canonical JSON new logs use, so they only deduplicate among themselves
+_DIGEST = "encode(sha256(convert_to(payload::text, 'UTF8')), 'hex')"
+
+_LOG_COLUMNS = (
+    'id, webhook_id, event_type, response_code, response_body, response_time_ms, '
+    'connect_time_ms, server_time_ms, error_message, retry_attempt, success, created_at'
+)
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).isoformat()
+
+
+def upgrade() -> None:
+    op.create_table(
+        'webhook_payloads',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('digest')
+    )
+    op.create_index('idx_webhook_payloads_last_seen_at', 'webhook_payloads', ['last_seen_at'], unique=False)
+
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('webhook_logs') as batch_op:
+            batch_op.add_column(sa.Column('payload_digest', sa.String(length=64), nullable=True))
+            batch_op.drop_column('payload')
+            batch_op.drop_index('ix_webhook_logs_webhook_id')
+            batch_op.create_index('idx_webhook_logs_webhook_id_created_at', ['webhook_id', 'created_at'], unique=False)
+        return
+
+    op.execute('ALTER TABLE webhook_logs RENAME TO webhook_logs_unpartitioned')
+    op.execute('ALTER TABLE webhook_logs_unpartitioned RENAME CONSTRAINT webhook_logs_pkey TO webhook_logs_unpartitioned_pkey')
+    op.execute("""
+        CREATE TABLE webhook_logs (
+            id bigint NOT NULL DEFAULT nextval('webhook_logs_id_seq'),
+            webhook_id integer NOT NULL,
+            event_type varchar(100) NOT NULL,
+            payload_digest varchar(64),
+            response_code integer,
+            response_body text,
+            response_time_ms integer,
+            connect_time_ms integer,
+            server_time_ms integer,
+            error_message text,
+            retry_attempt integer,
+            success boolean,
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT webhook_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # Keep the id sequence when the old table is dropped, widened with the
+    # column: this is the highest-volume insert table
+    op.execute('ALTER SEQUENCE webhook_logs_id_seq AS bigint OWNED BY webhook_logs.id')
+    op.create_index('idx_webhook_logs_webhook_id_created_at', 'webhook_logs', ['webhook_id', 'created_at'], unique=False)
+
+    today = datetime.now(timezone.utc).date()
+    first = today - timedelta(days=settings.webhook_log_retention_days)
+    last = today + timedelta(days=settings.webhook_log_partitions_ahead_days)
+    day = first
+    while day <= last:
+        op.execute(
+            f"CREATE TABLE webhook_logs_p{day:%Y%m%d} PARTITION OF webhook_logs "
+            f"FOR VALUES FROM ('{_day_start(day)}') TO ('{_day_start(day + timedelta(days=1))}')"
+        )
+        day += timedelta(days=1)
+    # Catches logs for days without a partition until maintenance creates one
+    op.execute('CREATE TABLE webhook_logs_default PARTITION OF webhook_logs DEFAULT')
+
+    retained = f"created_at >= '{_day_start(first)}' AND created_at < '{_day_start(last + timedelta(days=1))}'"
+    op.execute(f"""
+        INSERT INTO webhook_payloads (digest, payload, last_seen_at)
+        SELECT DISTINCT ON (digest) digest, payload, created_at
+        FROM (SELECT {_DIGEST} AS digest, payload, created_at FROM webhook_logs_unpartitioned WHERE {retained}) logs
+        ORDER BY digest, created_at DESC
+    """)
+    op.execute(f"""
+        INSERT INTO webhook_logs ({_LOG_COLUMNS}, payload_digest)
+        SELECT {_LOG_COLUMNS}, {_DIGEST} FROM webhook_logs_unpartitioned WHERE {retained}
+    """)
+    op.execute('DROP TABLE webhook_logs_unpartitioned')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('webhook_logs') as batch_op:
+            batch_op.drop_index('idx_webhook_logs_webhook_id_created_at')
+            batch_op.create_index('ix_webhook_logs_webhook_id', ['webhook_id'], unique=False)
+            batch_op.add_column(sa.Column('payload', sa.JSON(), server_default='{}', nullable=False))
+            batch_op.drop_column('payload_digest')
+    else:
+        op.execute('ALTER TABLE webhook_logs RENAME TO webhook_logs_partitioned')
+        op.execute('ALTER TABLE webhook_logs_partitioned RENAME CONSTRAINT webhook_logs_pkey TO webhook_logs_partitioned_pkey')
+        op.execute("""
+            CREATE TABLE webhook_logs (
+                id integer NOT NULL DEFAULT nextval('webhook_logs_id_seq'),
+                webhook_id integer NOT NULL,
+                event_type varchar(100) NOT NULL,
+                payload json NOT NULL,
+                response_code integer,
+                response_body text,
+                response_time_ms integer,
+                connect_time_ms integer,
+                server_time_ms integer,
+                error_message text,
+                retry_attempt integer,
+                success boolean,
+                created_at timestamp with time zone DEFAULT now(),
+                CONSTRAINT webhook_logs_pkey PRIMARY KEY (id)
+            )
+        """)
+        op.execute('ALTER SEQUENCE webhook_logs_id_seq AS integer OWNED BY webhook_logs.id')
+        op.create_index('ix_webhook_logs_webhook_id', 'webhook_logs', ['webhook_id'], unique=False)
+        # Logs whose payload was already pruned get an empty one
+        op.execute(f"""
+            INSERT INTO webhook_logs ({_LOG_COLUMNS}, payload)
+            SELECT {', '.join('l.' + column for column in _LOG_COLUMNS.split(', '))}, COALESCE(p.payload, '{{}}'::json)
+            FROM webhook_logs_partitioned l LEFT JOIN webhook_payloads p ON p.digest = l.payload_digest
+        """)
+        op.execute('DROP TABLE webhook_logs_partitioned')
+
+    op.drop_index('idx_webhook_payloads_last_seen_at', table_name='webhook_payloads')
+    op.drop_table('webhook_payloads')
@@ -0,0 +1,34 @@
+"""Widen product_change_log.id to bigint
+
+Revision ID: 015_product_change_log_bigint
+Revises: 014_webhook_log_partitions
+Create Date: 2026-10-19 22:00:00.000000
+
+Every product write appends a log row, so the id sequence outruns integer
+long before seq does. SQLite integers are already 64-bit.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_product_change_log_bigint'
+down_revision = '014_webhook_log_partitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column('product_change_log', 'id', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+    op.execute('ALTER SEQUENCE product_change_log_id_seq AS bigint')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER SEQUENCE product_change_log_id_seq AS integer')
+    op.alter_column('product_change_log', 'id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
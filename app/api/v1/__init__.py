@@ -1,9 +1,17 @@
 from fastapi import APIRouter
+from .delete_job_routes import router as delete_job_router
 from .import_routes import router as import_router
+from .inventory_routes import router as inventory_router
+from .product_bulk_routes import router as product_bulk_router
+from .product_change_routes import router as product_change_router
 from .product_routes import router as product_router
 from .webhook_routes import router as webhook_router
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(import_router)
+api_router.include_router(product_bulk_router)
+api_router.include_router(delete_job_router)
+api_router.include_router(inventory_router)
+api_router.include_router(product_change_router)
 api_router.include_router(product_router)
 api_router.include_router(webhook_router)
\ No newline at end of file
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+import uuid
+
+from ...database import get_async_db, get_async_read_db
+from ...models import DeleteJob
+from ...schemas import DeleteJobResponse, ProductFilter
+from ...tasks import delete_products_task
+
+
+router = APIRouter(prefix="/products/delete-jobs", tags=["products"])
+
+
+async def enqueue_delete_job(db: AsyncSession, filters: Dict[str, Any]) -> DeleteJob:
+    """Record a delete job and hand it to the upload worker."""
+    
+    delete_job = DeleteJob(
+        task_id=f"temp_{uuid.uuid4()}",
+        filters=filters,
+        status="pending"
+    )
+    db.add(delete_job)
+    await db.commit()
+    await db.refresh(delete_job)
+    
+    # Broker publish is blocking, keep it off the event loop
+    task = await run_in_threadpool(delete_products_task.delay, delete_job.id)
+    
+    delete_job.task_id = task.id
+    await db.commit()
+    await db.refresh(delete_job)
+    
+    return delete_job
+
+
+@router.post("", response_model=DeleteJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_delete_job(
+    filters: ProductFilter,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete products matching the listing filters in the background, in chunks."""
+    
+    filter_values = filters.model_dump(exclude_none=True)
+    if not filter_values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Set at least one filter; use DELETE /products/?confirm=true to delete everything"
+        )
+    
+    return await enqueue_delete_job(db, filter_values)
+
+
+@router.get("", response_model=List[DeleteJobResponse])
+async def get_delete_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    status_filter: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get list of delete jobs."""
+    
+    query = select(DeleteJob)
+    if status_filter:
+        query = query.where(DeleteJob.status == status_filter)
+    jobs = await db.scalars(query.order_by(DeleteJob.created_at.desc()).offset(skip).limit(limit))
+    return jobs.all()
+
+
+@router.get("/{job_id}", response_model=DeleteJobResponse)
+async def get_delete_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get delete job progress."""
+    
+    delete_job = await db.get(DeleteJob, job_id)
+    if not delete_job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Delete job not found"
+        )
+    
+    return delete_job
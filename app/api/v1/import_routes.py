@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import aiofiles
+import aiofiles.os
 import uuid
 import os
 from datetime import datetime
 
-from ...database import get_db
+from ...database import get_async_db, get_async_read_db
+from ...etags import etag_matches, make_etag, not_modified, validator_headers
 from ...models import ImportJob
 from ...schemas import ImportJobResponse, ImportProgressResponse
 from ...tasks import import_csv_task
@@ -14,11 +19,13 @@ from ...config import settings
 
 router = APIRouter(prefix="/import", tags=["import"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
 
 @router.post("/upload", response_model=ImportJobResponse)
 async def upload_csv_file(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload CSV file for product import."""
     
@@ -29,25 +36,30 @@ async def upload_csv_file(
             detail="Only CSV files are allowed"
         )
     
-    # Validate file size
-    file_content = await file.read()
-    if len(file_content) > settings.max_file_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
-        )
-    
     # Create upload directory if it doesn't exist
-    os.makedirs(settings.upload_dir, exist_ok=True)
+    await aiofiles.os.makedirs(settings.upload_dir, exist_ok=True)
     
     # Generate unique filename
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(settings.upload_dir, unique_filename)
     
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    # Stream the upload to disk in chunks, validating size as we go
+    file_size = 0
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > settings.max_file_size:
+                break
+            await f.write(chunk)
+    
+    # Validate file size
+    if file_size > settings.max_file_size:
+        await aiofiles.os.remove(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
+        )
     
     # Generate temporary task ID
     temp_task_id = f"temp_{uuid.uuid4()}"
@@ -59,28 +71,28 @@ async def upload_csv_file(
         status="pending"
     )
     db.add(import_job)
-    db.commit()
-    db.refresh(import_job)
+    await db.commit()
+    await db.refresh(import_job)
     
-    # Start import task
-    task = import_csv_task.delay(file_path, import_job.id)
+    # Start import task (broker publish is blocking, keep it off the event loop)
+    task = await run_in_threadpool(import_csv_task.delay, file_path, import_job.id)
     
     # Update job with actual task ID
     import_job.task_id = task.id
-    db.commit()
+    await db.commit()
     
     return import_job
 
 
 @router.get("/progress/{task_id}", response_model=ImportProgressResponse)
-def get_import_progress(
+async def get_import_progress(
     task_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get import progress by task ID."""
     
     # Get import job
-    import_job = db.query(ImportJob).filter(ImportJob.task_id == task_id).first()
+    import_job = await db.scalar(select(ImportJob).where(ImportJob.task_id == task_id))
     if not import_job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -123,35 +135,58 @@ def get_import_progress(
 
 
 @router.get("/jobs", response_model=List[ImportJobResponse])
-def get_import_jobs(
+async def get_import_jobs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get list of import jobs."""
     
-    query = db.query(ImportJob)
-    
-    if status_filter:
-        query = query.filter(ImportJob.status == status_filter)
-    
-    jobs = query.order_by(ImportJob.created_at.desc()).offset(skip).limit(limit).all()
-    return jobs
+    def page_query(*columns):
+        query = select(*columns)
+        if status_filter:
+            query = query.where(ImportJob.status == status_filter)
+        return query.order_by(ImportJob.created_at.desc()).offset(skip).limit(limit)
+    
+    # Fingerprint the page from (id, updated_at) alone; full rows are only
+    # loaded and serialized when something on it changed
+    validators = (await db.execute(page_query(ImportJob.id, ImportJob.updated_at))).all()
+    etag = make_etag("jobs", *(f"{job_id}@{updated_at}" for job_id, updated_at in validators))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    response.headers.update(validator_headers(etag))
+    jobs = await db.scalars(page_query(ImportJob))
+    return jobs.all()
 
 
 @router.get("/jobs/{job_id}", response_model=ImportJobResponse)
-def get_import_job(
+async def get_import_job(
     job_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific import job details."""
     
-    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if if_none_match:
+        updated_at = await db.scalar(select(ImportJob.updated_at).where(ImportJob.id == job_id))
+        if updated_at is not None and etag_matches(if_none_match, _job_etag(job_id, updated_at)):
+            return not_modified(_job_etag(job_id, updated_at))
+    
+    job = await db.get(ImportJob, job_id)
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Import job not found"
         )
     
-    return job
\ No newline at end of file
+    response.headers.update(validator_headers(_job_etag(job_id, job.updated_at)))
+    return job
+
+
+def _job_etag(job_id: int, updated_at) -> str:
+    return make_etag("job", job_id, updated_at)
\ No newline at end of file
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, status
+
+from ...config import settings
+from ...inventory import inventory_coalescer
+from ...schemas import (
+    InventoryAdjustmentRequest,
+    InventoryAdjustmentResult,
+    InventoryAdjustmentResponse
+)
+
+
+router = APIRouter(prefix="/products/inventory", tags=["products"])
+
+
+@router.post("/adjustments", response_model=InventoryAdjustmentResponse)
+async def adjust_inventory(request: InventoryAdjustmentRequest):
+    """Apply inventory deltas by SKU as atomic increments, coalesced with concurrent calls."""
+
+    if len(request.items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} items per call"
+        )
+
+    outcomes = await inventory_coalescer.submit(
+        [(item.sku, item.delta) for item in request.items],
+        non_negative=request.non_negative
+    )
+
+    results = []
+    counts = {"applied": 0, "rejected": 0, "not_found": 0}
+    for index, outcome in enumerate(outcomes):
+        counts[outcome.status] += 1
+        results.append(InventoryAdjustmentResult(
+            index=index,
+            sku=outcome.sku,
+            id=outcome.product_id,
+            status=outcome.status,
+            inventory_count=outcome.inventory_count,
+            error="Would take inventory below zero" if outcome.status == "rejected" else None
+        ))
+
+    return InventoryAdjustmentResponse(results=results, **counts)
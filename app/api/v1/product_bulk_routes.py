@@ -0,0 +1,405 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete, insert, select, update
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+
+from ...cache import bump_catalog_version_async
+from ...change_feed import record_product_changes
+from ...config import settings
+from ...database import get_async_db
+from ...facets import FacetDeltas, facet_key, record_facet_deltas
+from ...filters import apply_product_filters
+from ...models import Product
+from ...schemas import (
+    ProductBulkCreate,
+    ProductBulkPatch,
+    ProductBulkDelete,
+    ProductBulkItemResult,
+    ProductBulkResponse
+)
+from ...suggestions import record_suggestion_values_async
+from ...tasks.webhook_tasks import trigger_webhook_task
+
+
+router = APIRouter(prefix="/products/bulk", tags=["products"])
+
+# Keep IN lists well below driver and SQLite bound-parameter limits
+LOOKUP_CHUNK_SIZE = 500
+
+# Columns a patch may not set to null
+NON_NULLABLE_FIELDS = ("sku", "name", "is_active")
+
+
+def _check_batch_size(count: int) -> None:
+    if count > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} items per bulk call"
+        )
+
+
+def _chunks(values: List, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+async def _ids_by_sku(db: AsyncSession, skus: Iterable[str]) -> Dict[str, int]:
+    """Map lower-cased SKUs to the ids of the products that have them."""
+    found = {}
+    for chunk in _chunks(list(skus)):
+        rows = await db.execute(
+            select(Product.sku_normalized, Product.id).where(Product.sku_normalized.in_(chunk))
+        )
+        found.update(dict(rows.tuples().all()))
+    return found
+
+
+async def _skus_by_id(db: AsyncSession, ids: Iterable[int]) -> Dict[int, str]:
+    """Map product ids to their current SKUs."""
+    found = {}
+    for chunk in _chunks(list(ids)):
+        rows = await db.execute(select(Product.id, Product.sku).where(Product.id.in_(chunk)))
+        found.update(dict(rows.tuples().all()))
+    return found
+
+
+async def _facet_values(db: AsyncSession, ids: Iterable[int]) -> Dict[int, Dict]:
+    """Lock products and read their current facet columns, keyed by id."""
+    found = {}
+    for chunk in _chunks(list(ids)):
+        rows = await db.execute(
+            select(Product.id, Product.category, Product.brand, Product.is_active, Product.price)
+            .where(Product.id.in_(chunk))
+            .with_for_update()
+        )
+        for row in rows.mappings():
+            found[row["id"]] = dict(row)
+    return found
+
+
+async def _conflict(db: AsyncSession) -> HTTPException:
+    """Roll back a batch that lost a unique-SKU race with a concurrent write."""
+    await db.rollback()
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A concurrent write conflicted with this batch; nothing was written, please retry"
+    )
+
+
+def _summary(result: ProductBulkItemResult, name: str) -> Dict:
+    return {'id': result.id, 'sku': result.sku, 'name': name}
+
+
+def _build_response(results: List[ProductBulkItemResult]) -> ProductBulkResponse:
+    counts = {"created": 0, "updated": 0, "deleted": 0}
+    failed = 0
+    for result in results:
+        if result.status in counts:
+            counts[result.status] += 1
+        else:
+            failed += 1
+    return ProductBulkResponse(results=results, failed=failed, **counts)
+
+
+async def _notify(event_type: str, payload: Dict) -> None:
+    """Emit one aggregated webhook event for the whole call."""
+    payload["timestamp"] = datetime.utcnow().isoformat()
+    await run_in_threadpool(trigger_webhook_task.delay, event_type, payload)
+
+
+@router.post("", response_model=ProductBulkResponse)
+async def bulk_create_products(
+    request: ProductBulkCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many products (or upsert them by SKU) in one transaction."""
+
+    _check_batch_size(len(request.items))
+    results: List[Optional[ProductBulkItemResult]] = [None] * len(request.items)
+
+    # Reject SKUs repeated within the request (SKUs are case-insensitive)
+    first_index: Dict[str, int] = {}
+    for index, item in enumerate(request.items):
+        key = item.sku.lower()
+        if key in first_index:
+            results[index] = ProductBulkItemResult(
+                index=index,
+                sku=item.sku,
+                status="error",
+                error=f"Duplicate SKU in request (same as item {first_index[key]})"
+            )
+        else:
+            first_index[key] = index
+
+    # One lookup for every SKU instead of one query per product
+    existing = await _ids_by_sku(db, first_index.keys())
+
+    inserts, insert_indexes = [], []
+    updates, update_indexes = [], []
+    for key, index in first_index.items():
+        item = request.items[index]
+        product_id = existing.get(key)
+        if product_id is None:
+            inserts.append(item.model_dump())
+            insert_indexes.append(index)
+        elif request.upsert:
+            updates.append({"id": product_id, **item.model_dump()})
+            update_indexes.append(index)
+            results[index] = ProductBulkItemResult(index=index, id=product_id, sku=item.sku, status="updated")
+        else:
+            results[index] = ProductBulkItemResult(
+                index=index,
+                id=product_id,
+                sku=item.sku,
+                status="error",
+                error=f"Product with SKU '{item.sku}' already exists"
+            )
+
+    # Facet rollup changes, computed from the rows being replaced
+    deltas = FacetDeltas()
+    for values in inserts:
+        deltas.added(values)
+    old_values = await _facet_values(db, [values["id"] for values in updates])
+    # Products deleted since the SKU lookup are reported rather than updated
+    for values, index in zip(updates, update_indexes):
+        if values["id"] not in old_values:
+            results[index] = ProductBulkItemResult(index=index, id=values["id"], sku=request.items[index].sku, status="not_found")
+    update_indexes = [index for values, index in zip(updates, update_indexes) if values["id"] in old_values]
+    updates = [values for values in updates if values["id"] in old_values]
+    for values in updates:
+        deltas.changed(facet_key(old_values[values["id"]]), values)
+
+    # Set-based writes: one multi-row INSERT and one executemany UPDATE
+    try:
+        if inserts:
+            rows = await db.execute(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                inserts
+            )
+            for index, product_id in zip(insert_indexes, rows.scalars()):
+                results[index] = ProductBulkItemResult(
+                    index=index,
+                    id=product_id,
+                    sku=request.items[index].sku,
+                    status="created"
+                )
+        if updates:
+            await db.execute(update(Product), updates)
+        await db.run_sync(record_facet_deltas, deltas)
+        await db.run_sync(record_product_changes, [results[index].id for index in insert_indexes + update_indexes])
+        await db.commit()
+    except IntegrityError:
+        raise await _conflict(db)
+
+    written = insert_indexes + update_indexes
+    if written:
+        await bump_catalog_version_async()
+        await record_suggestion_values_async(
+            [request.items[index].category for index in written],
+            [request.items[index].brand for index in written]
+        )
+        await _notify('products.bulk_created', {
+            'created': [_summary(results[index], request.items[index].name) for index in insert_indexes],
+            'updated': [_summary(results[index], request.items[index].name) for index in update_indexes]
+        })
+
+    return _build_response(results)
+
+
+@router.patch("", response_model=ProductBulkResponse)
+async def bulk_patch_products(
+    request: ProductBulkPatch,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Partially update many products, matched by id or SKU, in one transaction."""
+
+    _check_batch_size(len(request.items))
+    results: List[Optional[ProductBulkItemResult]] = [None] * len(request.items)
+
+    # Resolve every item to a product id with one lookup per identifier kind
+    current_skus = await _skus_by_id(db, {item.id for item in request.items if item.id is not None})
+    ids_by_sku = await _ids_by_sku(db, {item.sku.lower() for item in request.items if item.sku is not None})
+
+    targets: Dict[int, int] = {}
+    for index, item in enumerate(request.items):
+        if item.id is not None:
+            product_id = item.id if item.id in current_skus else None
+        else:
+            product_id = ids_by_sku.get(item.sku.lower())
+
+        error = None
+        changes = item.changes.model_dump(exclude_unset=True)
+        if product_id is None:
+            results[index] = ProductBulkItemResult(index=index, id=item.id, sku=item.sku, status="not_found")
+            continue
+        elif product_id in targets:
+            error = f"Product targeted more than once in request (same as item {targets[product_id]})"
+        elif not changes:
+            error = "No changes given"
+        else:
+            nulls = [field for field in NON_NULLABLE_FIELDS if field in changes and changes[field] is None]
+            if nulls:
+                error = f"{', '.join(nulls)} cannot be null"
+
+        if error:
+            results[index] = ProductBulkItemResult(index=index, id=product_id, sku=item.sku, status="error", error=error)
+        else:
+            targets[product_id] = index
+
+    # SKU renames must not collide with other products or with each other
+    renames = {
+        product_id: request.items[index].changes.sku
+        for product_id, index in targets.items()
+        if request.items[index].changes.sku is not None
+    }
+    owners = await _ids_by_sku(db, {sku.lower() for sku in renames.values()})
+    claimed: Dict[str, int] = {}
+    for product_id, new_sku in renames.items():
+        key = new_sku.lower()
+        owner = owners.get(key, claimed.get(key))
+        if owner is not None and owner != product_id:
+            index = targets.pop(product_id)
+            results[index] = ProductBulkItemResult(
+                index=index,
+                id=product_id,
+                sku=request.items[index].sku,
+                status="error",
+                error=f"Product with SKU '{new_sku}' already exists"
+            )
+        else:
+            claimed[key] = product_id
+
+    # ORM bulk UPDATE by primary key; rows with the same changed columns share a statement
+    updates = [
+        {"id": product_id, **request.items[index].changes.model_dump(exclude_unset=True)}
+        for product_id, index in targets.items()
+    ]
+    deltas = FacetDeltas()
+    old_values = await _facet_values(db, targets.keys())
+    for values in updates:
+        old = old_values.get(values["id"])
+        if old is not None:
+            deltas.changed(facet_key(old), {**old, **values})
+    try:
+        if updates:
+            await db.execute(update(Product), updates)
+        await db.run_sync(record_facet_deltas, deltas)
+        await db.run_sync(record_product_changes, [values["id"] for values in updates])
+        await db.commit()
+    except IntegrityError:
+        raise await _conflict(db)
+
+    if not updates:
+        return _build_response(results)
+
+    # Look up SKUs matched by id for the results and the event payload
+    if any(request.items[index].sku is None for index in targets.values()):
+        final_skus = await _skus_by_id(db, targets.keys())
+    else:
+        final_skus = {}
+
+    for product_id, index in targets.items():
+        item = request.items[index]
+        sku = item.changes.sku or final_skus.get(product_id) or item.sku
+        results[index] = ProductBulkItemResult(index=index, id=product_id, sku=sku, status="updated")
+
+    changed = [request.items[index].changes for index in targets.values()]
+    await bump_catalog_version_async()
+    await record_suggestion_values_async(
+        [changes.category for changes in changed],
+        [changes.brand for changes in changed]
+    )
+    await _notify('products.bulk_updated', {
+        'updated': [
+            {
+                'id': product_id,
+                'sku': results[index].sku,
+                'fields': sorted(request.items[index].changes.model_fields_set)
+            }
+            for product_id, index in targets.items()
+        ]
+    })
+
+    return _build_response(results)
+
+
+@router.post("/delete", response_model=ProductBulkResponse)
+async def bulk_delete_products(
+    request: ProductBulkDelete,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete products by id list or by listing filter in one transaction."""
+
+    if request.filter is not None:
+        # One DELETE ... WHERE with the same filters as the product listing;
+        # the returned facet columns keep the rollup exact
+        statement = apply_product_filters(delete(Product), request.filter).returning(
+            Product.id, Product.sku, Product.category, Product.brand, Product.is_active, Product.price
+        )
+        result = await db.execute(statement.execution_options(synchronize_session=False))
+        deltas = FacetDeltas()
+        tombstones: Dict[int, str] = {}
+        for row in result.mappings():
+            deltas.removed(row)
+            tombstones[row["id"]] = row["sku"]
+        deleted_count = len(tombstones)
+        await db.run_sync(record_facet_deltas, deltas)
+        await db.run_sync(record_product_changes, (), tombstones)
+        await db.commit()
+
+        if deleted_count:
+            await bump_catalog_version_async()
+            await _notify('products.bulk_deleted', {
+                'deleted_count': deleted_count,
+                'filter': request.filter.model_dump(exclude_none=True)
+            })
+
+        return ProductBulkResponse(results=[], deleted=deleted_count)
+
+    _check_batch_size(len(request.ids))
+
+    deleted: Dict[int, str] = {}
+    deltas = FacetDeltas()
+    for chunk in _chunks(list(dict.fromkeys(request.ids))):
+        rows = await db.execute(
+            delete(Product)
+            .where(Product.id.in_(chunk))
+            .returning(Product.id, Product.sku, Product.category, Product.brand, Product.is_active, Product.price)
+            .execution_options(synchronize_session=False)
+        )
+        for row in rows.mappings():
+            deleted[row["id"]] = row["sku"]
+            deltas.removed(row)
+    await db.run_sync(record_facet_deltas, deltas)
+    await db.run_sync(record_product_changes, (), deleted)
+    await db.commit()
+
+    results = []
+    first_index: Dict[int, int] = {}
+    for index, product_id in enumerate(request.ids):
+        if product_id in first_index:
+            results.append(ProductBulkItemResult(
+                index=index,
+                id=product_id,
+                status="error",
+                error=f"Duplicate id in request (same as item {first_index[product_id]})"
+            ))
+            continue
+        first_index[product_id] = index
+        if product_id in deleted:
+            results.append(ProductBulkItemResult(index=index, id=product_id, sku=deleted[product_id], status="deleted"))
+        else:
+            results.append(ProductBulkItemResult(index=index, id=product_id, status="not_found"))
+
+    if deleted:
+        await bump_catalog_version_async()
+        await _notify('products.bulk_deleted', {
+            'deleted_count': len(deleted),
+            'deleted': [{'id': product_id, 'sku': sku} for product_id, sku in deleted.items()]
+        })
+
+    return _build_response(results)
+
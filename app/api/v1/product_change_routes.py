@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...change_feed import read_product_changes
+from ...database import get_async_read_db
+from ...schemas import ProductChangesResponse
+
+
+router = APIRouter(prefix="/products/changes", tags=["products"])
+
+
+@router.get("", response_model=ProductChangesResponse)
+async def get_product_changes(
+    since: int = Query(0, ge=0, description="next_since from the previous page; 0 to read the whole catalog"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get products created, updated or deleted after a cursor, in change order."""
+    
+    return await db.run_sync(read_product_changes, since, limit)
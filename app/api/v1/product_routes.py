@@ -1,36 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy import func, or_, tuple_, text, cast, delete, literal, literal_column, select, union_all, Float
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from typing import List, Optional, Tuple
+import json
 import math
+import orjson
 from datetime import datetime
 
-from ...database import get_db
+from ...cache import (
+    bump_catalog_version_async,
+    filter_signature,
+    get_catalog_version,
+    get_cached_count,
+    set_cached_count,
+    get_cached_response,
+    set_cached_response,
+    get_response_cache_stats
+)
+from ...change_feed import record_product_changes, reset_product_changes
+from ...config import settings
+from ...database import get_async_db, get_async_read_db, has_read_replica, is_replica_session, needs_primary
+from ...etags import etag_matches, make_etag, not_modified, validator_headers
+from ...export import export_media, stream_products_export
+from ...facets import FacetDeltas, facet_counts, facet_key, record_facet_deltas, reset_facets, rollup_product_count
+from ...filters import apply_product_filters, contains_pattern
 from ...models import Product
 from ...schemas import (
     ProductCreate,
     ProductUpdate, 
     ProductResponse,
     ProductListResponse,
-    ProductFilter
+    ProductFilter,
+    ProductSearchResult,
+    ProductSearchResponse,
+    ProductFacetsResponse,
+    DeleteJobResponse
+)
+from ...pagination import encode_cursor, decode_cursor, InvalidCursorError
+from ...serialization import (
+    CURSOR_FIELDS,
+    InvalidFieldsError,
+    dumps,
+    json_datetime,
+    parse_fields,
+    product_columns,
+    rows_to_items
 )
+from ...suggestions import record_suggestion_values_async, suggestion_index
 from ...tasks.webhook_tasks import trigger_webhook_task
+from .delete_job_routes import enqueue_delete_job
 
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Generated full-text column from migration 004 (not mapped on the model)
+PRODUCT_SEARCH_VECTOR = literal_column("products.search_vector", type_=TSVECTOR)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-def create_product(
+async def create_product(
     product: ProductCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new product."""
     
     # Check if SKU already exists (case-insensitive)
-    existing = db.query(Product).filter(
-        func.lower(Product.sku) == product.sku.lower()
-    ).first()
+    existing = await db.scalar(
+        select(Product.id).where(Product.sku_normalized == product.sku.lower()).limit(1)
+    )
     
     if existing:
         raise HTTPException(
@@ -41,11 +83,19 @@ def create_product(
     # Create new product
     db_product = Product(**product.model_dump())
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    # Trigger webhook
-    trigger_webhook_task.delay(
+    await db.flush()
+    deltas = FacetDeltas()
+    deltas.added(db_product)
+    await db.run_sync(record_facet_deltas, deltas)
+    await db.run_sync(record_product_changes, [db_product.id])
+    await db.commit()
+    await db.refresh(db_product)
+    await bump_catalog_version_async()
+    await record_suggestion_values_async([db_product.category], [db_product.brand])
+    
+    # Trigger webhook (broker publish is blocking, keep it off the event loop)
+    await run_in_threadpool(
+        trigger_webhook_task.delay,
         'product.created',
         {
             'id': db_product.id,
@@ -59,9 +109,11 @@ def create_product(
 
 
 @router.get("/", response_model=ProductListResponse)
-def get_products(
+async def get_products(
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=100),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor/prev_cursor"),
     sku: Optional[str] = None,
     name: Optional[str] = None,
     category: Optional[str] = None,
@@ -69,79 +121,449 @@ def get_products(
     is_active: Optional[bool] = None,
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
-    db: Session = Depends(get_db)
+    count: Optional[str] = Query(None, pattern="^(exact|estimated|cached)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated product fields to return, e.g. id,sku,name,price"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get products with filtering and pagination."""
-    
-    query = db.query(Product)
+    """Get products with filtering and offset or cursor pagination."""
     
-    # Apply filters
-    if sku:
-        query = query.filter(Product.sku.ilike(f"%{sku}%"))
-    
-    if name:
-        query = query.filter(Product.name.ilike(f"%{name}%"))
-    
-    if category:
-        query = query.filter(Product.category.ilike(f"%{category}%"))
+    try:
+        selected_fields = parse_fields(fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    if brand:
-        query = query.filter(Product.brand.ilike(f"%{brand}%"))
+    filters = ProductFilter(
+        sku=sku,
+        name=name,
+        category=category,
+        brand=brand,
+        is_active=is_active,
+        min_price=min_price,
+        max_price=max_price
+    )
+    strategy = count or settings.product_count_strategy
     
-    if is_active is not None:
-        query = query.filter(Product.is_active == is_active)
+    # Serve from the response cache when the catalog version is unchanged
+    signature = filter_signature(
+        {
+            **filters.model_dump(),
+            "page": page,
+            "size": size,
+            "pagination": "cursor" if cursor else pagination,
+            "cursor": cursor,
+            "count": strategy,
+            "fields": ",".join(selected_fields)
+        },
+        case_sensitive=("cursor",)
+    )
+    version, cached_body = await get_cached_response("list", signature)
+    
+    # Every product write bumps the catalog version, so (version, query)
+    # validates the page without touching the database. With a replica that
+    # no longer holds: a lagging replica can serve the previous version's rows
+    # under the new version. Then pages are tagged by content, replica results
+    # are cached only briefly, and read-your-writes reads skip the cache
+    replica = is_replica_session(db)
+    versioned = version is not None and not has_read_replica()
+    etag = make_etag("list", version, signature) if versioned else None
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    if cached_body is not None and (replica or not has_read_replica()):
+        body = cached_body
+    else:
+        response = await _list_products(db, filters, selected_fields, page, size, pagination, cursor, strategy)
+        body = dumps(response).decode("utf-8")
+        if version is not None:
+            await set_cached_response(
+                version, "list", signature, body,
+                ttl=settings.read_replica_cache_ttl if replica else None
+            )
     
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
+    if etag is None:
+        # Replica configured, or no catalog version (Redis down): tag the content
+        etag = make_etag("list", body)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
     
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag))
+
+
+async def _list_products(
+    db: AsyncSession,
+    filters: ProductFilter,
+    fields: Tuple[str, ...],
+    page: int,
+    size: int,
+    pagination: str,
+    cursor: Optional[str],
+    count_strategy: str
+) -> dict:
+    """
+    Build one listing page for get_products in the ProductListResponse shape.
+    
+    Selects only the requested columns as tuples and returns plain dicts for
+    orjson, skipping ORM object loading and Pydantic validation.
+    """
+    
+    query = apply_product_filters(select(*product_columns(fields, extra=CURSOR_FIELDS)), filters)
     
     # Get total count
-    total = query.count()
+    total, total_is_exact = await _count_products(db, query, filters, count_strategy)
+    
+    if cursor or pagination == "cursor":
+        return await _get_products_page_by_cursor(db, query, fields, cursor, size, total, total_is_exact)
     
-    # Apply pagination
+    # Offset pagination is kept for the UI's page-number view, but deep
+    # offsets scan and discard every skipped row, so they are capped.
     offset = (page - 1) * size
-    products = query.order_by(Product.name).offset(offset).limit(size).all()
+    if offset > settings.max_pagination_offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Offset pagination is limited to {settings.max_pagination_offset} rows; "
+                "use pagination=cursor for deeper pages"
+            )
+        )
     
-    # Calculate total pages
+    rows = (await db.execute(
+        query.order_by(Product.name, Product.id).offset(offset).limit(size)
+    )).all()
+    
+    # Calculate total pages (only those reachable with offset pagination)
     pages = math.ceil(total / size) if total > 0 else 1
+    pages = min(pages, settings.max_pagination_offset // size + 1)
+    
+    return _list_response(rows_to_items(rows, fields), total, total_is_exact, page, size, pages)
+
+
+def _list_response(
+    items: List[dict],
+    total: int,
+    total_is_exact: bool,
+    page: Optional[int],
+    size: int,
+    pages: Optional[int],
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None
+) -> dict:
+    """ProductListResponse as a plain dict, keys in schema order."""
+    return {
+        "items": items,
+        "total": total,
+        "total_is_exact": total_is_exact,
+        "page": page,
+        "size": size,
+        "pages": pages,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    }
+
+
+async def _count_products(db: AsyncSession, query, filters: ProductFilter, strategy: str) -> Tuple[int, bool]:
+    """Count listing rows using the requested strategy; returns (total, is_exact)."""
+    
+    if strategy == "estimated":
+        estimate = await _estimate_product_count(db, query, filters)
+        if estimate is not None:
+            return estimate, False
+    
+    elif strategy == "cached":
+        # Keys embed the catalog version, which every product write bumps
+        version = await get_catalog_version()
+        if version is not None:
+            signature = filter_signature(filters.model_dump())
+            total = await get_cached_count(version, signature)
+            if total is None:
+                total = await _exact_count(db, query)
+                ttl = settings.read_replica_cache_ttl if is_replica_session(db) else None
+                await set_cached_count(version, signature, total, ttl=ttl)
+            return total, True
+    
+    return await _exact_count(db, query), True
+
+
+async def _exact_count(db: AsyncSession, query) -> int:
+    """Exact COUNT(*) over a listing query."""
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+async def _estimate_product_count(db: AsyncSession, query, filters: ProductFilter) -> Optional[int]:
+    """Estimate listing rows from PostgreSQL statistics, or None if unavailable."""
+    
+    dialect = db.bind.dialect
+    if dialect.name != "postgresql":
+        return None
+    
+    if not filters.model_dump(exclude_none=True):
+        # Unfiltered listing: table statistics are enough
+        reltuples = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'products'::regclass")
+        )
+        return int(reltuples) if reltuples and reltuples > 0 else None
+    
+    # Filtered listing: use the planner's row estimate. Connect before
+    # compiling: literals such as ESCAPE '\' render per the server's
+    # standard_conforming_strings, which the dialect learns on first connect
+    connection = await db.connection()
+    compiled = query.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", params
+    )).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _get_products_page_by_cursor(
+    db: AsyncSession,
+    query,
+    fields: Tuple[str, ...],
+    cursor: Optional[str],
+    size: int,
+    total: int,
+    total_is_exact: bool
+) -> dict:
+    """Fetch one page using a (name, id) seek predicate instead of OFFSET."""
+    
+    direction = "next"
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            direction = position["d"]
+            key = (position["n"], int(position["i"]))
+        except (InvalidCursorError, KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        
+        # Row-value comparison matches idx_products_name_id
+        if direction == "prev":
+            query = query.filter(tuple_(Product.name, Product.id) < key)
+        else:
+            query = query.filter(tuple_(Product.name, Product.id) > key)
+    
+    if direction == "prev":
+        query = query.order_by(Product.name.desc(), Product.id.desc())
+    else:
+        query = query.order_by(Product.name, Product.id)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = list((await db.execute(query.limit(size + 1))).all())
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if direction == "prev":
+        rows.reverse()
+    
+    next_cursor = None
+    prev_cursor = None
+    if rows:
+        if has_more or (cursor and direction == "prev"):
+            last = rows[-1]
+            next_cursor = encode_cursor({"n": last.name, "i": last.id, "d": "next"})
+        if (cursor and direction == "next") or (direction == "prev" and has_more):
+            first = rows[0]
+            prev_cursor = encode_cursor({"n": first.name, "i": first.id, "d": "prev"})
+    
+    return _list_response(
+        rows_to_items(rows, fields),
+        total,
+        total_is_exact,
+        None,
+        size,
+        None,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
+    )
+
+
+@router.get("/export")
+async def export_products(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    gzip: bool = Query(False, description="Gzip CSV/NDJSON on the fly; Parquet uses its gzip codec"),
+    sku: Optional[str] = None,
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0)
+):
+    """Stream the full catalog, or a filtered subset, as CSV, NDJSON or Parquet."""
+    
+    filters = ProductFilter(
+        sku=sku,
+        name=name,
+        category=category,
+        brand=brand,
+        is_active=is_active,
+        min_price=min_price,
+        max_price=max_price
+    )
+    media_type, filename = export_media(format, gzip)
+    
+    return StreamingResponse(
+        stream_products_export(filters, format, gzip, primary=needs_primary(request)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no"  # Don't let a proxy buffer the whole export
+        }
+    )
+
+
+@router.get("/facets", response_model=ProductFacetsResponse)
+async def get_product_facets(
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=200, description="Maximum category/brand values to return"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get category, brand, is_active and price histogram counts from the facet rollup."""
+    
+    filters = ProductFilter(
+        category=category,
+        brand=brand,
+        is_active=is_active,
+        min_price=min_price,
+        max_price=max_price
+    )
     
-    return ProductListResponse(
-        items=products,
-        total=total,
-        page=page,
+    return await db.run_sync(facet_counts, filters, limit)
+
+
+@router.get("/search", response_model=ProductSearchResponse)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor"),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Full-text search over name, brand, category and description, ranked by relevance."""
+    
+    position = None
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            position = (values.get("r"), int(values["i"]))
+        except (InvalidCursorError, KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+    
+    if db.bind.dialect.name != "postgresql":
+        # No tsvector support: fall back to unranked substring matching
+        pattern = contains_pattern(q)
+        rank = literal_column("NULL", type_=Float)
+        query = select(Product, rank).where(
+            or_(
+                Product.name.ilike(pattern, escape="\\"),
+                Product.description.ilike(pattern, escape="\\")
+            )
+        )
+        if position:
+            query = query.filter(Product.id < position[1])
+        query = query.order_by(Product.id.desc())
+    else:
+        # search_vector is a trigger-maintained column backed by a GIN index (migration 004)
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        rank = cast(func.ts_rank_cd(PRODUCT_SEARCH_VECTOR, ts_query), Float)
+        query = select(Product, rank).where(PRODUCT_SEARCH_VECTOR.op("@@")(ts_query))
+        if position:
+            # Keyset on (rank, id) descending
+            query = query.filter(tuple_(rank, Product.id) < position)
+        query = query.order_by(rank.desc(), Product.id.desc())
+    
+    if is_active is not None:
+        query = query.filter(Product.is_active == is_active)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(size + 1))).all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+    
+    items = []
+    for product, product_rank in rows:
+        item = ProductSearchResult.model_validate(product)
+        item.rank = product_rank
+        items.append(item)
+    
+    next_cursor = None
+    if has_more and rows:
+        last_product, last_rank = rows[-1]
+        next_cursor = encode_cursor({"r": last_rank, "i": last_product.id})
+    
+    return ProductSearchResponse(
+        items=items,
+        query=q,
         size=size,
-        pages=pages
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific product by ID."""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    if if_none_match:
+        # Revalidate from updated_at alone, without loading or serializing the product
+        updated_at = await db.scalar(select(Product.updated_at).where(Product.id == product_id))
+        if updated_at is not None:
+            etag = _product_etag(product_id, json_datetime(updated_at))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    
+    signature = str(product_id)
+    version, cached_body = await get_cached_response("detail", signature)
+    if cached_body is not None:
+        etag = _product_etag(product_id, orjson.loads(cached_body)["updated_at"])
+        return Response(content=cached_body, media_type="application/json", headers=validator_headers(etag))
+    
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
     
-    return product
+    body = ProductResponse.model_validate(product).model_dump_json()
+    if version is not None:
+        await set_cached_response(version, "detail", signature, body)
+    
+    etag = _product_etag(product_id, json_datetime(product.updated_at))
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag))
+
+
+def _product_etag(product_id: int, updated_at: str) -> str:
+    return make_etag("product", product_id, updated_at)
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(
+async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a product."""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # Lock the row so the facet delta is computed from the values being replaced
+    product = await db.get(Product, product_id, with_for_update=True)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -150,10 +572,12 @@ def update_product(
     
     # Check SKU uniqueness if being updated
     if product_update.sku and product_update.sku.lower() != product.sku.lower():
-        existing = db.query(Product).filter(
-            func.lower(Product.sku) == product_update.sku.lower(),
-            Product.id != product_id
-        ).first()
+        existing = await db.scalar(
+            select(Product.id).where(
+                Product.sku_normalized == product_update.sku.lower(),
+                Product.id != product_id
+            ).limit(1)
+        )
         
         if existing:
             raise HTTPException(
@@ -162,15 +586,23 @@ def update_product(
             )
     
     # Update fields
+    old_key = facet_key(product)
     update_data = product_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    db.commit()
-    db.refresh(product)
+    deltas = FacetDeltas()
+    deltas.changed(old_key, product)
+    await db.run_sync(record_facet_deltas, deltas)
+    await db.run_sync(record_product_changes, [product.id])
+    await db.commit()
+    await db.refresh(product)
+    await bump_catalog_version_async()
+    await record_suggestion_values_async([product.category], [product.brand])
     
     # Trigger webhook
-    trigger_webhook_task.delay(
+    await run_in_threadpool(
+        trigger_webhook_task.delay,
         'product.updated',
         {
             'id': product.id,
@@ -184,13 +616,14 @@ def update_product(
 
 
 @router.delete("/{product_id}")
-def delete_product(
+async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a product."""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    # Locked, so a concurrent update cannot change the facet values removed below
+    product = await db.get(Product, product_id, with_for_update=True)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -205,19 +638,30 @@ def delete_product(
         'timestamp': product.updated_at.isoformat()
     }
     
-    db.delete(product)
-    db.commit()
+    deltas = FacetDeltas()
+    deltas.removed(product)
+    await db.run_sync(record_facet_deltas, deltas)
+    await db.run_sync(record_product_changes, (), {product.id: product.sku})
+    await db.delete(product)
+    await db.commit()
+    await bump_catalog_version_async()
     
     # Trigger webhook
-    trigger_webhook_task.delay('product.deleted', product_data)
+    await run_in_threadpool(trigger_webhook_task.delay, 'product.deleted', product_data)
     
     return {"message": "Product deleted successfully"}
 
 
 @router.delete("/")
-def delete_all_products(
+async def delete_all_products(
+    response: Response,
     confirm: bool = Query(False, description="Confirm deletion of all products"),
-    db: Session = Depends(get_db)
+    mode: str = Query(
+        "truncate",
+        pattern="^(truncate|background)$",
+        description="truncate: wipe in one short transaction; background: chunked delete job"
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete all products (bulk delete)."""
     
@@ -227,18 +671,30 @@ def delete_all_products(
             detail="Please confirm deletion by setting confirm=true"
         )
     
-    # Get count before deletion
-    total_count = db.query(Product).count()
+    if mode == "background":
+        delete_job = await enqueue_delete_job(db, {})
+        response.status_code = status.HTTP_202_ACCEPTED
+        return DeleteJobResponse.model_validate(delete_job)
+    
+    try:
+        deleted_count = await _wipe_products(db)
+    except DBAPIError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Products are locked by other transactions; retry, or use mode=background"
+        )
     
-    if total_count == 0:
+    if deleted_count == 0:
+        await db.rollback()
         return {"message": "No products to delete", "deleted_count": 0}
     
-    # Delete all products
-    deleted_count = db.query(Product).delete()
-    db.commit()
+    await db.commit()
+    await bump_catalog_version_async()
     
     # Trigger webhook
-    trigger_webhook_task.delay(
+    await run_in_threadpool(
+        trigger_webhook_task.delay,
         'products.bulk_deleted',
         {
             'deleted_count': deleted_count,
@@ -252,38 +708,59 @@ def delete_all_products(
     }
 
 
+async def _wipe_products(db: AsyncSession) -> int:
+    """Empty the products table, facet rollup and change feed in the current transaction; returns the count removed."""
+    
+    if db.bind.dialect.name != "postgresql":
+        # SQLite applies its truncate optimization to an unqualified DELETE
+        result = await db.execute(delete(Product))
+        await db.run_sync(reset_facets)
+        await db.run_sync(reset_product_changes)
+        return result.rowcount
+    
+    # TRUNCATE drops the table's files instead of writing a WAL record per row.
+    # Its exclusive lock is held for milliseconds, but waiting for it would
+    # queue every other query behind us, so fail fast instead
+    await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.product_wipe_lock_timeout_ms)}"))
+    await db.execute(text("LOCK TABLE products IN ACCESS EXCLUSIVE MODE"))
+    
+    # Exact under the lock, without a count(*) over the whole table
+    deleted_count = await db.run_sync(rollup_product_count)
+    await db.execute(text("TRUNCATE TABLE products"))
+    await db.run_sync(reset_facets)
+    await db.run_sync(reset_product_changes)
+    return deleted_count
+
+
 @router.get("/search/suggestions")
-def get_search_suggestions(
+async def get_search_suggestions(
     q: str = Query(..., min_length=2),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get search suggestions for products."""
     
-    # Get SKU suggestions
-    sku_suggestions = db.query(Product.sku).filter(
-        Product.sku.ilike(f"%{q}%")
-    ).limit(10).all()
+    pattern = contains_pattern(q)
     
-    # Get name suggestions  
-    name_suggestions = db.query(Product.name).filter(
-        Product.name.ilike(f"%{q}%")
-    ).limit(10).all()
-    
-    # Get category suggestions
-    category_suggestions = db.query(Product.category).filter(
-        Product.category.ilike(f"%{q}%"),
-        Product.category.is_not(None)
-    ).distinct().limit(10).all()
-    
-    # Get brand suggestions
-    brand_suggestions = db.query(Product.brand).filter(
-        Product.brand.ilike(f"%{q}%"),
-        Product.brand.is_not(None)
-    ).distinct().limit(10).all()
+    # Get SKU and name suggestions in a single round trip
+    sku_query = select(literal("sku").label("kind"), Product.sku.label("value")).where(
+        Product.sku.ilike(pattern, escape="\\")
+    ).limit(10).subquery()
+    name_query = select(literal("name").label("kind"), Product.name.label("value")).where(
+        Product.name.ilike(pattern, escape="\\")
+    ).limit(10).subquery()
+    rows = (await db.execute(union_all(select(sku_query), select(name_query)))).all()
     
+    # Category and brand suggestions come from the in-memory value index
     return {
-        "skus": [s[0] for s in sku_suggestions],
-        "names": [n[0] for n in name_suggestions],
-        "categories": [c[0] for c in category_suggestions],
-        "brands": [b[0] for b in brand_suggestions]
-    }
\ No newline at end of file
+        "skus": [value for kind, value in rows if kind == "sku"],
+        "names": [value for kind, value in rows if kind == "name"],
+        "categories": await suggestion_index.search(db, "category", q),
+        "brands": await suggestion_index.search(db, "brand", q)
+    }
+
+
+@router.get("/cache/stats")
+async def get_product_cache_stats():
+    """Get response cache hit/miss ratios and memory usage."""
+    
+    return await get_response_cache_stats()
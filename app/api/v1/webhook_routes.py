@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ...database import get_db
-from ...models import Webhook
+from ...cache import bump_webhooks_version_async
+from ...database import get_async_db, get_async_read_db
+from ...models import Webhook, WebhookDeferredDelivery, WebhookLog, WebhookPayload
 from ...schemas import (
     WebhookCreate,
     WebhookUpdate,
     WebhookResponse,
     WebhookTestRequest,
-    WebhookTestResponse
+    WebhookTestResponse,
+    WebhookCircuitResponse,
+    WebhookLogResponse
 )
 from ...tasks.webhook_tasks import test_webhook_task
 
@@ -18,9 +23,9 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
 
 @router.post("/", response_model=WebhookResponse, status_code=status.HTTP_201_CREATED)
-def create_webhook(
+async def create_webhook(
     webhook: WebhookCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new webhook."""
     
@@ -30,32 +35,33 @@ def create_webhook(
     
     db_webhook = Webhook(**webhook_data)
     db.add(db_webhook)
-    db.commit()
-    db.refresh(db_webhook)
+    await db.commit()
+    await db.refresh(db_webhook)
+    await bump_webhooks_version_async()
     
     return db_webhook
 
 
 @router.get("/", response_model=List[WebhookResponse])
-def get_webhooks(
+async def get_webhooks(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get all webhooks."""
     
-    webhooks = db.query(Webhook).offset(skip).limit(limit).all()
-    return webhooks
+    webhooks = await db.scalars(select(Webhook).offset(skip).limit(limit))
+    return webhooks.all()
 
 
 @router.get("/{webhook_id}", response_model=WebhookResponse)
-def get_webhook(
+async def get_webhook(
     webhook_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific webhook."""
     
-    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    webhook = await db.get(Webhook, webhook_id)
     if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,14 +72,14 @@ def get_webhook(
 
 
 @router.put("/{webhook_id}", response_model=WebhookResponse)
-def update_webhook(
+async def update_webhook(
     webhook_id: int,
     webhook_update: WebhookUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a webhook."""
     
-    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    webhook = await db.get(Webhook, webhook_id)
     if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,41 +95,43 @@ def update_webhook(
     for field, value in update_data.items():
         setattr(webhook, field, value)
     
-    db.commit()
-    db.refresh(webhook)
+    await db.commit()
+    await db.refresh(webhook)
+    await bump_webhooks_version_async()
     
     return webhook
 
 
 @router.delete("/{webhook_id}")
-def delete_webhook(
+async def delete_webhook(
     webhook_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a webhook."""
     
-    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    webhook = await db.get(Webhook, webhook_id)
     if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook not found"
         )
     
-    db.delete(webhook)
-    db.commit()
+    await db.delete(webhook)
+    await db.commit()
+    await bump_webhooks_version_async()
     
     return {"message": "Webhook deleted successfully"}
 
 
 @router.post("/{webhook_id}/test", response_model=WebhookTestResponse)
-def test_webhook(
+async def test_webhook(
     webhook_id: int,
     test_request: WebhookTestRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test a webhook endpoint."""
     
-    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    webhook = await db.get(Webhook, webhook_id)
     if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,15 +146,16 @@ def test_webhook(
         )
     
     # Start test task
-    task = test_webhook_task.delay(
+    task = await run_in_threadpool(
+        test_webhook_task.delay,
         webhook_id,
         test_request.event_type,
         test_request.test_data
     )
     
-    # Wait for result (synchronous for testing)
+    # Wait for result in the threadpool so the event loop is not blocked
     try:
-        result = task.get(timeout=30)  # 30 second timeout for test
+        result = await run_in_threadpool(task.get, timeout=30)  # 30 second timeout for test
         return WebhookTestResponse(
             success=result.get('success', False),
             response_code=result.get('response_code'),
@@ -161,28 +170,66 @@ def test_webhook(
         )
 
 
-@router.get("/{webhook_id}/logs")
-def get_webhook_logs(
+@router.get("/{webhook_id}/circuit", response_model=WebhookCircuitResponse)
+async def get_webhook_circuit(
+    webhook_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a webhook's circuit breaker state and deferred deliveries."""
+    
+    webhook = await db.get(Webhook, webhook_id)
+    if not webhook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook not found"
+        )
+    
+    deferred = await db.scalar(
+        select(func.count()).select_from(WebhookDeferredDelivery).where(
+            WebhookDeferredDelivery.webhook_id == webhook_id
+        )
+    )
+    
+    return WebhookCircuitResponse(
+        webhook_id=webhook.id,
+        state=webhook.circuit_state,
+        consecutive_failures=webhook.consecutive_failures,
+        trips=webhook.circuit_trips,
+        opened_at=webhook.circuit_opened_at,
+        next_probe_at=webhook.circuit_retry_at,
+        skipped_deliveries=webhook.skipped_deliveries,
+        deferred_deliveries=deferred or 0
+    )
+
+
+@router.get("/{webhook_id}/logs", response_model=List[WebhookLogResponse])
+async def get_webhook_logs(
     webhook_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get webhook execution logs."""
     
-    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    webhook = await db.get(Webhook, webhook_id)
     if not webhook:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webhook not found"
         )
     
-    from ...models import WebhookLog
-    
-    logs = db.query(WebhookLog).filter(
-        WebhookLog.webhook_id == webhook_id
-    ).order_by(
-        WebhookLog.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    # Payloads are stored once per event; logs past retention may have lost theirs
+    rows = await db.execute(
+        select(WebhookLog, WebhookPayload.payload).outerjoin(
+            WebhookPayload, WebhookPayload.digest == WebhookLog.payload_digest
+        ).where(
+            WebhookLog.webhook_id == webhook_id
+        ).order_by(
+            WebhookLog.created_at.desc()
+        ).offset(skip).limit(limit)
+    )
     
-    return logs
\ No newline at end of file
+    return [
+        WebhookLogResponse.model_validate(log).model_copy(update={"payload": payload})
+        for log, payload in rows.all()
+    ]
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis
+import redis.asyncio
+
+from .config import settings
+
+
+# Bumped on every catalog write; cache keys embed it so stale entries are never read
+CATALOG_VERSION_KEY = "catalog:version"
+
+# Bumped on every webhook create, update or delete and circuit change; workers drop their subscription index when it changes
+WEBHOOKS_VERSION_KEY = "webhooks:version"
+
+# Response cache bookkeeping: insertion-ordered key index and hit/miss counters
+RESPONSE_CACHE_PREFIX = "products:resp"
+RESPONSE_CACHE_INDEX_KEY = "products:resp:index"
+RESPONSE_CACHE_STATS_KEY = "products:resp:stats"
+
+# Resolve the catalog version, read the entry and count the hit or miss in one round trip
+_GET_RESPONSE_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local value = redis.call('GET', ARGV[1] .. ':' .. version .. ':' .. ARGV[2])
+if value then
+    redis.call('HINCRBY', KEYS[2], ARGV[3] .. ':hits', 1)
+else
+    redis.call('HINCRBY', KEYS[2], ARGV[3] .. ':misses', 1)
+end
+return {version, value}
+"""
+
+_redis_client: Optional[redis.Redis] = None
+_async_redis_client: Optional[redis.asyncio.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the shared Redis client used for caching (workers and sync code)."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.cache_socket_timeout,
+            socket_connect_timeout=settings.cache_socket_timeout
+        )
+    return _redis_client
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """Return the shared asyncio Redis client used by the API layer."""
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = redis.asyncio.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.cache_socket_timeout,
+            socket_connect_timeout=settings.cache_socket_timeout
+        )
+    return _async_redis_client
+
+
+def filter_signature(filters: Dict[str, Any], case_sensitive: Iterable[str] = ()) -> str:
+    """Build a stable hash for a set of query filters."""
+    normalized = {}
+    for key, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, str) and key not in case_sensitive:
+            # Text filters are case-insensitive, so normalize them
+            value = value.strip().lower()
+        normalized[key] = value
+
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def get_catalog_version() -> Optional[int]:
+    """Get the current catalog version, or None if Redis is unavailable."""
+    try:
+        return int(await get_async_redis().get(CATALOG_VERSION_KEY) or 0)
+    except redis.RedisError:
+        return None
+
+
+def bump_catalog_version() -> None:
+    """Invalidate all catalog-derived cache entries."""
+    try:
+        get_redis().incr(CATALOG_VERSION_KEY)
+    except redis.RedisError as e:
+        print(f"Failed to bump catalog version: {e}")
+
+
+async def bump_catalog_version_async() -> None:
+    """Async variant of bump_catalog_version for the API layer."""
+    try:
+        await get_async_redis().incr(CATALOG_VERSION_KEY)
+    except redis.RedisError as e:
+        print(f"Failed to bump catalog version: {e}")
+
+
+def get_webhooks_version() -> Optional[int]:
+    """Get the current webhooks version, or None if Redis is unavailable."""
+    try:
+        return int(get_redis().get(WEBHOOKS_VERSION_KEY) or 0)
+    except redis.RedisError:
+        return None
+
+
+def bump_webhooks_version() -> None:
+    """Invalidate the webhook subscription index in every worker."""
+    try:
+        get_redis().incr(WEBHOOKS_VERSION_KEY)
+    except redis.RedisError as e:
+        print(f"Failed to bump webhooks version: {e}")
+
+
+async def bump_webhooks_version_async() -> None:
+    """Async variant of bump_webhooks_version for the API layer."""
+    try:
+        await get_async_redis().incr(WEBHOOKS_VERSION_KEY)
+    except redis.RedisError as e:
+        print(f"Failed to bump webhooks version: {e}")
+
+
+async def get_cached_count(version: int, signature: str) -> Optional[int]:
+    """Get a cached listing count for a catalog version."""
+    try:
+        value = await get_async_redis().get(f"products:count:{version}:{signature}")
+    except redis.RedisError:
+        return None
+
+    return int(value) if value is not None else None
+
+
+async def set_cached_count(version: int, signature: str, total: int, ttl: Optional[int] = None) -> None:
+    """Cache a listing count for the catalog version it was computed against."""
+    try:
+        await get_async_redis().set(
+            f"products:count:{version}:{signature}",
+            total,
+            ex=ttl or settings.product_count_cache_ttl
+        )
+    except redis.RedisError:
+        pass
+
+
+async def get_cached_response(namespace: str, signature: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Look up a cached response body for the current catalog version.
+
+    Returns (version, body); body is None on a miss (always, when the cache
+    is disabled) and version is None when Redis is unavailable, in which case
+    the caller should not cache.
+    """
+    if not settings.response_cache_enabled:
+        return await get_catalog_version(), None
+
+    try:
+        version, body = await get_async_redis().eval(
+            _GET_RESPONSE_SCRIPT,
+            2,
+            CATALOG_VERSION_KEY,
+            RESPONSE_CACHE_STATS_KEY,
+            f"{RESPONSE_CACHE_PREFIX}:{namespace}",
+            signature,
+            namespace
+        )
+    except redis.RedisError:
+        return None, None
+
+    return int(version), body
+
+
+async def set_cached_response(version: int, namespace: str, signature: str, body: str, ttl: Optional[int] = None) -> None:
+    """Cache a response body under the catalog version it was computed against."""
+    if not settings.response_cache_enabled or len(body) > settings.response_cache_max_entry_bytes:
+        return
+
+    key = f"{RESPONSE_CACHE_PREFIX}:{namespace}:{version}:{signature}"
+    try:
+        client = get_async_redis()
+        pipe = client.pipeline()
+        pipe.set(key, body, ex=ttl or settings.response_cache_ttl)
+        pipe.zadd(RESPONSE_CACHE_INDEX_KEY, {key: time.time()})
+        pipe.zcard(RESPONSE_CACHE_INDEX_KEY)
+        entries = (await pipe.execute())[-1]
+
+        # Enforce the entry bound by evicting the oldest entries
+        overflow = entries - settings.response_cache_max_entries
+        if overflow > 0:
+            evicted = [member for member, _ in await client.zpopmin(RESPONSE_CACHE_INDEX_KEY, overflow)]
+            if evicted:
+                await client.delete(*evicted)
+    except redis.RedisError:
+        pass
+
+
+async def get_response_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters per namespace plus entry count and memory usage."""
+    try:
+        client = get_async_redis()
+        counters = await client.hgetall(RESPONSE_CACHE_STATS_KEY)
+        # Drop index members whose entries have already expired
+        await client.zremrangebyscore(RESPONSE_CACHE_INDEX_KEY, 0, time.time() - settings.response_cache_ttl)
+        keys = await client.zrange(RESPONSE_CACHE_INDEX_KEY, 0, -1)
+
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.strlen(key)
+        usage = [size for size in await pipe.execute() if size]
+
+        try:
+            redis_memory = (await client.info("memory")).get("used_memory")
+        except redis.ResponseError:
+            redis_memory = None  # INFO may be disabled on managed Redis
+    except redis.RedisError as e:
+        return {"available": False, "error": str(e)}
+
+    namespaces = {}
+    for field, value in counters.items():
+        namespace, counter = field.rsplit(":", 1)
+        namespaces.setdefault(namespace, {"hits": 0, "misses": 0})[counter] = int(value)
+    for stats in namespaces.values():
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+
+    return {
+        "available": True,
+        "namespaces": namespaces,
+        "entries": len(usage),
+        "payload_bytes": sum(usage),
+        "redis_used_memory_bytes": redis_memory,
+        "ttl_seconds": settings.response_cache_ttl,
+        "max_entries": settings.response_cache_max_entries,
+        "max_entry_bytes": settings.response_cache_max_entry_bytes,
+    }
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
 from .config import settings
 
 # Create Celery instance
@@ -25,5 +26,66 @@ celery_app.conf.update(
     task_routes={
         'app.tasks.import_csv_task': {'queue': 'import_queue'},
         'app.tasks.send_webhook_task': {'queue': 'webhook_queue'},
+    },
+    beat_schedule={
+        # Keep the facet rollup within a few seconds of the products table
+        'refresh-product-facets': {
+            'task': 'app.tasks.facet_tasks.refresh_product_facets_task',
+            'schedule': settings.facet_refresh_interval_seconds,
+        },
+        # Drop deleted category/brand values from the suggestion sets
+        'rebuild-suggestion-index': {
+            'task': 'app.tasks.suggestion_tasks.rebuild_suggestion_index_task',
+            'schedule': settings.suggestion_index_rebuild_seconds,
+        },
+        # Sequence logged product writes into the /products/changes feed
+        'fold-product-changes': {
+            'task': 'app.tasks.change_feed_tasks.fold_product_changes_task',
+            'schedule': settings.change_feed_fold_interval_seconds,
+        },
+        # Deliver webhook batches whose window has elapsed
+        'flush-webhook-batches': {
+            'task': 'app.tasks.webhook_tasks.flush_due_webhook_batches_task',
+            'schedule': settings.webhook_batch_flush_interval_seconds,
+        },
+        # Probe webhooks whose circuit is due to half-open and replay deferred deliveries
+        'check-webhook-circuits': {
+            'task': 'app.tasks.webhook_tasks.check_webhook_circuits_task',
+            'schedule': settings.webhook_circuit_check_interval_seconds,
+        },
+        # Keep webhook log partitions ahead of time and drop those past retention
+        'maintain-webhook-logs': {
+            'task': 'app.tasks.webhook_tasks.maintain_webhook_logs_task',
+            'schedule': settings.webhook_log_maintenance_interval_seconds,
+        },
     }
-)
\ No newline at end of file
+)
+
+@worker_process_init.connect
+def reset_database_pools(**kwargs):
+    """Forked worker children must not share the parent's pooled connections."""
+    from .database import engine
+    engine.dispose(close=False)
+
+
+@worker_init.connect
+@worker_process_init.connect
+def open_webhook_http_client(**kwargs):
+    """Each worker process delivers webhooks over its own pooled keep-alive client."""
+    from .webhook_http import open_webhook_client
+    open_webhook_client()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def flush_webhook_log_buffer(**kwargs):
+    """Write the delivery logs this worker process still holds."""
+    from .webhook_logs import webhook_log_buffer
+    webhook_log_buffer.flush()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_webhook_http_client(**kwargs):
+    from .webhook_http import close_webhook_client
+    close_webhook_client()
@@ -0,0 +1,184 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, false, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Product, ProductChange, ProductChangeLog, ProductChangeState
+
+STATE_ID = 1
+
+
+def record_product_changes(
+    db: Session,
+    changed: Iterable[int] = (),
+    deleted: Optional[Dict[int, str]] = None
+) -> None:
+    """Log changed product ids and deleted {id: sku} in the caller's transaction (commit is left to the caller)."""
+    rows = [{"product_id": product_id, "deleted": False, "sku": None} for product_id in changed]
+    rows += [{"product_id": product_id, "deleted": True, "sku": sku} for product_id, sku in (deleted or {}).items()]
+    if rows:
+        db.execute(insert(ProductChangeLog), rows)
+
+
+def _lock_state(db: Session) -> ProductChangeState:
+    """Lock the state row so only one fold runs at a time; seed the feed if it never was."""
+    state = db.scalar(select(ProductChangeState).where(ProductChangeState.id == STATE_ID).with_for_update())
+    if state is None:
+        state = ProductChangeState(id=STATE_ID, last_seq=0, reset_seq=0)
+        db.add(state)
+        db.flush()
+        _seed(db, state)
+    return state
+
+
+def _seed(db: Session, state: ProductChangeState) -> None:
+    """Start the feed with every existing product, sequenced by id."""
+    db.execute(
+        insert(ProductChange).from_select(
+            ["product_id", "seq", "deleted", "changed_at"],
+            select(Product.id, Product.id, false(), func.coalesce(Product.updated_at, func.now()))
+        )
+    )
+    state.last_seq = db.scalar(select(func.max(ProductChange.seq))) or 0
+
+
+def _upsert(db: Session):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def fold_product_changes(db: Session) -> int:
+    """
+    Sequence logged changes into the feed and return how many log rows were folded.
+    
+    Folds are serialized on the state row and only see committed log rows,
+    so a change that commits later always gets a higher seq than every
+    change already readable from the feed: a reader holding a cursor never
+    misses a change that lands behind it.
+    """
+    folded = 0
+    chunk_size = settings.change_feed_fold_chunk_size
+    while True:
+        state = _lock_state(db)
+        
+        oldest = select(ProductChangeLog.id).order_by(ProductChangeLog.id).limit(chunk_size)
+        rows = db.execute(
+            delete(ProductChangeLog)
+            .where(ProductChangeLog.id.in_(oldest.scalar_subquery()))
+            .returning(
+                ProductChangeLog.id,
+                ProductChangeLog.product_id,
+                ProductChangeLog.deleted,
+                ProductChangeLog.sku,
+                ProductChangeLog.created_at
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        # One feed row per product: its latest change, at its latest position
+        latest: Dict[int, Any] = {}
+        for row in sorted(rows, key=lambda row: row.id):
+            latest.pop(row.product_id, None)
+            latest[row.product_id] = row
+        
+        values = []
+        for product_id, row in latest.items():
+            state.last_seq += 1
+            values.append({
+                "product_id": product_id,
+                "seq": state.last_seq,
+                "deleted": row.deleted,
+                "sku": row.sku,
+                "changed_at": row.created_at or datetime.now(timezone.utc)
+            })
+        if values:
+            statement = _upsert(db)(ProductChange)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["product_id"],
+                    set_={
+                        "seq": statement.excluded.seq,
+                        "deleted": statement.excluded.deleted,
+                        "sku": statement.excluded.sku,
+                        "changed_at": statement.excluded.changed_at
+                    }
+                ),
+                values
+            )
+        
+        state.folded_at = func.now()
+        db.commit()
+        folded += len(rows)
+        if len(rows) < chunk_size:
+            return folded
+
+
+def reset_product_changes(db: Session) -> None:
+    """
+    Empty the feed in the caller's transaction, e.g. alongside deleting every
+    product; cursors from before the reset are answered with reset=true.
+    """
+    state = _lock_state(db)
+    if db.bind.dialect.name == "postgresql":
+        db.execute(text("TRUNCATE TABLE product_changes, product_change_log"))
+    else:
+        db.execute(delete(ProductChangeLog))
+        db.execute(delete(ProductChange))
+    state.last_seq += 1
+    state.reset_seq = state.last_seq
+    state.folded_at = func.now()
+
+
+def read_product_changes(db: Session, since: int, limit: int) -> Dict[str, Any]:
+    """One page of the feed after the cursor, with each changed product's current values."""
+    reset_seq = db.scalar(select(ProductChangeState.reset_seq).where(ProductChangeState.id == STATE_ID)) or 0
+    
+    # A cursor from before a wipe has missed deletes the feed no longer holds:
+    # replay everything, flagged so the consumer drops its copy first
+    reset = 0 < since < reset_seq
+    if reset:
+        since = 0
+    
+    rows = db.execute(
+        select(ProductChange, Product)
+        .outerjoin(Product, Product.id == ProductChange.product_id)
+        .where(ProductChange.seq > since)
+        .order_by(ProductChange.seq)
+        .limit(limit + 1)
+    ).all()
+    page = rows[:limit]
+    
+    items = []
+    for change, product in page:
+        # A product deleted after this entry was folded reads as a tombstone
+        # now; its own tombstone follows later in the feed
+        deleted = change.deleted or product is None
+        items.append({
+            "seq": change.seq,
+            "id": change.product_id,
+            "sku": product.sku if product is not None else change.sku,
+            "deleted": deleted,
+            "changed_at": change.changed_at,
+            "product": None if deleted else product
+        })
+    
+    oldest = db.scalar(select(func.min(ProductChangeLog.created_at)))
+    return {
+        "items": items,
+        "next_since": page[-1][0].seq if page else since,
+        "has_more": len(rows) > limit,
+        "reset": reset,
+        "lag_seconds": _age_seconds(oldest)
+    }
+
+
+def _age_seconds(timestamp: Optional[datetime]) -> float:
+    """Seconds since the oldest unfolded change, i.e. how far the feed trails writes."""
+    if timestamp is None:
+        return 0.0
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+    return max((datetime.now(timezone.utc) - timestamp).total_seconds(), 0.0)
@@ -1,19 +1,99 @@
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_pool import engine_options, instrument_engine
+
+
+def _pool_options(name: str, database_url: str, is_async: bool) -> dict:
+    """Pool settings for this process's role (PROCESS_ROLE), with any overrides."""
+    return engine_options(
+        name,
+        database_url,
+        settings.process_role,
+        is_async,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pre_ping=settings.db_pool_pre_ping,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pgbouncer=settings.db_pgbouncer
+    )
+
+
+def _create_async_engine(name: str, database_url: str):
+    options = _pool_options(name, database_url, is_async=True)
+    async_engine = create_async_engine(database_url, echo=settings.debug, **options)
+    instrument_engine(async_engine.sync_engine, options, settings.db_pool_report_interval_seconds)
+    return async_engine
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+_engine_options = _pool_options("primary", settings.database_url, is_async=False)
+engine = create_engine(settings.database_url, echo=settings.debug, **_engine_options)
+instrument_engine(engine, _engine_options, settings.db_pool_report_interval_seconds)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(database_url: str) -> str:
+    """Derive the async driver URL (asyncpg / aiosqlite) from a sync database URL."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    
+    if backend == "postgresql":
+        # asyncpg takes "ssl" instead of libpq's "sslmode"
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine and session factory for the API layer; Celery workers keep
+# using the sync SessionLocal above
+async_engine = _create_async_engine(
+    "primary_async",
+    settings.async_database_url or get_async_database_url(settings.database_url)
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Optional read replica for read-only endpoints; without one, reads use the primary
+if settings.read_replica_url or settings.async_read_replica_url:
+    async_read_engine = _create_async_engine(
+        "replica_async",
+        settings.async_read_replica_url or get_async_database_url(settings.read_replica_url)
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+        info={"replica": True}
+    )
+else:
+    async_read_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+# Set on successful writes; while it is in the future the client reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+CONSISTENCY_HEADER = "x-consistency"
+
 # Create base model class
 Base = declarative_base()
 
@@ -27,4 +107,39 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Async database dependency for FastAPI."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def has_read_replica() -> bool:
+    return AsyncReadSessionLocal is not AsyncSessionLocal
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """Whether a session reads from the replica, whose data may lag the primary."""
+    return db.info.get("replica", False)
+
+
+def needs_primary(request: Request) -> bool:
+    """
+    Read-your-writes escape hatch: route a read to the primary when the caller
+    asks for ``X-Consistency: strong`` or wrote recently (read_primary_until cookie).
+    """
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "strong":
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_async_read_db(request: Request):
+    """Async database dependency for read-only endpoints (replica when configured)."""
+    session_factory = AsyncSessionLocal if needs_primary(request) else AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    """Connection pool sizing for one kind of process."""
+    pool_size: int
+    max_overflow: int
+    pre_ping: bool
+
+
+# Per-process limits; budget Postgres max_connections as the sum over running
+# processes of (pool_size + max_overflow) for each engine the process uses
+POOL_PROFILES = {
+    # Many short checkouts per request: keep connections warm, skip the ping
+    # round trip (pool_recycle retires connections before server timeouts)
+    "web": PoolProfile(pool_size=10, max_overflow=10, pre_ping=False),
+    # Solo pool, one import at a time; idle for long stretches between tasks
+    "import_worker": PoolProfile(pool_size=2, max_overflow=1, pre_ping=True),
+    "webhook_worker": PoolProfile(pool_size=2, max_overflow=2, pre_ping=True),
+}
+
+
+class PoolTelemetry:
+    """Checkout wait, saturation and connection churn counters for one pool (per process)."""
+
+    def __init__(self, name: str, capacity: Optional[int]):
+        self.name = name
+        self.capacity = capacity  # None for NullPool (PgBouncer mode)
+        self._lock = threading.Lock()
+        self._reported_at = time.monotonic()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_close(self) -> None:
+        with self._lock:
+            self.closes += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "capacity": self.capacity,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "saturation": round(self.checked_out / self.capacity, 3) if self.capacity else None,
+                "peak_saturation": round(self.peak_checked_out / self.capacity, 3) if self.capacity else None,
+                "checkouts": self.checkouts,
+                "checkout_wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "checkout_timeouts": self.timeouts,
+                "connections_opened": self.connects,
+                "connections_closed": self.closes,
+                "connections_invalidated": self.invalidations,
+            }
+
+    def report_if_due(self, interval_seconds: float) -> None:
+        """Log a one-line summary at INFO at most once per interval (0 disables)."""
+        if interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._reported_at < interval_seconds:
+                return
+            self._reported_at = now
+        stats = self.snapshot()
+        logger.info(
+            "DB pool %s: %s/%s checked out (peak %s), wait avg %sms max %sms, timeouts %s, opened %s, closed %s",
+            stats['name'], stats['checked_out'], stats['capacity'] or '-', stats['peak_checked_out'],
+            stats['checkout_wait_ms_avg'], stats['checkout_wait_ms_max'], stats['checkout_timeouts'],
+            stats['connections_opened'], stats['connections_closed']
+        )
+
+
+# Telemetry per pool logging name, which survives pool re-creation on engine.dispose()
+pool_telemetry: Dict[str, PoolTelemetry] = {}
+
+
+class _TimedCheckout:
+    """Pool mixin timing Pool.connect(): queueing for a slot, pre-ping and any new connection."""
+
+    def connect(self):
+        telemetry = pool_telemetry.get(self.logging_name)
+        if telemetry is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            telemetry.record_timeout()
+            raise
+        telemetry.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def engine_options(
+    name: str,
+    database_url: str,
+    role: str,
+    is_async: bool,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pre_ping: Optional[bool] = None,
+    pool_timeout: float = 10.0,
+    pool_recycle: int = 1800,
+    pgbouncer: bool = False
+) -> Dict[str, Any]:
+    """create_engine keyword arguments for a process role; explicit values override the profile."""
+    if role not in POOL_PROFILES:
+        raise ValueError(f"Unknown process role '{role}'. Valid roles: {', '.join(POOL_PROFILES)}")
+    profile = POOL_PROFILES[role]
+    options: Dict[str, Any] = {"pool_logging_name": name}
+
+    if pgbouncer and make_url(database_url).get_backend_name() == "postgresql":
+        # Transaction pooling: PgBouncer owns the pool, and a server connection
+        # may change between transactions, so asyncpg must not reuse named
+        # prepared statements
+        options["poolclass"] = InstrumentedNullPool
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=profile.pool_size if pool_size is None else pool_size,
+        max_overflow=profile.max_overflow if max_overflow is None else max_overflow,
+        pool_pre_ping=profile.pre_ping if pre_ping is None else pre_ping,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+    )
+    return options
+
+
+def instrument_engine(engine, options: Dict[str, Any], report_interval_seconds: float = 0) -> PoolTelemetry:
+    """
+    Attach telemetry to an engine created with ``options`` from engine_options()
+    (pass async_engine.sync_engine for async engines).
+    """
+    name = options["pool_logging_name"]
+    capacity = options["pool_size"] + max(options["max_overflow"], 0) if "pool_size" in options else None
+    telemetry = pool_telemetry[name] = PoolTelemetry(name, capacity)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        telemetry.record_connect()
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        telemetry.record_close()
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        telemetry.record_invalidation()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        telemetry.record_checkin()
+        telemetry.report_if_due(report_interval_seconds)
+
+    return telemetry
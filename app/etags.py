@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+# Clients may keep responses but must revalidate them with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from validator parts (versions, timestamps, query signatures)."""
+    raw = ":".join(str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def validator_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag))
@@ -0,0 +1,178 @@
+import asyncio
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence, Tuple
+
+from sqlalchemy import select
+
+from .config import settings
+from .database import AsyncReadSessionLocal, AsyncSessionLocal
+from .filters import apply_product_filters
+from .models import Product
+from .schemas import ProductFilter
+
+
+EXPORT_COLUMNS = (
+    "id", "sku", "name", "description", "price", "category", "brand",
+    "inventory_count", "is_active", "created_at", "updated_at"
+)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def export_media(export_format: str, compress: bool) -> Tuple[str, str]:
+    """Return (media type, filename) for an export download."""
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"products-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{extension}"
+    if compress and export_format != "parquet":
+        return "application/gzip", f"{filename}.gz"
+    return media_type, filename
+
+
+async def stream_products_export(
+    filters: ProductFilter,
+    export_format: str,
+    compress: bool = False,
+    primary: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Stream matching products in id order as CSV, NDJSON or Parquet.
+
+    Rows come from a server-side cursor in batches of ``export_batch_size``
+    and are encoded batch by batch, so memory stays flat however large the
+    catalog is. ``compress`` gzips CSV/NDJSON on the fly; Parquet row groups
+    are compressed by the Parquet writer itself (gzip codec instead of snappy).
+    Rows are read from the replica when one is configured, unless ``primary``.
+    """
+    batches = _fetch_batches(filters, AsyncSessionLocal if primary else AsyncReadSessionLocal)
+
+    if export_format == "parquet":
+        async for chunk in _encode_parquet(batches, "gzip" if compress else "snappy"):
+            yield chunk
+        return
+
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(settings.export_gzip_level, zlib.DEFLATED, 31) if compress else None
+
+    first = True
+    async for rows in batches:
+        chunk = encode(rows, header=first)
+        first = False
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+
+    if first and export_format == "csv":
+        # No rows: still emit the header
+        chunk = encode([], header=True)
+        yield compressor.compress(chunk) if compressor else chunk
+    if compressor:
+        yield compressor.flush()
+
+
+async def _fetch_batches(filters: ProductFilter, session_factory) -> AsyncIterator[Sequence[tuple]]:
+    """Yield row tuples from a server-side cursor ordered by primary key."""
+    columns = [getattr(Product, column) for column in EXPORT_COLUMNS]
+    query = apply_product_filters(select(*columns), filters).order_by(Product.id)
+
+    # Own session: the stream outlives the request handler's dependencies
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.export_batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode_csv(rows: Sequence[tuple], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows: Sequence[tuple], header: bool = False) -> bytes:
+    lines = [json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_plain) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are handed out after each row group."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def _encode_parquet(batches: AsyncIterator[Sequence[tuple]], compression: str) -> AsyncIterator[bytes]:
+    # Imported lazily: pyarrow is only needed for Parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("sku", pa.string()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("price", pa.float64()),
+        ("category", pa.string()),
+        ("brand", pa.string()),
+        ("inventory_count", pa.int64()),
+        ("is_active", pa.bool_()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+    ])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+
+    def write_row_group(rows: List[tuple]) -> bytes:
+        columns = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+        writer.write_table(table)
+        return sink.drain()
+
+    # Buffer cursor batches up to one row group; encoding runs off the event loop
+    pending: List[tuple] = []
+    async for rows in batches:
+        pending.extend(rows)
+        if len(pending) >= settings.export_parquet_row_group_size:
+            yield await asyncio.to_thread(write_row_group, pending)
+            pending = []
+    if pending:
+        yield await asyncio.to_thread(write_row_group, pending)
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,258 @@
+import bisect
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .filters import contains_pattern
+from .models import Product, ProductFacetCount, ProductFacetDelta, ProductFacetState
+from .schemas import ProductFilter
+
+
+# Lower edges of the price histogram buckets (1-2-5 series); the last bucket is open-ended
+PRICE_BUCKET_EDGES = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+NO_PRICE_BUCKET = -1
+
+STATE_ID = 1
+
+FacetKey = Tuple[str, str, bool, int]
+
+
+def price_bucket(price: Optional[float]) -> int:
+    """Histogram bucket index for a price."""
+    if price is None:
+        return NO_PRICE_BUCKET
+    return max(bisect.bisect_right(PRICE_BUCKET_EDGES, price) - 1, 0)
+
+
+def price_bucket_expression(price_column):
+    """SQL equivalent of price_bucket() for set-based rebuilds and deltas."""
+    whens = [(price_column < edge, index) for index, edge in enumerate(PRICE_BUCKET_EDGES[1:])]
+    return case(
+        (price_column.is_(None), NO_PRICE_BUCKET),
+        *whens,
+        else_=len(PRICE_BUCKET_EDGES) - 1
+    )
+
+
+def facet_key(product: Any) -> FacetKey:
+    """Rollup key of a product (ORM object, row or dict with the facet columns)."""
+    if isinstance(product, dict):
+        values = product
+    else:
+        values = {column: getattr(product, column) for column in ("category", "brand", "is_active", "price")}
+
+    is_active = values.get("is_active")
+    return (
+        values.get("category") or "",
+        values.get("brand") or "",
+        True if is_active is None else bool(is_active),
+        price_bucket(values.get("price"))
+    )
+
+
+class FacetDeltas:
+    """Net rollup count changes accumulated for one transaction."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+
+    def added(self, product: Any) -> None:
+        self._counts[facet_key(product)] += 1
+
+    def removed(self, product: Any) -> None:
+        self._counts[facet_key(product)] -= 1
+
+    def changed(self, old_key: FacetKey, product: Any) -> None:
+        new_key = facet_key(product)
+        if new_key != old_key:
+            self._counts[old_key] -= 1
+            self._counts[new_key] += 1
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"category": category, "brand": brand, "is_active": is_active, "price_bucket": bucket, "delta": delta}
+            for (category, brand, is_active, bucket), delta in self._counts.items()
+            if delta
+        ]
+
+
+def record_facet_deltas(db: Session, deltas: FacetDeltas) -> None:
+    """Queue rollup changes in the caller's transaction (commit is left to the caller)."""
+    rows = deltas.rows()
+    if rows:
+        db.execute(insert(ProductFacetDelta), rows)
+
+
+def _lock_state(db: Session) -> ProductFacetState:
+    """Lock the state row so only one fold/rebuild runs at a time; build the rollup if it never was."""
+    state = db.scalar(select(ProductFacetState).where(ProductFacetState.id == STATE_ID).with_for_update())
+    if state is None:
+        state = ProductFacetState(id=STATE_ID)
+        db.add(state)
+        db.flush()
+        _rebuild(db)
+    return state
+
+
+def _rebuild(db: Session) -> None:
+    bucket = price_bucket_expression(Product.price)
+    category = func.coalesce(Product.category, "")
+    brand = func.coalesce(Product.brand, "")
+    db.execute(delete(ProductFacetDelta))
+    db.execute(delete(ProductFacetCount))
+    db.execute(
+        insert(ProductFacetCount).from_select(
+            ["category", "brand", "is_active", "price_bucket", "product_count"],
+            select(category, brand, Product.is_active, bucket, func.count())
+            .group_by(category, brand, Product.is_active, bucket)
+        )
+    )
+
+
+def _upsert(db: Session):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def fold_facet_deltas(db: Session) -> int:
+    """Apply pending deltas to the rollup and return how many delta rows were folded."""
+    state = _lock_state(db)
+
+    # Delete-and-return so exactly the rows we count are consumed, even if
+    # transactions with lower ids commit while we run
+    folded = db.execute(
+        delete(ProductFacetDelta).returning(
+            ProductFacetDelta.category,
+            ProductFacetDelta.brand,
+            ProductFacetDelta.is_active,
+            ProductFacetDelta.price_bucket,
+            ProductFacetDelta.delta
+        )
+    ).all()
+
+    totals: Counter = Counter()
+    for category, brand, is_active, bucket, delta in folded:
+        totals[(category, brand, is_active, bucket)] += delta
+
+    rows = [
+        {"category": category, "brand": brand, "is_active": is_active, "price_bucket": bucket, "product_count": count}
+        for (category, brand, is_active, bucket), count in totals.items()
+        if count
+    ]
+    if rows:
+        statement = _upsert(db)(ProductFacetCount)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["category", "brand", "is_active", "price_bucket"],
+                set_={"product_count": ProductFacetCount.product_count + statement.excluded.product_count}
+            ),
+            rows
+        )
+        db.execute(delete(ProductFacetCount).where(ProductFacetCount.product_count <= 0))
+
+    state.folded_at = func.now()
+    db.commit()
+    return len(folded)
+
+
+def rebuild_facets(db: Session) -> None:
+    """Recompute the rollup from the products table (repair; best run while imports are idle)."""
+    state = _lock_state(db)
+    _rebuild(db)
+    state.folded_at = func.now()
+    db.commit()
+
+
+def reset_facets(db: Session) -> None:
+    """Empty the rollup in the caller's transaction, e.g. alongside deleting every product."""
+    state = _lock_state(db)
+    db.execute(delete(ProductFacetDelta))
+    db.execute(delete(ProductFacetCount))
+    state.folded_at = func.now()
+
+
+def rollup_product_count(db: Session) -> int:
+    """
+    Product count from the rollup plus pending deltas.
+
+    Deltas commit with the writes they describe, so this is exact whenever no
+    product write is in flight (e.g. under a table lock) and far cheaper than
+    count(*) on a large table.
+    """
+    counted = db.scalar(select(func.coalesce(func.sum(ProductFacetCount.product_count), 0)))
+    pending = db.scalar(select(func.coalesce(func.sum(ProductFacetDelta.delta), 0)))
+    return int(counted + pending)
+
+
+def facet_counts(db: Session, filters: ProductFilter, limit: int = 20) -> Dict[str, Any]:
+    """Facet counts for products matching the filters, read from the rollup table."""
+    conditions = []
+    if filters.category:
+        conditions.append(ProductFacetCount.category.ilike(contains_pattern(filters.category), escape="\\"))
+    if filters.brand:
+        conditions.append(ProductFacetCount.brand.ilike(contains_pattern(filters.brand), escape="\\"))
+    if filters.is_active is not None:
+        conditions.append(ProductFacetCount.is_active == filters.is_active)
+
+    # Price filters widen to whole buckets: the rollup cannot split them
+    price_range = None
+    if filters.min_price is not None or filters.max_price is not None:
+        low = price_bucket(filters.min_price or 0)
+        high = price_bucket(filters.max_price) if filters.max_price is not None else len(PRICE_BUCKET_EDGES) - 1
+        conditions.append(ProductFacetCount.price_bucket.between(low, high))
+        price_range = _bucket_bounds(low)[0], _bucket_bounds(high)[1]
+
+    def grouped(column, order_by_count: bool = True):
+        total = func.sum(ProductFacetCount.product_count)
+        query = select(column, total).where(*conditions).group_by(column)
+        query = query.order_by(total.desc(), column) if order_by_count else query.order_by(column)
+        return db.execute(query).all()
+
+    categories = grouped(ProductFacetCount.category)
+    price_rows = grouped(ProductFacetCount.price_bucket, order_by_count=False)
+
+    pending, oldest = db.execute(
+        select(func.count(ProductFacetDelta.id), func.min(ProductFacetDelta.created_at))
+    ).one()
+    folded_at = db.scalar(select(ProductFacetState.folded_at).where(ProductFacetState.id == STATE_ID))
+
+    return {
+        "total": sum(count for _, count in categories),
+        "category": _values(categories[:limit]),
+        "brand": _values(grouped(ProductFacetCount.brand)[:limit]),
+        "is_active": [{"value": value, "count": count} for value, count in grouped(ProductFacetCount.is_active)],
+        "price": [
+            {"min": low, "max": high, "count": count}
+            for bucket, count in price_rows
+            if bucket != NO_PRICE_BUCKET
+            for low, high in [_bucket_bounds(bucket)]
+        ],
+        "price_unknown": sum(count for bucket, count in price_rows if bucket == NO_PRICE_BUCKET),
+        "price_range_applied": list(price_range) if price_range else None,
+        "as_of": folded_at,
+        "pending_deltas": pending,
+        "lag_seconds": _age_seconds(oldest),
+    }
+
+
+def _values(rows) -> List[Dict[str, Any]]:
+    return [{"value": value or None, "count": count} for value, count in rows]
+
+
+def _bucket_bounds(bucket: int) -> Tuple[float, Optional[float]]:
+    low = PRICE_BUCKET_EDGES[bucket]
+    high = PRICE_BUCKET_EDGES[bucket + 1] if bucket + 1 < len(PRICE_BUCKET_EDGES) else None
+    return low, high
+
+
+def _age_seconds(timestamp: Optional[datetime]) -> float:
+    """Seconds since the oldest unfolded delta, i.e. how stale the rollup is."""
+    if timestamp is None:
+        return 0.0
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+    return max((datetime.now(timezone.utc) - timestamp).total_seconds(), 0.0)
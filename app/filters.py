@@ -0,0 +1,40 @@
+from .models import Product
+from .schemas import ProductFilter
+
+
+def contains_pattern(value: str) -> str:
+    """Build an ILIKE substring pattern with LIKE wildcards in the value escaped.
+
+    Plain ``column ILIKE '%value%'`` on the raw column is what the pg_trgm GIN
+    indexes from migration 003 can serve; wrapping the column in a function
+    (e.g. lower()) would hide it from the planner.
+    """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def apply_product_filters(query, filters: ProductFilter):
+    """Apply listing filters to a Product query or select statement."""
+
+    if filters.sku:
+        query = query.filter(Product.sku.ilike(contains_pattern(filters.sku), escape="\\"))
+
+    if filters.name:
+        query = query.filter(Product.name.ilike(contains_pattern(filters.name), escape="\\"))
+
+    if filters.category:
+        query = query.filter(Product.category.ilike(contains_pattern(filters.category), escape="\\"))
+
+    if filters.brand:
+        query = query.filter(Product.brand.ilike(contains_pattern(filters.brand), escape="\\"))
+
+    if filters.is_active is not None:
+        query = query.filter(Product.is_active == filters.is_active)
+
+    if filters.min_price is not None:
+        query = query.filter(Product.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        query = query.filter(Product.price <= filters.max_price)
+
+    return query
@@ -0,0 +1,217 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, func, select, update
+
+from .cache import bump_catalog_version_async
+from .change_feed import record_product_changes
+from .config import settings
+from .database import AsyncSessionLocal
+from .models import Product
+from .tasks.webhook_tasks import trigger_webhook_task
+
+# Keep IN lists well below driver and SQLite bound-parameter limits
+LOOKUP_CHUNK_SIZE = 500
+
+
+@dataclass
+class InventoryOutcome:
+    """What happened to one submitted delta."""
+    sku: str
+    status: str  # applied, rejected or not_found
+    product_id: Optional[int] = None
+    inventory_count: Optional[int] = None
+    delta: int = 0
+
+
+@dataclass
+class _Pending:
+    sku: str
+    delta: int
+    non_negative: bool
+    future: asyncio.Future
+
+
+def _chunks(values: List, size: int = LOOKUP_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class InventoryCoalescer:
+    """
+    Per-process write coalescer for inventory deltas.
+
+    Deltas submitted by concurrent requests are buffered and written together:
+    each SKU gets one ``inventory_count = inventory_count + net`` update per
+    batch. A batch is flushed ``inventory_coalesce_window_ms`` after its first
+    delta arrived (later deltas do not extend the wait), or as soon as
+    ``inventory_coalesce_max_skus`` SKUs are pending, whichever comes first.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, List[_Pending]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, adjustments: Sequence, non_negative: bool = True) -> List[InventoryOutcome]:
+        """Queue (sku, delta) pairs and wait until the batch holding them is committed."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for sku, delta in adjustments:
+            future = loop.create_future()
+            self._pending.setdefault(sku.lower(), []).append(_Pending(sku, delta, non_negative, future))
+            futures.append(future)
+
+        if len(self._pending) >= settings.inventory_coalesce_max_skus:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(settings.inventory_coalesce_window_ms / 1000, self._flush_now)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            # Hold a reference so the task is not garbage collected mid-flush
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: Dict[str, List[_Pending]]) -> None:
+        try:
+            outcomes = await apply_inventory_batch(batch)
+        except Exception as e:
+            for entries in batch.values():
+                for entry in entries:
+                    if not entry.future.done():
+                        entry.future.set_exception(e)
+            return
+
+        adjusted = _adjusted_products(outcomes)
+        if adjusted:
+            # Before answering, so callers never read a cached pre-write value
+            await bump_catalog_version_async()
+
+        for key, entries in batch.items():
+            for entry, outcome in zip(entries, outcomes[key]):
+                if not entry.future.done():
+                    entry.future.set_result(outcome)
+
+        if adjusted:
+            await run_in_threadpool(trigger_webhook_task.delay, 'products.inventory_adjusted', {
+                'adjusted': adjusted,
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+
+async def apply_inventory_batch(batch: Dict[str, List[_Pending]]) -> Dict[str, List[InventoryOutcome]]:
+    """
+    Write one coalesced batch in a single transaction.
+
+    Rows are locked in id order (so concurrent batches cannot deadlock), the
+    deltas for each SKU are replayed in arrival order so none takes the count
+    below zero (with non_negative it is rejected, otherwise the count stops at
+    zero), and the accepted net change is written as an atomic increment.
+    Returns each SKU's outcomes, in the order its deltas were submitted.
+    """
+    async with AsyncSessionLocal() as db:
+        ids_by_key: Dict[str, int] = {}
+        for chunk in _chunks(list(batch)):
+            rows = await db.execute(
+                select(Product.id, Product.sku_normalized).where(Product.sku_normalized.in_(chunk))
+            )
+            for product_id, key in rows:
+                ids_by_key[key] = product_id
+
+        current: Dict[int, tuple] = {}
+        for chunk in _chunks(sorted(ids_by_key.values())):
+            rows = await db.execute(
+                select(Product.id, Product.sku_normalized, Product.inventory_count)
+                .where(Product.id.in_(chunk))
+                .order_by(Product.id)
+                .with_for_update()
+            )
+            for product_id, key, inventory_count in rows:
+                current[product_id] = (key, inventory_count or 0)
+
+        outcomes: Dict[str, List[InventoryOutcome]] = {}
+        writes = []
+        for key, entries in batch.items():
+            product_id = ids_by_key.get(key)
+            if product_id not in current or current[product_id][0] != key:
+                # Missing, or renamed between lookup and lock
+                outcomes[key] = [InventoryOutcome(sku=entry.sku, status="not_found") for entry in entries]
+                continue
+
+            count = current[product_id][1]
+            statuses = []
+            net = 0
+            applied = []
+            for entry in entries:
+                if count + net + entry.delta >= 0:
+                    delta = entry.delta
+                elif entry.non_negative:
+                    statuses.append("rejected")
+                    applied.append(0)
+                    continue
+                else:
+                    # inventory_count is never negative: take it to zero instead
+                    delta = -(count + net)
+                statuses.append("applied")
+                applied.append(delta)
+                net += delta
+
+            final = count + net
+            outcomes[key] = [
+                InventoryOutcome(
+                    sku=entry.sku,
+                    status=entry_status,
+                    product_id=product_id,
+                    inventory_count=final,
+                    delta=delta
+                )
+                for entry, entry_status, delta in zip(entries, statuses, applied)
+            ]
+            if net:
+                writes.append({"product_id": product_id, "net": net})
+
+        if writes:
+            table = Product.__table__
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("product_id"))
+                .values(
+                    inventory_count=func.coalesce(table.c.inventory_count, 0) + bindparam("net"),
+                    updated_at=func.now()
+                ),
+                writes
+            )
+            await db.run_sync(record_product_changes, [write["product_id"] for write in writes])
+        await db.commit()
+
+    return outcomes
+
+
+def _adjusted_products(outcomes: Dict[str, List[InventoryOutcome]]) -> List[Dict]:
+    """Net change per product in a committed batch, for the webhook payload."""
+    adjusted = []
+    for key_outcomes in outcomes.values():
+        delta = sum(outcome.delta for outcome in key_outcomes)
+        if delta:
+            first = key_outcomes[0]
+            adjusted.append({
+                'id': first.product_id,
+                'sku': first.sku,
+                'delta': delta,
+                'inventory_count': first.inventory_count
+            })
+    return adjusted
+
+
+inventory_coalescer = InventoryCoalescer()
@@ -3,11 +3,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
+import math
 import os
+import time
 
 from .api import api_router
 from .config import settings
-from .database import engine, Base
+from .database import engine, Base, READ_PRIMARY_COOKIE, has_read_replica
+from .db_pool import pool_telemetry
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -29,6 +32,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# With a read replica, pin a client's reads to the primary briefly after it writes
+if has_read_replica():
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                f"{time.time() + settings.read_your_writes_seconds:.3f}",
+                max_age=math.ceil(settings.read_your_writes_seconds),
+                httponly=True,
+                samesite="lax"
+            )
+        return response
+
 # Include API routes
 app.include_router(api_router)
 
@@ -56,6 +74,16 @@ async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Connection pool telemetry for this process: checkout wait, saturation and churn."""
+    return {
+        "role": settings.process_role,
+        "pgbouncer": settings.db_pgbouncer,
+        "pools": [telemetry.snapshot() for telemetry in pool_telemetry.values()]
+    }
+
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
     """Handle 404 errors by serving the main page (SPA routing)."""
@@ -1,5 +1,23 @@
 from .product import Product
-from .webhook import Webhook, WebhookLog
+from .webhook import Webhook, WebhookLog, WebhookPayload, WebhookPendingEvent, WebhookDeferredDelivery
 from .import_job import ImportJob
+from .delete_job import DeleteJob
+from .product_facet import ProductFacetCount, ProductFacetDelta, ProductFacetState
+from .product_change import ProductChange, ProductChangeLog, ProductChangeState
 
-__all__ = ["Product", "Webhook", "WebhookLog", "ImportJob"]
\ No newline at end of file
+__all__ = [
+    "Product",
+    "Webhook",
+    "WebhookLog",
+    "WebhookPayload",
+    "WebhookPendingEvent",
+    "WebhookDeferredDelivery",
+    "ImportJob",
+    "DeleteJob",
+    "ProductFacetCount",
+    "ProductFacetDelta",
+    "ProductFacetState",
+    "ProductChange",
+    "ProductChangeLog",
+    "ProductChangeState"
+]
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class DeleteJob(Base):
+    __tablename__ = "delete_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(String(255), unique=True, nullable=False, index=True)  # Celery task ID
+    filters = Column(JSON, nullable=False)  # ProductFilter fields; empty means every product
+    max_product_id = Column(Integer, nullable=True)  # Products created after the job started are kept
+    total_records = Column(Integer, default=0)
+    deleted_records = Column(Integer, default=0)
+    status = Column(String(50), default="pending", nullable=False, index=True)  # pending, processing, completed, failed
+    progress_percentage = Column(Integer, default=0)
+    error_message = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<DeleteJob(id={self.id}, task_id='{self.task_id}', status='{self.status}')>"
@@ -20,6 +20,7 @@ class ImportJob(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     def __repr__(self):
         return f"<ImportJob(id={self.id}, task_id='{self.task_id}', status='{self.status}')>"
\ No newline at end of file
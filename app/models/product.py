@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Float, Index
+from sqlalchemy import Column, Computed, Integer, String, Boolean, Text, DateTime, Float, Index
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -7,7 +7,12 @@ class Product(Base):
     __tablename__ = "products"
     
     id = Column(Integer, primary_key=True, index=True)
-    sku = Column(String(100), unique=True, nullable=False, index=True)
+    sku = Column(String(100), nullable=False)
+    # lower(sku), written only by the database: a generated column in fresh
+    # schemas, a trigger-maintained column on PostgreSQL (migration 008, which
+    # adds it to live tables without a rewrite). Its unique index is what makes
+    # SKUs case-insensitively unique and is the ON CONFLICT target for upserts.
+    sku_normalized = Column(String(100), Computed("lower(sku)", persisted=True), nullable=False)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=True)
@@ -18,10 +23,14 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # Create composite indexes for common queries
+    # Create composite indexes for common queries. The pg_trgm GIN indexes
+    # (migration 003) and the trigger-maintained search_vector column with its GIN
+    # index (migration 004) are PostgreSQL-only, so they are not mapped here;
+    # this also keeps the tsvector out of every Product load.
     __table_args__ = (
-        Index('idx_products_sku_lower', func.lower(sku)),
+        Index('uq_products_sku_normalized', sku_normalized, unique=True),
         Index('idx_products_name_active', name, is_active),
+        Index('idx_products_name_id', name, id),  # Keyset pagination seek
         Index('idx_products_category_active', category, is_active),
     )
     
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ProductChange(Base):
+    """Latest change per product in feed order; deleted products are kept as tombstones."""
+    __tablename__ = "product_changes"
+    
+    # No foreign key: tombstones outlive the product rows they describe
+    product_id = Column(Integer, primary_key=True)
+    seq = Column(BigInteger, nullable=False, unique=True, index=True)
+    deleted = Column(Boolean, nullable=False, default=False)
+    sku = Column(String(100), nullable=True)  # Kept for tombstones only
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    
+    def __repr__(self):
+        return f"<ProductChange(product_id={self.product_id}, seq={self.seq}, deleted={self.deleted})>"
+
+
+class ProductChangeLog(Base):
+    """Unsequenced changes, written with each product write and folded into the feed."""
+    __tablename__ = "product_change_log"
+    
+    # Integer on SQLite, where only an INTEGER primary key autoincrements
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    sku = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class ProductChangeState(Base):
+    """Single row holding the feed's sequence counters; also serializes folds."""
+    __tablename__ = "product_change_state"
+    
+    id = Column(Integer, primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+    # Cursors below this have missed a wipe or a pruned tombstone and must resync
+    reset_seq = Column(BigInteger, nullable=False, default=0)
+    folded_at = Column(DateTime(timezone=True), nullable=True)
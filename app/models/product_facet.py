@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ProductFacetCount(Base):
+    """Rollup of product counts per (category, brand, is_active, price bucket)."""
+    __tablename__ = "product_facet_counts"
+    
+    # Missing category/brand are stored as '' and a missing price as bucket -1
+    # so every key part is NOT NULL and upserts can match on the primary key
+    category = Column(String(100), primary_key=True)
+    brand = Column(String(100), primary_key=True)
+    is_active = Column(Boolean, primary_key=True)
+    price_bucket = Column(Integer, primary_key=True)
+    product_count = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ProductFacetCount(category='{self.category}', brand='{self.brand}', count={self.product_count})>"
+
+
+class ProductFacetDelta(Base):
+    """Pending count changes, written with each product write and folded into the rollup."""
+    __tablename__ = "product_facet_deltas"
+    
+    id = Column(Integer, primary_key=True)
+    category = Column(String(100), nullable=False)
+    brand = Column(String(100), nullable=False)
+    is_active = Column(Boolean, nullable=False)
+    price_bucket = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class ProductFacetState(Base):
+    """Single row recording when deltas were last folded; also serializes folds."""
+    __tablename__ = "product_facet_state"
+    
+    id = Column(Integer, primary_key=True)
+    folded_at = Column(DateTime(timezone=True), nullable=True)
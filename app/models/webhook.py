@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Text, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -9,15 +9,26 @@ class Webhook(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     url = Column(String(500), nullable=False)
-    event_types = Column(JSON, nullable=False)  # List of event types: ['product.created', 'product.updated', etc.]
+    # List of event types: ['product.created', 'product.updated', etc.]. The
+    # PostgreSQL GIN index on its jsonb cast lives in migration 012 only
+    event_types = Column(JSON, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     secret_key = Column(String(255), nullable=True)  # For webhook verification
     headers = Column(JSON, nullable=True)  # Additional headers to send
     retry_count = Column(Integer, default=3)
     timeout_seconds = Column(Integer, default=30)
+    batch_window_seconds = Column(Integer, nullable=True)  # Buffer events this long and deliver them together; None delivers each event at once
+    batch_max_events = Column(Integer, default=100, nullable=False)  # Deliver a batch early once this many events are buffered
     last_triggered_at = Column(DateTime(timezone=True), nullable=True)
     last_response_code = Column(Integer, nullable=True)
     last_response_time_ms = Column(Integer, nullable=True)
+    # Circuit breaker: closed delivers, open defers deliveries until a probe is due, half_open has a probe in flight
+    circuit_state = Column(String(20), default="closed", nullable=False)
+    consecutive_failures = Column(Integer, default=0, nullable=False)
+    circuit_trips = Column(Integer, default=0, nullable=False)  # Times opened since the last successful delivery; sets the next wait
+    circuit_opened_at = Column(DateTime(timezone=True), nullable=True)
+    circuit_retry_at = Column(DateTime(timezone=True), nullable=True)  # When the next probe is due
+    skipped_deliveries = Column(Integer, default=0, nullable=False)  # Deliveries deferred while the circuit was open
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -26,19 +37,82 @@ class Webhook(Base):
 
 
 class WebhookLog(Base):
+    # On PostgreSQL the table is partitioned by day on created_at, with a
+    # primary key of (id, created_at); partitions live in migration 014 and
+    # are created and dropped by app/webhook_logs.py
     __tablename__ = "webhook_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
-    webhook_id = Column(Integer, nullable=False, index=True)
+    # Integer on SQLite, where only an INTEGER primary key autoincrements
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
+    webhook_id = Column(Integer, nullable=False)
     event_type = Column(String(100), nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload_digest = Column(String(64), nullable=True)  # webhook_payloads.digest: the payload is stored once for all its deliveries
     response_code = Column(Integer, nullable=True)
     response_body = Column(Text, nullable=True)
     response_time_ms = Column(Integer, nullable=True)
+    connect_time_ms = Column(Integer, nullable=True)  # DNS, TCP and TLS setup; 0 on a reused connection
+    server_time_ms = Column(Integer, nullable=True)  # Request sent until response headers arrived
     error_message = Column(Text, nullable=True)
     retry_attempt = Column(Integer, default=0)
     success = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # When the attempt was made, not when its log was written
+    
+    __table_args__ = (
+        Index('idx_webhook_logs_webhook_id_created_at', webhook_id, created_at),
+    )
+    
+    def __repr__(self):
+        return f"<WebhookLog(id={self.id}, webhook_id={self.webhook_id}, event='{self.event_type}')>"
+
+
+class WebhookPayload(Base):
+    """An event payload, stored once however many deliveries and retries log it."""
+    __tablename__ = "webhook_payloads"
+    
+    digest = Column(String(64), primary_key=True)  # sha256 of the canonical JSON
+    payload = Column(JSON, nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), nullable=False)  # Refreshed at most daily; unused payloads are pruned with the logs
+    
+    __table_args__ = (
+        Index('idx_webhook_payloads_last_seen_at', last_seen_at),
+    )
+    
+    def __repr__(self):
+        return f"<WebhookPayload(digest='{self.digest}')>"
+
+
+class WebhookPendingEvent(Base):
+    """An event buffered for a batching webhook until its batch is delivered."""
+    __tablename__ = "webhook_pending_events"
+    
+    id = Column(Integer, primary_key=True)
+    webhook_id = Column(Integer, nullable=False)
+    event_type = Column(String(100), nullable=False)
+    product_id = Column(Integer, nullable=True)  # Events for the same product are coalesced
+    payload = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        Index('idx_webhook_pending_events_webhook_id', webhook_id, id),
+    )
+    
+    def __repr__(self):
+        return f"<WebhookPendingEvent(id={self.id}, webhook_id={self.webhook_id}, event='{self.event_type}')>"
+
+
+class WebhookDeferredDelivery(Base):
+    """A delivery skipped while its webhook's circuit was open, replayed once it closes."""
+    __tablename__ = "webhook_deferred_deliveries"
+    
+    id = Column(Integer, primary_key=True)
+    webhook_id = Column(Integer, nullable=False)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_webhook_deferred_deliveries_webhook_id', webhook_id, id),
+    )
+    
     def __repr__(self):
-        return f"<WebhookLog(id={self.id}, webhook_id={self.webhook_id}, event='{self.event_type}')>"
\ No newline at end of file
+        return f"<WebhookDeferredDelivery(id={self.id}, webhook_id={self.webhook_id}, event='{self.event_type}')>"
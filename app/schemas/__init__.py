@@ -4,7 +4,24 @@ from .product import (
     ProductUpdate,
     ProductResponse,
     ProductFilter,
-    ProductListResponse
+    ProductListResponse,
+    ProductSearchResult,
+    ProductSearchResponse,
+    ProductBulkCreate,
+    ProductBulkPatchItem,
+    ProductBulkPatch,
+    ProductBulkDelete,
+    ProductBulkItemResult,
+    ProductBulkResponse,
+    FacetValueCount,
+    PriceBucketCount,
+    ProductFacetsResponse,
+    InventoryAdjustmentItem,
+    InventoryAdjustmentRequest,
+    InventoryAdjustmentResult,
+    InventoryAdjustmentResponse,
+    ProductChangeItem,
+    ProductChangesResponse
 )
 from .webhook import (
     WebhookBase,
@@ -12,13 +29,16 @@ from .webhook import (
     WebhookUpdate,
     WebhookResponse,
     WebhookTestRequest,
-    WebhookTestResponse
+    WebhookTestResponse,
+    WebhookCircuitResponse,
+    WebhookLogResponse
 )
 from .import_job import (
     ImportJobResponse,
     ImportProgressResponse,
     ImportSummaryResponse
 )
+from .delete_job import DeleteJobResponse
 
 __all__ = [
     "ProductBase",
@@ -27,13 +47,33 @@ __all__ = [
     "ProductResponse",
     "ProductFilter",
     "ProductListResponse",
+    "ProductSearchResult",
+    "ProductSearchResponse",
+    "ProductBulkCreate",
+    "ProductBulkPatchItem",
+    "ProductBulkPatch",
+    "ProductBulkDelete",
+    "ProductBulkItemResult",
+    "ProductBulkResponse",
+    "FacetValueCount",
+    "PriceBucketCount",
+    "ProductFacetsResponse",
+    "InventoryAdjustmentItem",
+    "InventoryAdjustmentRequest",
+    "InventoryAdjustmentResult",
+    "InventoryAdjustmentResponse",
+    "ProductChangeItem",
+    "ProductChangesResponse",
     "WebhookBase",
     "WebhookCreate",
     "WebhookUpdate", 
     "WebhookResponse",
     "WebhookTestRequest",
     "WebhookTestResponse",
+    "WebhookCircuitResponse",
+    "WebhookLogResponse",
     "ImportJobResponse",
     "ImportProgressResponse",
-    "ImportSummaryResponse"
+    "ImportSummaryResponse",
+    "DeleteJobResponse"
 ]
\ No newline at end of file
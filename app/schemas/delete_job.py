@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+class DeleteJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    task_id: str
+    filters: Dict[str, Any]
+    total_records: int
+    deleted_records: int
+    status: str
+    progress_percentage: int
+    error_message: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -20,6 +20,7 @@ class ImportJobResponse(BaseModel):
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
 
 class ImportProgressResponse(BaseModel):
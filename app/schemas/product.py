@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import List, Optional, Union
 from datetime import datetime
 
 
@@ -50,6 +50,137 @@ class ProductFilter(BaseModel):
 class ProductListResponse(BaseModel):
     items: list[ProductResponse]
     total: int
-    page: int
+    total_is_exact: bool = True  # False when total is a planner estimate
+    page: Optional[int]  # None in cursor mode
     size: int
-    pages: int
\ No newline at end of file
+    pages: Optional[int]  # None in cursor mode
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class ProductSearchResult(ProductResponse):
+    rank: Optional[float] = None  # Full-text relevance; None on non-PostgreSQL backends
+
+
+class ProductSearchResponse(BaseModel):
+    items: list[ProductSearchResult]
+    query: str
+    size: int
+    next_cursor: Optional[str] = None
+
+
+class ProductBulkCreate(BaseModel):
+    items: List[ProductCreate] = Field(..., min_length=1)
+    upsert: bool = Field(False, description="Update products whose SKU already exists instead of failing them")
+
+
+class ProductBulkPatchItem(BaseModel):
+    id: Optional[int] = None
+    sku: Optional[str] = Field(None, max_length=100, description="Match by SKU (case-insensitive) when id is not given")
+    changes: ProductUpdate
+
+    @model_validator(mode="after")
+    def check_identifier(self):
+        if (self.id is None) == (self.sku is None):
+            raise ValueError("Provide exactly one of id or sku")
+        return self
+
+
+class ProductBulkPatch(BaseModel):
+    items: List[ProductBulkPatchItem] = Field(..., min_length=1)
+
+
+class ProductBulkDelete(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    filter: Optional[ProductFilter] = None
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must set at least one field; use DELETE /products/?confirm=true to delete everything")
+        return self
+
+
+class ProductBulkItemResult(BaseModel):
+    index: int  # Position in the request's items/ids list
+    id: Optional[int] = None
+    sku: Optional[str] = None
+    status: str  # created, updated, deleted, not_found or error
+    error: Optional[str] = None
+
+
+class ProductBulkResponse(BaseModel):
+    results: List[ProductBulkItemResult]
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+
+class FacetValueCount(BaseModel):
+    value: Optional[Union[bool, str]]  # None groups products without a category/brand
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min: float
+    max: Optional[float]  # None for the open-ended top bucket
+    count: int
+
+
+class ProductFacetsResponse(BaseModel):
+    total: int
+    category: list[FacetValueCount]
+    brand: list[FacetValueCount]
+    is_active: list[FacetValueCount]
+    price: list[PriceBucketCount]
+    price_unknown: int  # Products without a price
+    price_range_applied: Optional[list[Optional[float]]] = None  # min/max_price widened to bucket edges
+    as_of: Optional[datetime]  # When pending deltas were last folded into the rollup
+    pending_deltas: int
+    lag_seconds: float  # Age of the oldest unfolded delta; 0 when the rollup is current
+
+
+class InventoryAdjustmentItem(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=100)
+    delta: int  # Added to inventory_count; negative to decrement
+
+
+class InventoryAdjustmentRequest(BaseModel):
+    items: List[InventoryAdjustmentItem] = Field(..., min_length=1)
+    non_negative: bool = True  # Reject decrements that would take inventory below zero; if false they stop at zero
+
+
+class InventoryAdjustmentResult(BaseModel):
+    index: int  # Position in the request's items list
+    sku: str
+    id: Optional[int] = None
+    status: str  # applied, rejected or not_found
+    inventory_count: Optional[int] = None  # Value written by the coalesced update
+    error: Optional[str] = None
+
+
+class InventoryAdjustmentResponse(BaseModel):
+    results: List[InventoryAdjustmentResult]
+    applied: int = 0
+    rejected: int = 0
+    not_found: int = 0
+
+
+class ProductChangeItem(BaseModel):
+    seq: int
+    id: int
+    sku: Optional[str] = None
+    deleted: bool  # Tombstone: drop the product from the local copy
+    changed_at: datetime
+    product: Optional[ProductResponse] = None  # Current values; null for tombstones
+
+
+class ProductChangesResponse(BaseModel):
+    items: List[ProductChangeItem]
+    next_since: int  # Pass back as since= to continue after this page
+    has_more: bool
+    reset: bool  # The cursor predates a full wipe: drop the local copy, then apply these items
+    lag_seconds: float  # Age of the oldest unsequenced change; 0 when the feed is current
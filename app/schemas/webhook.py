@@ -12,6 +12,8 @@ class WebhookBase(BaseModel):
     headers: Optional[Dict[str, str]] = Field(None, description="Additional headers")
     retry_count: int = Field(3, ge=0, le=10, description="Number of retries")
     timeout_seconds: int = Field(30, ge=1, le=300, description="Timeout in seconds")
+    batch_window_seconds: Optional[int] = Field(None, ge=1, le=3600, description="Buffer events this long and deliver them as one batch (unset delivers each event at once)")
+    batch_max_events: int = Field(100, ge=1, le=10000, description="Deliver a batch early once this many events are buffered")
 
 
 class WebhookCreate(WebhookBase):
@@ -27,6 +29,8 @@ class WebhookUpdate(BaseModel):
     headers: Optional[Dict[str, str]] = None
     retry_count: Optional[int] = Field(None, ge=0, le=10)
     timeout_seconds: Optional[int] = Field(None, ge=1, le=300)
+    batch_window_seconds: Optional[int] = Field(None, ge=1, le=3600)
+    batch_max_events: Optional[int] = Field(None, ge=1, le=10000)
 
 
 class WebhookResponse(WebhookBase):
@@ -36,10 +40,44 @@ class WebhookResponse(WebhookBase):
     last_triggered_at: Optional[datetime]
     last_response_code: Optional[int]
     last_response_time_ms: Optional[int]
+    circuit_state: str = "closed"
+    consecutive_failures: int = 0
+    circuit_opened_at: Optional[datetime] = None
+    circuit_retry_at: Optional[datetime] = None
+    skipped_deliveries: int = 0
     created_at: datetime
     updated_at: datetime
 
 
+class WebhookLogResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    webhook_id: int
+    event_type: str
+    payload: Optional[Dict[str, Any]] = None
+    response_code: Optional[int]
+    response_body: Optional[str]
+    response_time_ms: Optional[int]
+    connect_time_ms: Optional[int]
+    server_time_ms: Optional[int]
+    error_message: Optional[str]
+    retry_attempt: Optional[int]
+    success: Optional[bool]
+    created_at: datetime
+
+
+class WebhookCircuitResponse(BaseModel):
+    webhook_id: int
+    state: str = Field(..., description="closed, open or half_open")
+    consecutive_failures: int
+    trips: int = Field(..., description="Times opened since the last successful delivery")
+    opened_at: Optional[datetime]
+    next_probe_at: Optional[datetime]
+    skipped_deliveries: int = Field(..., description="Deliveries deferred while the circuit was open")
+    deferred_deliveries: int = Field(..., description="Deferred deliveries still waiting for replay")
+
+
 class WebhookTestRequest(BaseModel):
     event_type: str = Field(..., description="Event type to test")
     test_data: Optional[Dict[str, Any]] = Field(None, description="Test payload data")
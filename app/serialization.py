@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from .models import Product
+from .schemas import ProductResponse
+
+
+# ProductResponse field order, so fast-path items match the schema's JSON
+PRODUCT_FIELDS: Tuple[str, ...] = tuple(ProductResponse.model_fields)
+
+# Always returned, and needed to build keyset cursors
+REQUIRED_FIELDS = ("id",)
+CURSOR_FIELDS = ("name", "id")
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields= selection names unknown product fields."""
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Turn a comma-separated fields= value into product fields in schema order."""
+    if not fields:
+        return PRODUCT_FIELDS
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(PRODUCT_FIELDS)
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Valid fields: {', '.join(PRODUCT_FIELDS)}"
+        )
+
+    requested.update(REQUIRED_FIELDS)
+    return tuple(field for field in PRODUCT_FIELDS if field in requested)
+
+
+def product_columns(fields: Sequence[str], extra: Iterable[str] = ()) -> List:
+    """Product columns for the requested fields, followed by any extra ones needed internally."""
+    names = list(fields) + [name for name in extra if name not in fields]
+    return [getattr(Product, name) for name in names]
+
+
+def rows_to_items(rows: Sequence[Sequence[Any]], fields: Sequence[str]) -> List[dict]:
+    """Map column tuples to item dicts; trailing internal-only columns are dropped by zip."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson (UTC datetimes as 'Z', like Pydantic)."""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def json_datetime(value: datetime) -> str:
+    """Format a datetime exactly as it appears in response JSON."""
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z).decode("utf-8").strip('"')
@@ -0,0 +1,229 @@
+import asyncio
+import bisect
+import time
+from typing import Dict, Iterable, List, Optional
+
+import redis
+import redis.asyncio
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import get_async_redis, get_redis
+from .config import settings
+from .models import Product
+
+
+# Low-cardinality columns served from memory instead of the database
+SUGGESTION_COLUMNS = ("category", "brand")
+REBUILD_MARKER_KEY = "suggest:rebuilt"
+
+
+def _redis_key(column: str) -> str:
+    return f"suggest:{column}"
+
+
+def _recent_key(column: str) -> str:
+    # Values added since the current rebuild started, kept through its publish
+    return f"suggest:{column}:recent"
+
+
+def _rebuild_key(column: str) -> str:
+    return f"suggest:{column}:rebuild"
+
+
+class ValueIndex:
+    """Sorted, case-insensitive index over the distinct values of one column."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._entries: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self.add(values)
+
+    def add(self, values: Iterable[str]) -> None:
+        for value in values:
+            if value and value.lower() not in self._entries:
+                self._entries[value.lower()] = value
+                bisect.insort(self._keys, value.lower())
+
+    def search(self, q: str, limit: int = 10) -> List[str]:
+        """Return prefix matches first, then other substring matches."""
+        q = q.lower()
+        results = []
+
+        start = bisect.bisect_left(self._keys, q)
+        for key in self._keys[start:]:
+            if not key.startswith(q) or len(results) >= limit:
+                break
+            results.append(key)
+
+        if len(results) < limit:
+            for key in self._keys:
+                if q in key and not key.startswith(q):
+                    results.append(key)
+                    if len(results) >= limit:
+                        break
+
+        return [self._entries[key] for key in results]
+
+
+class SuggestionIndex:
+    """
+    Per-process category/brand indexes backed by Redis sets.
+
+    Writes and imports add values to the Redis sets incrementally; each process
+    re-reads them at most every ``suggestion_index_refresh_seconds``. A Celery
+    beat task rebuilds the sets from the database every
+    ``suggestion_index_rebuild_seconds`` so values that no longer exist (after
+    deletes) drop out; a process that finds no rebuild within that interval
+    (e.g. Redis was flushed) queues one.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, ValueIndex] = {column: ValueIndex() for column in SUGGESTION_COLUMNS}
+        self._loaded_at: Optional[float] = None
+        self._rebuilt_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def search(self, db: AsyncSession, column: str, q: str, limit: int = 10) -> List[str]:
+        await self._ensure_fresh(db)
+        return self._indexes[column].search(q, limit)
+
+    def add(self, column: str, values: Iterable[str]) -> None:
+        self._indexes[column].add(values)
+
+    async def _ensure_fresh(self, db: AsyncSession) -> None:
+        if self._is_fresh():
+            return
+
+        async with self._lock:
+            if self._is_fresh():
+                return
+            rebuild_locally = await self._load()
+            self._loaded_at = time.monotonic()
+
+        if rebuild_locally:
+            # Outside the lock: other requests keep using the current index meanwhile
+            self._indexes = {
+                column: ValueIndex(await self._distinct_values(db, column)) for column in SUGGESTION_COLUMNS
+            }
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < settings.suggestion_index_refresh_seconds
+        )
+
+    async def _load(self) -> bool:
+        """Re-read the Redis sets; returns whether this caller should rebuild the index from the database instead."""
+        try:
+            client = get_async_redis()
+            pipe = client.pipeline()
+            # Set only if no rebuild has run this interval, in which case we queue one
+            pipe.set(REBUILD_MARKER_KEY, 1, nx=True, ex=settings.suggestion_index_rebuild_seconds)
+            for column in SUGGESTION_COLUMNS:
+                pipe.smembers(_redis_key(column))
+            results = await pipe.execute()
+        except redis.RedisError:
+            # No shared index: rebuild locally from the database once per interval
+            now = time.monotonic()
+            if self._rebuilt_at is None or now - self._rebuilt_at >= settings.suggestion_index_rebuild_seconds:
+                self._rebuilt_at = now
+                return True
+            return False
+
+        if results[0]:
+            await self._queue_rebuild()
+
+        self._indexes = {column: ValueIndex(values) for column, values in zip(SUGGESTION_COLUMNS, results[1:])}
+        return False
+
+    @staticmethod
+    async def _queue_rebuild() -> None:
+        from .tasks.suggestion_tasks import rebuild_suggestion_index_task
+
+        try:
+            await run_in_threadpool(rebuild_suggestion_index_task.delay)
+        except Exception as e:
+            print(f"Failed to queue suggestion index rebuild: {e}")
+
+    @staticmethod
+    async def _distinct_values(db: AsyncSession, column: str) -> List[str]:
+        attr = getattr(Product, column)
+        result = await db.execute(select(attr).where(attr.is_not(None)).distinct())
+        return list(result.scalars())
+
+
+suggestion_index = SuggestionIndex()
+
+
+def _new_values(categories: Iterable[Optional[str]], brands: Iterable[Optional[str]]) -> Dict[str, set]:
+    return {
+        "category": {value for value in categories if value},
+        "brand": {value for value in brands if value},
+    }
+
+
+def record_suggestion_values(categories: Iterable[Optional[str]] = (), brands: Iterable[Optional[str]] = ()) -> None:
+    """Add newly written category/brand values to the suggestion indexes."""
+    values = _new_values(categories, brands)
+
+    try:
+        pipe = get_redis().pipeline()
+        for column, column_values in values.items():
+            if column_values:
+                suggestion_index.add(column, column_values)
+                pipe.sadd(_redis_key(column), *column_values)
+                pipe.sadd(_recent_key(column), *column_values)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+async def record_suggestion_values_async(
+    categories: Iterable[Optional[str]] = (),
+    brands: Iterable[Optional[str]] = ()
+) -> None:
+    """Async variant of record_suggestion_values for the API layer."""
+    values = _new_values(categories, brands)
+
+    try:
+        pipe = get_async_redis().pipeline()
+        for column, column_values in values.items():
+            if column_values:
+                suggestion_index.add(column, column_values)
+                pipe.sadd(_redis_key(column), *column_values)
+                pipe.sadd(_recent_key(column), *column_values)
+        await pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def rebuild_suggestion_sets(db: Session) -> Dict[str, int]:
+    """
+    Replace the Redis sets with the distinct values now in the database and
+    return how many each holds.
+
+    Each set is swapped in with one SUNIONSTORE of the fresh snapshot and the
+    values recorded since the rebuild started, so concurrent writes are not
+    lost while values that no longer exist drop out.
+    """
+    client = get_redis()
+    client.delete(*[_recent_key(column) for column in SUGGESTION_COLUMNS])
+
+    counts = {}
+    for column in SUGGESTION_COLUMNS:
+        attr = getattr(Product, column)
+        values = list(db.scalars(select(attr).where(attr.is_not(None)).distinct()))
+
+        pipe = client.pipeline()
+        pipe.delete(_rebuild_key(column))
+        if values:
+            pipe.sadd(_rebuild_key(column), *values)
+        pipe.sunionstore(_redis_key(column), [_rebuild_key(column), _recent_key(column)])
+        pipe.delete(_rebuild_key(column))
+        counts[column] = pipe.execute()[-2]
+
+    client.set(REBUILD_MARKER_KEY, 1, ex=settings.suggestion_index_rebuild_seconds)
+    return counts
@@ -1,9 +1,32 @@
 from .import_tasks import import_csv_task
-from .webhook_tasks import send_webhook_task, trigger_webhook_task, test_webhook_task
+from .webhook_tasks import (
+    send_webhook_task,
+    trigger_webhook_task,
+    test_webhook_task,
+    flush_webhook_batch_task,
+    flush_due_webhook_batches_task,
+    replay_webhook_deliveries_task,
+    check_webhook_circuits_task,
+    maintain_webhook_logs_task
+)
+from .facet_tasks import refresh_product_facets_task, rebuild_product_facets_task
+from .suggestion_tasks import rebuild_suggestion_index_task
+from .delete_tasks import delete_products_task
+from .change_feed_tasks import fold_product_changes_task
 
 __all__ = [
     "import_csv_task",
     "send_webhook_task", 
     "trigger_webhook_task",
-    "test_webhook_task"
+    "test_webhook_task",
+    "flush_webhook_batch_task",
+    "flush_due_webhook_batches_task",
+    "replay_webhook_deliveries_task",
+    "check_webhook_circuits_task",
+    "maintain_webhook_logs_task",
+    "refresh_product_facets_task",
+    "rebuild_product_facets_task",
+    "rebuild_suggestion_index_task",
+    "delete_products_task",
+    "fold_product_changes_task"
 ]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing import Dict, Any
+
+from ..celery import celery_app
+from ..change_feed import fold_product_changes
+from ..database import SessionLocal
+
+
+@celery_app.task(queue='upload_queue')
+def fold_product_changes_task() -> Dict[str, Any]:
+    """
+    Sequence logged product changes into the change feed (runs on a beat schedule).
+    """
+    db = SessionLocal()
+    
+    try:
+        return {"folded_changes": fold_product_changes(db)}
+    
+    finally:
+        db.close()
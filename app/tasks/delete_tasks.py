@@ -0,0 +1,128 @@
+from sqlalchemy import delete, func, select
+import time
+from typing import Dict, Any
+from datetime import datetime
+
+from ..cache import bump_catalog_version
+from ..celery import celery_app
+from ..change_feed import record_product_changes
+from ..config import settings
+from ..database import SessionLocal
+from ..facets import FacetDeltas, record_facet_deltas
+from ..filters import apply_product_filters
+from ..models import Product, DeleteJob
+from ..schemas import ProductFilter
+from .change_feed_tasks import fold_product_changes_task
+from .facet_tasks import refresh_product_facets_task
+from .webhook_tasks import trigger_webhook_task
+
+
+@celery_app.task(bind=True, queue='upload_queue')
+def delete_products_task(self, delete_job_id: int) -> Dict[str, Any]:
+    """
+    Delete the products matching a job's filters in bounded chunks with progress tracking.
+    
+    Each chunk is its own short transaction, so locks are held for one chunk
+    at a time and imports and reads keep running while the job works through
+    a large catalog.
+    """
+    db = SessionLocal()
+    start_time = time.time()
+    
+    try:
+        delete_job = db.get(DeleteJob, delete_job_id)
+        if not delete_job:
+            raise ValueError(f"Delete job {delete_job_id} not found")
+        
+        filters = ProductFilter(**delete_job.filters)
+        
+        # Only products that exist now; later creates are left alone
+        matching = apply_product_filters(select(Product.id), filters)
+        max_product_id = db.scalar(select(func.max(Product.id))) or 0
+        matching = matching.where(Product.id <= max_product_id)
+        
+        delete_job.status = "processing"
+        delete_job.started_at = datetime.utcnow()
+        delete_job.max_product_id = max_product_id
+        delete_job.total_records = db.scalar(select(func.count()).select_from(matching.subquery()))
+        db.commit()
+        
+        deleted_count = 0
+        last_id = 0
+        while True:
+            # Walk the id index: each chunk starts where the previous one stopped
+            chunk = matching.where(Product.id > last_id).order_by(Product.id).limit(settings.bulk_delete_chunk_size)
+            rows = db.execute(
+                delete(Product)
+                .where(Product.id.in_(chunk.scalar_subquery()))
+                .returning(Product.id, Product.sku, Product.category, Product.brand, Product.is_active, Product.price)
+                .execution_options(synchronize_session=False)
+            ).mappings().all()
+            if not rows:
+                break
+            
+            deltas = FacetDeltas()
+            for row in rows:
+                deltas.removed(row)
+            record_facet_deltas(db, deltas)
+            record_product_changes(db, (), {row["id"]: row["sku"] for row in rows})
+            
+            deleted_count += len(rows)
+            last_id = max(row["id"] for row in rows)
+            delete_job.deleted_records = deleted_count
+            delete_job.progress_percentage = min(int(deleted_count * 100 / max(delete_job.total_records, 1)), 99)
+            db.commit()
+            bump_catalog_version()
+            
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'progress_percentage': delete_job.progress_percentage,
+                    'deleted_records': deleted_count,
+                    'total_records': delete_job.total_records
+                }
+            )
+            
+            # Give autovacuum, replicas and concurrent writers room between chunks
+            time.sleep(settings.bulk_delete_chunk_pause_seconds)
+        
+        processing_time = time.time() - start_time
+        
+        delete_job.status = "completed"
+        delete_job.deleted_records = deleted_count
+        delete_job.progress_percentage = 100
+        delete_job.completed_at = datetime.utcnow()
+        db.commit()
+        
+        if deleted_count > 0:
+            refresh_product_facets_task.delay()
+            fold_product_changes_task.delay()
+            trigger_webhook_task.apply_async(
+                args=['products.bulk_deleted', {
+                    'deleted_count': deleted_count,
+                    'filter': delete_job.filters,
+                    'delete_job_id': delete_job_id,
+                    'timestamp': datetime.utcnow().isoformat()
+                }],
+                queue='webhook_queue'
+            )
+        
+        return {
+            'status': 'completed',
+            'deleted_records': deleted_count,
+            'processing_time_seconds': processing_time
+        }
+        
+    except Exception as e:
+        # Chunks already committed stay deleted; the job records how far it got
+        db.rollback()
+        delete_job = db.get(DeleteJob, delete_job_id)
+        if delete_job:
+            delete_job.status = "failed"
+            delete_job.error_message = str(e)
+            delete_job.completed_at = datetime.utcnow()
+            db.commit()
+        raise
+    
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+from typing import Dict, Any
+
+from ..celery import celery_app
+from ..database import SessionLocal
+from ..facets import fold_facet_deltas, rebuild_facets
+
+
+@celery_app.task(queue='upload_queue')
+def refresh_product_facets_task() -> Dict[str, Any]:
+    """
+    Fold pending facet deltas into the rollup table (runs on a beat schedule).
+    """
+    db = SessionLocal()
+    
+    try:
+        return {"folded_deltas": fold_facet_deltas(db)}
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='upload_queue')
+def rebuild_product_facets_task() -> Dict[str, Any]:
+    """
+    Recompute the facet rollup from the products table.
+    """
+    db = SessionLocal()
+    
+    try:
+        rebuild_facets(db)
+        return {"rebuilt": True}
+    
+    finally:
+        db.close()
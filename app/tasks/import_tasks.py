@@ -1,17 +1,32 @@
 from celery import current_task
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 import pandas as pd
 import time
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from ..cache import bump_catalog_version
 from ..celery import celery_app
+from ..change_feed import record_product_changes
 from ..database import SessionLocal
+from ..facets import FacetDeltas, facet_key, record_facet_deltas
 from ..models import Product, ImportJob
+from ..suggestions import record_suggestion_values
+from .change_feed_tasks import fold_product_changes_task
+from .facet_tasks import refresh_product_facets_task
 from .webhook_tasks import trigger_webhook_task
 
+# Rows per INSERT / IN list: 500 rows of 8 columns stays well below driver and
+# SQLite bound-parameter limits
+UPSERT_CHUNK_SIZE = 500
+
+# Rounds of insert-then-update before giving up on SKUs that keep vanishing
+UPSERT_ATTEMPTS = 3
+
 
 @celery_app.task(bind=True, queue='upload_queue')
 def import_csv_task(self, file_path: str, import_job_id: int) -> Dict[str, Any]:
@@ -79,6 +94,13 @@ def import_csv_task(self, file_path: str, import_job_id: int) -> Dict[str, Any]:
                 db, batch_df, validation_errors
             )
             
+            # Invalidate cached counts and extend suggestions as each batch lands
+            bump_catalog_version()
+            record_suggestion_values(
+                distinct_column_values(batch_df, 'category'),
+                distinct_column_values(batch_df, 'brand')
+            )
+            
             successful_count += batch_results['successful']
             failed_count += batch_results['failed']
             duplicate_overwrites += batch_results['duplicates']
@@ -136,6 +158,10 @@ def import_csv_task(self, file_path: str, import_job_id: int) -> Dict[str, Any]:
         except Exception:
             pass  # Ignore cleanup errors
         
+        # Fold this import's facet deltas now rather than on the next beat tick
+        refresh_product_facets_task.delay()
+        fold_product_changes_task.delay()
+        
         # Trigger webhooks for successful import
         if successful_count > 0:
             trigger_webhook_task.apply_async(
@@ -184,64 +210,48 @@ def process_product_batch(db: Session, batch_df: pd.DataFrame, validation_errors
     failed = 0
     duplicates = 0
     
+    # Rows repeating a SKU (case-insensitive) within the batch merge into the
+    # first, later non-empty values winning, as if they were applied in order
+    rows_by_key: Dict[str, Dict[str, Any]] = {}
     for index, row in batch_df.iterrows():
         try:
-            # Validate required fields
-            sku = str(row.get('sku', '')).strip()
-            name = str(row.get('name', '')).strip()
-            
-            if not sku or not name:
+            product_data = parse_product_row(row)
+            if product_data is None:
                 validation_errors.append(f"Row {index + 1}: SKU and name are required")
                 failed += 1
                 continue
             
-            # Check for existing product (case-insensitive SKU)
-            existing_product = db.query(Product).filter(
-                func.lower(Product.sku) == sku.lower()
-            ).first()
-            
-            # Prepare product data
-            product_data = {
-                'sku': sku,
-                'name': name,
-                'description': str(row.get('description', '')).strip() or None,
-                'price': parse_float(row.get('price')),
-                'category': str(row.get('category', '')).strip() or None,
-                'brand': str(row.get('brand', '')).strip() or None,
-                'inventory_count': parse_int(row.get('inventory_count', 0)),
-                'is_active': parse_bool(row.get('is_active', True))
-            }
-            
-            if existing_product:
-                # Update existing product
-                for key, value in product_data.items():
-                    if value is not None:
-                        setattr(existing_product, key, value)
-                existing_product.updated_at = datetime.utcnow()
+            key = product_data['sku'].lower()
+            if key in rows_by_key:
+                rows_by_key[key].update({k: v for k, v in product_data.items() if v is not None})
                 duplicates += 1
             else:
-                # Create new product
-                product = Product(**product_data)
-                db.add(product)
-            
+                rows_by_key[key] = product_data
             successful += 1
             
         except Exception as e:
             validation_errors.append(f"Row {index + 1}: {str(e)}")
             failed += 1
     
-    # Commit the batch
+    # Commit the batch together with its facet rollup deltas
     try:
+        result = upsert_products(db, list(rows_by_key.values()))
+        duplicates += result['updated']
+        if result['unmatched']:
+            validation_errors.append(f"SKUs could not be upserted: {', '.join(result['unmatched'])}")
+            failed += len(result['unmatched'])
+            successful -= len(result['unmatched'])
         db.commit()
     except Exception as e:
         db.rollback()
-        # If batch commit fails, try individual commits
+        # If batch commit fails (e.g. a value too long for its column), try
+        # individual commits so one bad row does not sink the batch
         for index, row in batch_df.iterrows():
             try:
                 # Re-process individual row with individual commit
-                # This is a fallback for constraint violations
                 process_single_product(db, row, index, validation_errors)
             except Exception:
+                db.rollback()
                 failed += 1
                 successful = max(0, successful - 1)
     
@@ -254,18 +264,24 @@ def process_product_batch(db: Session, batch_df: pd.DataFrame, validation_errors
 
 def process_single_product(db: Session, row: pd.Series, index: int, validation_errors: List[str]):
     """Process a single product with individual transaction."""
+    product_data = parse_product_row(row)
+    if product_data is None:
+        validation_errors.append(f"Row {index + 1}: SKU and name are required")
+        return
+    
+    upsert_products(db, [product_data])
+    db.commit()
+
+
+def parse_product_row(row: pd.Series) -> Optional[Dict[str, Any]]:
+    """Product column values from a CSV row, or None if SKU or name is missing."""
     sku = str(row.get('sku', '')).strip()
     name = str(row.get('name', '')).strip()
     
     if not sku or not name:
-        validation_errors.append(f"Row {index + 1}: SKU and name are required")
-        return
-    
-    existing_product = db.query(Product).filter(
-        func.lower(Product.sku) == sku.lower()
-    ).first()
+        return None
     
-    product_data = {
+    return {
         'sku': sku,
         'name': name,
         'description': str(row.get('description', '')).strip() or None,
@@ -275,17 +291,99 @@ def process_single_product(db: Session, row: pd.Series, index: int, validation_e
         'inventory_count': parse_int(row.get('inventory_count', 0)),
         'is_active': parse_bool(row.get('is_active', True))
     }
+
+
+def _insert(db: Session):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def _normalized_skus(db: Session, skus: List[str]) -> Dict[str, str]:
+    """
+    Map SKUs to their sku_normalized value as the database computes it; its
+    lower() need not fold every character the way Python's does.
+    """
+    normalized = {}
+    for chunk in _chunks(skus):
+        given = union_all(*[select(literal(sku).label('sku')) for sku in chunk]).subquery()
+        normalized.update(db.execute(select(given.c.sku, func.lower(given.c.sku))).tuples().all())
+    return normalized
+
+
+def upsert_products(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Insert products, or update the ones whose SKU already exists, keyed on
+    the sku_normalized unique index (commit is left to the caller).
     
-    if existing_product:
-        for key, value in product_data.items():
-            if value is not None:
-                setattr(existing_product, key, value)
-        existing_product.updated_at = datetime.utcnow()
-    else:
-        product = Product(**product_data)
-        db.add(product)
+    One INSERT ... ON CONFLICT DO NOTHING per chunk creates the new SKUs; the
+    rest are locked, read for their facet deltas and updated by id, with only
+    non-empty values overwriting existing ones. SKUs deleted concurrently
+    between those steps go round again; any left after UPSERT_ATTEMPTS are
+    returned as unmatched.
+    """
+    deltas = FacetDeltas()
+    changed: List[int] = []
+    # Keyed like the rows' sku_normalized, so RETURNING and lookups match
+    normalized = _normalized_skus(db, [row['sku'] for row in rows])
+    pending = {normalized[row['sku']]: row for row in rows}
+    created = 0
+    updated = 0
     
-    db.commit()
+    for _ in range(UPSERT_ATTEMPTS):
+        if not pending:
+            break
+        
+        for chunk in _chunks(list(pending)):
+            statement = _insert(db)(Product).on_conflict_do_nothing(index_elements=['sku_normalized'])
+            inserted = db.execute(
+                statement.returning(Product.id, Product.sku_normalized),
+                [pending[key] for key in chunk]
+            ).all()
+            for product_id, key in inserted:
+                deltas.added(pending.pop(key))
+                changed.append(product_id)
+                created += 1
+        
+        # Conflicting inserts wait for the other transaction, so every SKU
+        # still pending now exists, committed, unless it was deleted since
+        existing: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(sorted(pending)):
+            found = db.execute(
+                select(Product.id, Product.sku_normalized, Product.category, Product.brand,
+                       Product.is_active, Product.price)
+                .where(Product.sku_normalized.in_(chunk))
+                .order_by(Product.id)
+                .with_for_update()
+            ).mappings()
+            for old in found:
+                existing[old['sku_normalized']] = dict(old)
+        
+        updates = []
+        for key, old in existing.items():
+            values = {k: v for k, v in pending.pop(key).items() if v is not None}
+            deltas.changed(facet_key(old), {**old, **values})
+            updates.append({'id': old['id'], 'updated_at': datetime.utcnow(), **values})
+            changed.append(old['id'])
+        if updates:
+            # ORM bulk UPDATE by primary key; rows with the same columns share a statement
+            db.execute(update(Product), updates)
+            updated += len(updates)
+    
+    record_facet_deltas(db, deltas)
+    # One multi-row INSERT stamps the whole batch for the change feed
+    record_product_changes(db, changed)
+    return {'created': created, 'updated': updated, 'unmatched': [row['sku'] for row in pending.values()]}
+
+
+def _chunks(values: List, size: int = UPSERT_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def distinct_column_values(batch_df: pd.DataFrame, column: str) -> List[str]:
+    """Distinct non-empty values of an optional CSV column."""
+    if column not in batch_df.columns:
+        return []
+    return [value for value in batch_df[column].astype(str).str.strip().unique() if value]
 
 
 def parse_float(value) -> float:
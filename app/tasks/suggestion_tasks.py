@@ -0,0 +1,19 @@
+from typing import Dict, Any
+
+from ..celery import celery_app
+from ..database import SessionLocal
+from ..suggestions import rebuild_suggestion_sets
+
+
+@celery_app.task(queue='upload_queue')
+def rebuild_suggestion_index_task() -> Dict[str, Any]:
+    """
+    Rebuild the category/brand suggestion sets from the products table (runs on a beat schedule).
+    """
+    db = SessionLocal()
+    
+    try:
+        return {"values": rebuild_suggestion_sets(db)}
+    
+    finally:
+        db.close()
@@ -1,18 +1,47 @@
-from celery import current_task
-from sqlalchemy.orm import Session
-import httpx
-import time
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any
 from datetime import datetime
 
+from ..cache import bump_webhooks_version
 from ..celery import celery_app
+from ..config import settings
 from ..database import SessionLocal
-from ..models import Webhook, WebhookLog
+from ..webhook_dispatch import (
+    deliver_to_webhook,
+    deliver_to_webhooks,
+    record_deliveries
+)
+from ..webhook_circuit import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    circuit_state,
+    claim_circuit_probes,
+    close_circuit,
+    defer_deliveries,
+    oldest_deferred_delivery,
+    reopen_circuit,
+    retry_countdown,
+    take_deferred_deliveries,
+    webhooks_with_deferred_deliveries
+)
+from ..webhook_index import webhook_subscriptions
+from ..webhook_logs import maintain_webhook_logs
+from ..webhook_batching import (
+    BATCH_EVENT_TYPE,
+    buffer_webhook_event,
+    build_batch_payload,
+    due_webhook_batches,
+    take_webhook_batch
+)
 
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60, queue='webhook_queue')
-def send_webhook_task(self, webhook_id: int, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def send_webhook_task(
+    self,
+    webhook_id: int,
+    event_type: str,
+    payload: Dict[str, Any],
+    defer_if_circuit_open: bool = True
+) -> Dict[str, Any]:
     """
     Send webhook notification for an event.
     """
@@ -20,147 +49,231 @@ def send_webhook_task(self, webhook_id: int, event_type: str, payload: Dict[str,
     
     try:
         # Get webhook configuration
-        webhook = db.query(Webhook).filter(
-            Webhook.id == webhook_id,
-            Webhook.is_active == True
-        ).first()
+        webhook = webhook_subscriptions.get(db, webhook_id)
         
         if not webhook:
             return {"success": False, "error": "Webhook not found or inactive"}
         
-        # Check if webhook handles this event type
-        if event_type not in webhook.event_types:
+        # Check if webhook handles this event type (a batch only holds events it does)
+        if event_type != BATCH_EVENT_TYPE and event_type not in webhook.event_types:
             return {"success": False, "error": f"Webhook doesn't handle event type: {event_type}"}
         
-        # Prepare headers
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "ProductImporter-Webhook/1.0"
-        }
+        # Skip endpoints whose circuit is open; the delivery is replayed once a
+        # probe succeeds. The index may lag a circuit that just closed, so confirm
+        if defer_if_circuit_open and webhook.circuit_open and circuit_state(db, webhook_id) != CIRCUIT_CLOSED:
+            defer_deliveries(db, [webhook_id], event_type, payload)
+            db.commit()
+            return {"success": False, "deferred": True, "error": "Circuit open: delivery deferred for replay"}
         
-        # Add custom headers
-        if webhook.headers:
-            headers.update(webhook.headers)
+        # Send webhook over this worker's shared keep-alive connections
+        result = deliver_to_webhook(webhook, payload)
+        record_deliveries(db, event_type, payload, [result], retry_attempt=self.request.retries)
         
-        # Add signature if secret key is provided
-        if webhook.secret_key:
-            signature = generate_signature(payload, webhook.secret_key)
-            headers["X-Webhook-Signature"] = signature
+        if not result.success and self.request.retries < self.max_retries:
+            self.retry(countdown=retry_countdown(self.request.retries))
         
-        # Send webhook
-        start_time = time.time()
+        return result.as_task_result()
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='webhook_queue')
+def trigger_webhook_task(event_type: str, payload: Dict[str, Any]):
+    """
+    Trigger all active webhooks for a specific event type.
+    """
+    db = SessionLocal()
+    
+    try:
+        # Active webhooks that handle this event type, from this worker's in-memory index
+        webhooks = webhook_subscriptions.for_event(db, event_type)
         
-        try:
-            with httpx.Client() as client:
-                response = client.post(
-                    str(webhook.url),
-                    json=payload,
-                    headers=headers,
-                    timeout=webhook.timeout_seconds
-                )
-            
-            response_time_ms = int((time.time() - start_time) * 1000)
-            success = 200 <= response.status_code < 300
-            
-            # Log webhook call
-            webhook_log = WebhookLog(
-                webhook_id=webhook_id,
-                event_type=event_type,
-                payload=payload,
-                response_code=response.status_code,
-                response_body=response.text[:1000],  # Limit response body size
-                response_time_ms=response_time_ms,
-                success=success,
-                retry_attempt=self.request.retries
-            )
-            db.add(webhook_log)
-            
-            # Update webhook stats
-            webhook.last_triggered_at = datetime.utcnow()
-            webhook.last_response_code = response.status_code
-            webhook.last_response_time_ms = response_time_ms
+        # Buffer the event for webhooks that batch, defer it for those whose
+        # circuit is open; the rest get it right away
+        immediate = []
+        deferred = []
+        buffered = 0
+        for webhook in webhooks:
+            if not webhook.batch_window_seconds:
+                if webhook.circuit_open:
+                    deferred.append(webhook.id)
+                else:
+                    immediate.append(webhook)
+                continue
             
+            pending = buffer_webhook_event(db, webhook, event_type, payload)
             db.commit()
-            
-            if not success:
-                # Retry if not successful
-                if self.request.retries < self.max_retries:
-                    self.retry(countdown=60 * (self.request.retries + 1))
-                return {
-                    "success": False,
-                    "response_code": response.status_code,
-                    "response_body": response.text,
-                    "response_time_ms": response_time_ms
-                }
-            
-            return {
-                "success": True,
-                "response_code": response.status_code,
-                "response_time_ms": response_time_ms
-            }
-            
-        except httpx.TimeoutException:
-            # Log timeout error
-            webhook_log = WebhookLog(
-                webhook_id=webhook_id,
-                event_type=event_type,
-                payload=payload,
-                error_message="Request timeout",
-                success=False,
-                retry_attempt=self.request.retries
-            )
-            db.add(webhook_log)
+            buffered += 1
+            # Deliver a full batch without waiting out the window; flushes
+            # queued by concurrent events skip rows one already claimed
+            if pending >= webhook.batch_max_events and not webhook.circuit_open:
+                flush_webhook_batch_task.apply_async((webhook.id,), queue='webhook_queue')
+        
+        if deferred:
+            defer_deliveries(db, deferred, event_type, payload)
             db.commit()
-            
-            if self.request.retries < self.max_retries:
-                self.retry(countdown=60 * (self.request.retries + 1))
-            
-            return {"success": False, "error": "Request timeout"}
-            
-        except Exception as e:
-            # Log other errors
-            webhook_log = WebhookLog(
-                webhook_id=webhook_id,
-                event_type=event_type,
-                payload=payload,
-                error_message=str(e),
-                success=False,
-                retry_attempt=self.request.retries
-            )
-            db.add(webhook_log)
+        
+        # Deliver to every endpoint at once from this task; only the endpoints
+        # that failed are retried, each as its own send_webhook_task
+        failed = 0
+        if immediate:
+            for result in deliver_to_webhooks(db, immediate, event_type, payload):
+                if not result.success:
+                    failed += 1
+                    send_webhook_task.apply_async(
+                        (result.webhook_id, event_type, payload),
+                        countdown=retry_countdown(0),
+                        retries=1,  # This delivery was the first attempt
+                        queue='webhook_queue'
+                    )
+        
+        return {
+            "triggered_webhooks": len(webhooks),
+            "buffered": buffered,
+            "deferred": len(deferred),
+            "delivered": len(immediate) - failed,
+            "retrying": failed
+        }
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='webhook_queue')
+def flush_webhook_batch_task(webhook_id: int) -> Dict[str, Any]:
+    """
+    Deliver a batching webhook's buffered events, as one request per batch.
+    """
+    db = SessionLocal()
+    
+    try:
+        # Events of webhooks deleted or deactivated since are discarded by due_webhook_batches;
+        # while the circuit is open they stay buffered
+        webhook = webhook_subscriptions.get(db, webhook_id)
+        if webhook is None or webhook.circuit_open:
+            return {"batches": 0, "events": 0}
+        limit = webhook.batch_max_events
+        
+        batches = 0
+        events = 0
+        while True:
+            rows = take_webhook_batch(db, webhook_id, limit)
+            if rows:
+                # Queue delivery before the events are gone for good: a failure
+                # in between delivers twice rather than not at all
+                send_webhook_task.apply_async(
+                    (webhook_id, BATCH_EVENT_TYPE, build_batch_payload(rows)),
+                    queue='webhook_queue'
+                )
+                batches += 1
+                events += len(rows)
             db.commit()
-            
-            if self.request.retries < self.max_retries:
-                self.retry(countdown=60 * (self.request.retries + 1))
-            
-            return {"success": False, "error": str(e)}
+            if len(rows) < limit:
+                return {"batches": batches, "events": events}
     
     finally:
         db.close()
 
 
 @celery_app.task(queue='webhook_queue')
-def trigger_webhook_task(event_type: str, payload: Dict[str, Any]):
+def flush_due_webhook_batches_task() -> Dict[str, Any]:
     """
-    Trigger all active webhooks for a specific event type.
+    Flush every webhook batch whose window has elapsed (runs on a beat schedule).
     """
-    from sqlalchemy import text
+    db = SessionLocal()
+    
+    try:
+        webhook_ids = due_webhook_batches(db)
+        for webhook_id in webhook_ids:
+            flush_webhook_batch_task.apply_async((webhook_id,), queue='webhook_queue')
+        
+        return {"flushed_webhooks": len(webhook_ids)}
     
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='webhook_queue')
+def replay_webhook_deliveries_task(webhook_id: int) -> Dict[str, Any]:
+    """
+    Probe a webhook whose circuit has half-opened with its oldest deferred
+    delivery, then replay the rest once the circuit is closed.
+    """
     db = SessionLocal()
     
     try:
-        # Get all active webhooks that handle this event type
-        # Cast both JSON and parameter to JSONB for PostgreSQL @> operator
-        webhooks = db.query(Webhook).filter(
-            Webhook.is_active == True,
-            text("CAST(event_types AS jsonb) @> CAST(:event_type AS jsonb)")
-        ).params(event_type=f'["{event_type}"]').all()
+        webhook = webhook_subscriptions.get(db, webhook_id)
+        if webhook is None:
+            return {"probed": False, "replayed": 0}
         
-        # Send webhook to each configured endpoint
-        for webhook in webhooks:
-            send_webhook_task.apply_async((webhook.id, event_type, payload), queue='webhook_queue')
+        state = circuit_state(db, webhook_id)
+        probed = state == CIRCUIT_HALF_OPEN
+        if probed:
+            probe = oldest_deferred_delivery(db, webhook_id)
+            if probe is None:
+                # Nothing to probe with: close, and let the next delivery decide
+                close_circuit(db, webhook_id, on_probation=True)
+            else:
+                result = deliver_to_webhook(webhook, probe.payload)
+                record_deliveries(db, probe.event_type, probe.payload, [result])
+                if not result.success:
+                    reopen_circuit(db, webhook_id)
+                    db.commit()
+                    return {"probed": True, "recovered": False, "replayed": 0}
+                db.delete(probe)
+                close_circuit(db, webhook_id)
+            db.commit()
+            bump_webhooks_version()
+        elif state != CIRCUIT_CLOSED:
+            return {"probed": False, "replayed": 0}
         
-        return {"triggered_webhooks": len(webhooks)}
+        # Queue the remaining deliveries oldest first; each is retried, or
+        # deferred again if the circuit reopens, like any other delivery
+        limit = settings.webhook_replay_chunk_size
+        replayed = 0
+        while True:
+            rows = take_deferred_deliveries(db, webhook_id, limit)
+            for row in rows:
+                send_webhook_task.apply_async((webhook_id, row.event_type, row.payload), queue='webhook_queue')
+            replayed += len(rows)
+            db.commit()
+            if len(rows) < limit:
+                return {"probed": probed, "recovered": True, "replayed": replayed}
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='webhook_queue')
+def check_webhook_circuits_task() -> Dict[str, Any]:
+    """
+    Half-open circuits whose probe is due and replay deliveries of closed
+    ones (runs on a beat schedule).
+    """
+    db = SessionLocal()
+    
+    try:
+        probes = claim_circuit_probes(db)
+        replays = [webhook_id for webhook_id in webhooks_with_deferred_deliveries(db) if webhook_id not in probes]
+        for webhook_id in probes + replays:
+            replay_webhook_deliveries_task.apply_async((webhook_id,), queue='webhook_queue')
+        
+        return {"probes": len(probes), "replays": len(replays)}
+    
+    finally:
+        db.close()
+
+
+@celery_app.task(queue='webhook_queue')
+def maintain_webhook_logs_task() -> Dict[str, Any]:
+    """
+    Create upcoming webhook log partitions and drop expired ones (runs on a beat schedule).
+    """
+    db = SessionLocal()
+    
+    try:
+        return maintain_webhook_logs(db)
     
     finally:
         db.close()
@@ -181,21 +294,6 @@ def test_webhook_task(webhook_id: int, event_type: str, test_payload: Dict[str,
             }
         }
     
-    return send_webhook_task(webhook_id, event_type, test_payload)
+    # A test goes out even while the circuit is open
+    return send_webhook_task(webhook_id, event_type, test_payload, defer_if_circuit_open=False)
 
-
-def generate_signature(payload: Dict[str, Any], secret_key: str) -> str:
-    """
-    Generate HMAC signature for webhook verification.
-    """
-    import hmac
-    import hashlib
-    
-    payload_bytes = json.dumps(payload, sort_keys=True).encode('utf-8')
-    signature = hmac.new(
-        secret_key.encode('utf-8'),
-        payload_bytes,
-        hashlib.sha256
-    ).hexdigest()
-    
-    return f"sha256={signature}"
\ No newline at end of file
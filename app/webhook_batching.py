@@ -0,0 +1,149 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from .models import Webhook, WebhookPendingEvent
+from .webhook_circuit import CIRCUIT_CLOSED
+from .webhook_index import WebhookConfig
+
+# Event type of a delivered batch; accepted by every batching webhook
+BATCH_EVENT_TYPE = "webhook.batch"
+
+# Single-product events carry the product id in their payload
+PRODUCT_EVENT_TYPES = ("product.created", "product.updated", "product.deleted")
+
+
+def buffer_webhook_event(db: Session, webhook: WebhookConfig, event_type: str, payload: Dict[str, Any]) -> int:
+    """
+    Buffer one event for a batching webhook and return how many it now has
+    pending, counting no further than a full batch (commit is left to the
+    caller).
+    """
+    product_id = payload.get("id") if event_type in PRODUCT_EVENT_TYPES else None
+    db.execute(insert(WebhookPendingEvent), [{
+        "webhook_id": webhook.id,
+        "event_type": event_type,
+        "product_id": product_id,
+        "payload": payload
+    }])
+    # Bounded, so a long backlog (e.g. behind an open circuit) is not counted on every event
+    pending = (
+        select(WebhookPendingEvent.id)
+        .where(WebhookPendingEvent.webhook_id == webhook.id)
+        .limit(webhook.batch_max_events)
+        .subquery()
+    )
+    return db.scalar(select(func.count()).select_from(pending))
+
+
+def due_webhook_batches(db: Session) -> List[int]:
+    """
+    Ids of webhooks whose oldest pending event has waited out the batch window.
+
+    Events left behind by webhooks that were deleted or deactivated are
+    discarded, and those of webhooks that stopped batching are due at once.
+    Batches stay buffered while their webhook's circuit is open.
+    """
+    pending = db.execute(
+        select(
+            WebhookPendingEvent.webhook_id,
+            func.min(WebhookPendingEvent.created_at),
+            Webhook.is_active,
+            Webhook.batch_window_seconds,
+            Webhook.circuit_state
+        )
+        .outerjoin(Webhook, Webhook.id == WebhookPendingEvent.webhook_id)
+        .group_by(WebhookPendingEvent.webhook_id, Webhook.is_active, Webhook.batch_window_seconds, Webhook.circuit_state)
+    ).all()
+
+    orphaned = [webhook_id for webhook_id, _, active, _, _ in pending if not active]
+    if orphaned:
+        db.execute(delete(WebhookPendingEvent).where(WebhookPendingEvent.webhook_id.in_(orphaned)))
+        db.commit()
+
+    return [
+        webhook_id
+        for webhook_id, oldest, active, window, circuit in pending
+        if active and circuit == CIRCUIT_CLOSED and (not window or _age_seconds(oldest) >= window)
+    ]
+
+
+def take_webhook_batch(db: Session, webhook_id: int, limit: int) -> List[Any]:
+    """
+    Remove up to ``limit`` of a webhook's oldest pending events and return
+    them in arrival order.
+
+    The caller commits once the batch is handed off for delivery. On
+    PostgreSQL, concurrent flushes of the same webhook skip rows another
+    flush has already claimed rather than delivering them twice.
+    """
+    oldest = (
+        select(WebhookPendingEvent.id)
+        .where(WebhookPendingEvent.webhook_id == webhook_id)
+        .order_by(WebhookPendingEvent.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        delete(WebhookPendingEvent)
+        .where(WebhookPendingEvent.id.in_(oldest.scalar_subquery()))
+        .returning(
+            WebhookPendingEvent.id,
+            WebhookPendingEvent.event_type,
+            WebhookPendingEvent.product_id,
+            WebhookPendingEvent.payload,
+            WebhookPendingEvent.created_at
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def coalesce_events(rows: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Collapse repeated events for the same product into its latest one.
+
+    Each product keeps a single event at the position of its last change,
+    carrying the latest payload. A product created within the batch stays a
+    product.created event however often it was updated afterwards. Events
+    that are not about a single product are kept as they are.
+    """
+    events: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        key = ("product", row.product_id) if row.product_id is not None else ("event", row.id)
+        previous = events.pop(key, None)
+        event_type = row.event_type
+        if previous is not None and previous["event_type"] == "product.created" and event_type == "product.updated":
+            event_type = "product.created"
+        events[key] = {
+            "event_type": event_type,
+            "occurred_at": _isoformat(row.created_at),
+            "data": row.payload
+        }
+    return list(events.values())
+
+
+def build_batch_payload(rows: List[Any]) -> Dict[str, Any]:
+    """The single payload a batch is delivered as."""
+    events = coalesce_events(rows)
+    return {
+        "event_type": BATCH_EVENT_TYPE,
+        "timestamp": datetime.utcnow().isoformat(),
+        "count": len(events),
+        "coalesced": len(rows) - len(events),
+        "events": events
+    }
+
+
+def _isoformat(timestamp: Optional[datetime]) -> Optional[str]:
+    return timestamp.isoformat() if timestamp is not None else None
+
+
+def _age_seconds(timestamp: Optional[datetime]) -> float:
+    if timestamp is None:
+        return 0.0
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+    return (datetime.now(timezone.utc) - timestamp).total_seconds()
@@ -0,0 +1,209 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Webhook, WebhookDeferredDelivery
+
+# Closed delivers; open defers deliveries until a probe is due; half_open has
+# one probe delivery in flight
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+def backoff_seconds(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with jitter: ``base * 2**attempt``, capped at ``cap``,
+    then a random point in its upper half, so endpoints that failed together
+    are not all retried at the same moment.
+    """
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_countdown(retries: int) -> float:
+    """Seconds to wait before retrying a delivery that has been retried ``retries`` times."""
+    return backoff_seconds(retries, settings.webhook_retry_base_seconds, settings.webhook_retry_max_seconds)
+
+
+def _open_seconds(trips: int) -> float:
+    return backoff_seconds(trips, settings.webhook_circuit_open_seconds, settings.webhook_circuit_max_open_seconds)
+
+
+def open_circuits(db: Session, webhooks: Sequence[Tuple[int, int]], from_state: str) -> List[int]:
+    """
+    Open the circuit of each (webhook id, trips so far) that is still in
+    ``from_state`` and return the ids opened (commit is left to the caller).
+
+    The wait before the next probe grows with every trip.
+    """
+    now = datetime.now(timezone.utc)
+    table = Webhook.__table__
+    opened = []
+    for webhook_id, trips in webhooks:
+        result = db.execute(
+            update(table)
+            .where(table.c.id == webhook_id, table.c.circuit_state == from_state)
+            .values(
+                circuit_state=CIRCUIT_OPEN,
+                circuit_trips=table.c.circuit_trips + 1,
+                circuit_opened_at=func.coalesce(table.c.circuit_opened_at, now),
+                circuit_retry_at=now + timedelta(seconds=_open_seconds(trips))
+            )
+        )
+        if result.rowcount:
+            opened.append(webhook_id)
+    return opened
+
+
+def trip_circuits(db: Session, webhook_ids: Sequence[int]) -> List[int]:
+    """Open the closed circuits among these webhooks that have failed too often in a row (commit is left to the caller)."""
+    tripped = db.execute(
+        select(Webhook.id, Webhook.circuit_trips).where(
+            Webhook.id.in_(webhook_ids),
+            Webhook.circuit_state == CIRCUIT_CLOSED,
+            Webhook.consecutive_failures >= settings.webhook_circuit_failure_threshold
+        )
+    ).all()
+    if not tripped:
+        return []
+    return open_circuits(db, tripped, CIRCUIT_CLOSED)
+
+
+def reopen_circuit(db: Session, webhook_id: int) -> None:
+    """Reopen a half-open circuit after its probe failed (commit is left to the caller)."""
+    trips = db.scalar(select(Webhook.circuit_trips).where(Webhook.id == webhook_id)) or 0
+    open_circuits(db, [(webhook_id, trips)], CIRCUIT_HALF_OPEN)
+
+
+def close_circuit(db: Session, webhook_id: int, on_probation: bool = False) -> None:
+    """
+    Close a webhook's circuit (commit is left to the caller).
+
+    On probation, the circuit closed without a probe, so the next failed
+    delivery opens it again.
+    """
+    values = {
+        "circuit_state": CIRCUIT_CLOSED,
+        "circuit_opened_at": None,
+        "circuit_retry_at": None,
+        "consecutive_failures": 0
+    }
+    if on_probation:
+        values["consecutive_failures"] = max(settings.webhook_circuit_failure_threshold - 1, 0)
+    table = Webhook.__table__
+    db.execute(update(table).where(table.c.id == webhook_id).values(**values))
+
+
+def circuit_state(db: Session, webhook_id: int) -> Optional[str]:
+    """A webhook's current circuit state, read from the database rather than the subscription index."""
+    return db.scalar(select(Webhook.circuit_state).where(Webhook.id == webhook_id))
+
+
+def defer_deliveries(db: Session, webhook_ids: Sequence[int], event_type: str, payload: Dict[str, Any]) -> None:
+    """Queue one delivery for replay to each of these webhooks and count it as skipped (commit is left to the caller)."""
+    db.execute(insert(WebhookDeferredDelivery), [
+        {"webhook_id": webhook_id, "event_type": event_type, "payload": payload}
+        for webhook_id in webhook_ids
+    ])
+    table = Webhook.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id.in_(webhook_ids))
+        .values(skipped_deliveries=table.c.skipped_deliveries + 1)
+    )
+
+
+def claim_circuit_probes(db: Session) -> List[int]:
+    """
+    Half-open every circuit whose probe is due and return the webhook ids.
+
+    Claiming pushes the next probe out as if this one failed, so a probe
+    whose worker is lost is retried later rather than never.
+    """
+    now = datetime.now(timezone.utc)
+    due = db.execute(
+        select(Webhook.id, Webhook.circuit_trips).where(
+            Webhook.is_active == True,
+            Webhook.circuit_state.in_((CIRCUIT_OPEN, CIRCUIT_HALF_OPEN)),
+            Webhook.circuit_retry_at <= now
+        )
+    ).all()
+
+    table = Webhook.__table__
+    claimed = []
+    for webhook_id, trips in due:
+        result = db.execute(
+            update(table)
+            .where(
+                table.c.id == webhook_id,
+                table.c.circuit_state.in_((CIRCUIT_OPEN, CIRCUIT_HALF_OPEN)),
+                table.c.circuit_retry_at <= now
+            )
+            .values(circuit_state=CIRCUIT_HALF_OPEN, circuit_retry_at=now + timedelta(seconds=_open_seconds(trips)))
+        )
+        if result.rowcount:
+            claimed.append(webhook_id)
+    db.commit()
+    return claimed
+
+
+def webhooks_with_deferred_deliveries(db: Session) -> List[int]:
+    """
+    Ids of webhooks whose circuit is closed but which still have deliveries
+    waiting for replay, such as those deferred just before it closed.
+
+    Deliveries left behind by webhooks that were deleted or deactivated are
+    discarded.
+    """
+    deferred = db.execute(
+        select(WebhookDeferredDelivery.webhook_id, Webhook.is_active, Webhook.circuit_state)
+        .outerjoin(Webhook, Webhook.id == WebhookDeferredDelivery.webhook_id)
+        .group_by(WebhookDeferredDelivery.webhook_id, Webhook.is_active, Webhook.circuit_state)
+    ).all()
+
+    orphaned = [webhook_id for webhook_id, active, _ in deferred if not active]
+    if orphaned:
+        db.execute(delete(WebhookDeferredDelivery).where(WebhookDeferredDelivery.webhook_id.in_(orphaned)))
+        db.commit()
+
+    return [webhook_id for webhook_id, active, state in deferred if active and state == CIRCUIT_CLOSED]
+
+
+def oldest_deferred_delivery(db: Session, webhook_id: int) -> Optional[WebhookDeferredDelivery]:
+    """The delivery a half-open circuit is probed with."""
+    return db.scalars(
+        select(WebhookDeferredDelivery)
+        .where(WebhookDeferredDelivery.webhook_id == webhook_id)
+        .order_by(WebhookDeferredDelivery.id)
+        .limit(1)
+    ).first()
+
+
+def take_deferred_deliveries(db: Session, webhook_id: int, limit: int) -> List[Any]:
+    """
+    Remove up to ``limit`` of a webhook's oldest deferred deliveries and
+    return them in arrival order.
+
+    The caller commits once they are queued for delivery; as with webhook
+    batches, concurrent replays skip rows another replay has claimed.
+    """
+    oldest = (
+        select(WebhookDeferredDelivery.id)
+        .where(WebhookDeferredDelivery.webhook_id == webhook_id)
+        .order_by(WebhookDeferredDelivery.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        delete(WebhookDeferredDelivery)
+        .where(WebhookDeferredDelivery.id.in_(oldest.scalar_subquery()))
+        .returning(WebhookDeferredDelivery.id, WebhookDeferredDelivery.event_type, WebhookDeferredDelivery.payload)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return sorted(rows, key=lambda row: row.id)
+
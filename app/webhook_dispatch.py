@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import Boolean, DateTime, Integer, bindparam, case, func, update
+from sqlalchemy.orm import Session
+
+from .cache import bump_webhooks_version
+from .config import settings
+from .models import Webhook
+from .webhook_circuit import trip_circuits
+from .webhook_index import WebhookConfig
+from .webhook_http import AsyncWebhookHttpClient, DeliveryTiming, get_webhook_client, run_async_delivery
+from .webhook_logs import webhook_log_buffer
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one webhook request."""
+    webhook_id: int
+    success: bool
+    response_code: Optional[int] = None
+    response_body: Optional[str] = None
+    timing: Optional[DeliveryTiming] = None
+    error: Optional[str] = None
+
+    def as_task_result(self) -> Dict[str, Any]:
+        """The result dict send_webhook_task returns."""
+        if self.response_code is None:
+            return {"success": False, "error": self.error}
+        result = {
+            "success": self.success,
+            "response_code": self.response_code,
+            "response_time_ms": int(self.timing.total_ms)
+        }
+        if not self.success:
+            result["response_body"] = self.response_body
+        return result
+
+
+def generate_signature(payload: Dict[str, Any], secret_key: str) -> str:
+    """
+    Generate HMAC signature for webhook verification.
+    """
+    payload_bytes = json.dumps(payload, sort_keys=True).encode('utf-8')
+    signature = hmac.new(
+        secret_key.encode('utf-8'),
+        payload_bytes,
+        hashlib.sha256
+    ).hexdigest()
+
+    return f"sha256={signature}"
+
+
+def webhook_headers(webhook: WebhookConfig, payload: Dict[str, Any]) -> Dict[str, str]:
+    """Request headers for one delivery: defaults, the webhook's own headers and its signature."""
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "ProductImporter-Webhook/1.0"
+    }
+    if webhook.headers:
+        headers.update(webhook.headers)
+    if webhook.secret_key:
+        headers["X-Webhook-Signature"] = generate_signature(payload, webhook.secret_key)
+    return headers
+
+
+def _result(webhook_id: int, response: httpx.Response, timing: DeliveryTiming) -> DeliveryResult:
+    return DeliveryResult(
+        webhook_id=webhook_id,
+        success=200 <= response.status_code < 300,
+        response_code=response.status_code,
+        response_body=response.text,
+        timing=timing
+    )
+
+
+def _failure(webhook_id: int, error: Exception) -> DeliveryResult:
+    if isinstance(error, (httpx.TimeoutException, TimeoutError)):
+        return DeliveryResult(webhook_id=webhook_id, success=False, error="Request timeout")
+    return DeliveryResult(webhook_id=webhook_id, success=False, error=str(error))
+
+
+def deliver_to_webhook(webhook: WebhookConfig, payload: Dict[str, Any]) -> DeliveryResult:
+    """Send one delivery over this worker's shared keep-alive connections."""
+    try:
+        response, timing = get_webhook_client().post(
+            str(webhook.url),
+            json=payload,
+            headers=webhook_headers(webhook, payload),
+            timeout=webhook.timeout_seconds
+        )
+    except Exception as e:
+        return _failure(webhook.id, e)
+    return _result(webhook.id, response, timing)
+
+
+async def _deliver_concurrently(
+    client: AsyncWebhookHttpClient,
+    requests: List[tuple],
+    payload: Dict[str, Any]
+) -> List[DeliveryResult]:
+    # Bounds the open requests; each endpoint's timeout starts once it has a slot
+    slots = asyncio.Semaphore(settings.webhook_dispatch_concurrency)
+
+    async def deliver(webhook_id: int, url: str, headers: Dict[str, str], timeout: float) -> DeliveryResult:
+        async with slots:
+            try:
+                response, timing = await client.post(url, timeout=timeout, json=payload, headers=headers)
+            except Exception as e:
+                return _failure(webhook_id, e)
+        return _result(webhook_id, response, timing)
+
+    return await asyncio.gather(*(deliver(*request) for request in requests))
+
+
+def deliver_to_webhooks(db: Session, webhooks: List[WebhookConfig], event_type: str, payload: Dict[str, Any]) -> List[DeliveryResult]:
+    """
+    Deliver one event to every webhook at once and log each delivery.
+
+    The requests run concurrently on this worker's delivery event loop, so a
+    slow endpoint delays the task by its own timeout at most, instead of
+    holding one worker slot per endpoint for the whole wait.
+    """
+    requests = [
+        (webhook.id, str(webhook.url), webhook_headers(webhook, payload), webhook.timeout_seconds)
+        for webhook in webhooks
+    ]
+    results = run_async_delivery(lambda client: _deliver_concurrently(client, requests, payload))
+    record_deliveries(db, event_type, payload, results)
+    return results
+
+
+def record_deliveries(
+    db: Session,
+    event_type: str,
+    payload: Dict[str, Any],
+    results: List[DeliveryResult],
+    retry_attempt: int = 0
+) -> List[int]:
+    """
+    Buffer a log per delivery, update each webhook's last-response stats and
+    failure streak, and commit.
+
+    Returns the ids of webhooks whose circuit these failures opened.
+    """
+    attempted_at = datetime.now(timezone.utc)
+    logs = []
+    health = []
+    for result in results:
+        timing = result.timing
+        logs.append({
+            "webhook_id": result.webhook_id,
+            "event_type": event_type,
+            "response_code": result.response_code,
+            "response_body": result.response_body[:1000] if result.response_body is not None else None,  # Limit response body size
+            "response_time_ms": int(timing.total_ms) if timing else None,
+            "connect_time_ms": int(timing.connect_ms) if timing else None,
+            "server_time_ms": int(timing.server_ms) if timing and timing.server_ms is not None else None,
+            "error_message": result.error,
+            "success": result.success,
+            "retry_attempt": retry_attempt,
+            "created_at": attempted_at
+        })
+
+        responded = result.response_code is not None
+        health.append({
+            "webhook_id": result.webhook_id,
+            "failed": not result.success,
+            "triggered_at": datetime.utcnow() if responded else None,
+            "response_code": result.response_code,
+            "response_time_ms": int(timing.total_ms) if responded else None
+        })
+
+    # Logs are written in bulk by this worker's log buffer
+    if logs:
+        webhook_log_buffer.add(logs, payload)
+
+    if health:
+        # The webhooks are index snapshots rather than loaded rows, and may
+        # have been deleted meanwhile, so update by id without a row check.
+        # Deliveries that got no response keep the last response stats
+        table = Webhook.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("webhook_id"))
+            .values(
+                last_triggered_at=func.coalesce(bindparam("triggered_at", type_=DateTime(timezone=True)), table.c.last_triggered_at),
+                last_response_code=func.coalesce(bindparam("response_code", type_=Integer), table.c.last_response_code),
+                last_response_time_ms=func.coalesce(bindparam("response_time_ms", type_=Integer), table.c.last_response_time_ms),
+                consecutive_failures=case(
+                    (bindparam("failed", type_=Boolean), table.c.consecutive_failures + 1),
+                    else_=0
+                ),
+                circuit_trips=case(
+                    (bindparam("failed", type_=Boolean), table.c.circuit_trips),
+                    else_=0
+                )
+            ),
+            health
+        )
+
+    failed = [row["webhook_id"] for row in health if row["failed"]]
+    opened = trip_circuits(db, failed) if failed else []
+    db.commit()
+    if opened:
+        bump_webhooks_version()
+    return opened
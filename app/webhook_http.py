@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import settings
+
+
+@dataclass
+class DeliveryTiming:
+    """Where the time of one webhook request went, in milliseconds."""
+    total_ms: float
+    connect_ms: float  # DNS, TCP and TLS setup; 0 when a kept-alive connection was reused
+    server_ms: Optional[float]  # Request fully sent until response headers arrived
+
+
+class _Trace:
+    """httpcore trace hook recording when connection setup and the server wait start and end."""
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        # http11.* and http2.* events share their suffixes
+        self.marks[event_name.split(".", 1)[1] if event_name.startswith("http") else event_name] = time.perf_counter()
+
+    async def atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """The same hook for async clients, which must be given a coroutine function."""
+        self(event_name, info)
+
+    def span_ms(self, start: str, *ends: str) -> Optional[float]:
+        end = next((self.marks[name] for name in ends if name in self.marks), None)
+        if start not in self.marks or end is None:
+            return None
+        return (end - self.marks[start]) * 1000
+
+    def timing(self, total_ms: float) -> DeliveryTiming:
+        return DeliveryTiming(
+            total_ms=total_ms,
+            connect_ms=self.span_ms(
+                "connection.connect_tcp.started", "connection.start_tls.complete", "connection.connect_tcp.complete"
+            ) or 0,
+            server_ms=self.span_ms("send_request_body.complete", "receive_response_headers.complete")
+        )
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.webhook_http_max_connections,
+        max_keepalive_connections=settings.webhook_http_max_keepalive_connections,
+        keepalive_expiry=settings.webhook_http_keepalive_expiry_seconds
+    )
+
+
+class WebhookHttpClient:
+    """
+    One keep-alive connection pool shared by every delivery in a worker process.
+
+    Connections to a host are reused across deliveries instead of paying DNS,
+    TCP and TLS setup per request. Concurrent deliveries to one host are
+    capped at ``webhook_http_per_host_limit`` so a slow subscriber cannot
+    hold every connection in the pool.
+    """
+
+    def __init__(self):
+        self._client = httpx.Client(http2=settings.webhook_http2, limits=_limits())
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(settings.webhook_http_per_host_limit)
+            return self._host_slots[host]
+
+    def post(self, url: str, timeout: float, **kwargs) -> tuple:
+        """POST and return (response, DeliveryTiming); the body is read before returning."""
+        trace = _Trace()
+        slot = self._slot(url)
+        if not slot.acquire(timeout=timeout):
+            raise httpx.PoolTimeout(f"No free connection slot for {urlsplit(url).netloc} within {timeout}s")
+        try:
+            start = time.perf_counter()
+            response = self._client.post(url, timeout=timeout, extensions={"trace": trace}, **kwargs)
+            total_ms = (time.perf_counter() - start) * 1000
+        finally:
+            slot.release()
+        return response, trace.timing(total_ms)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class AsyncWebhookHttpClient:
+    """
+    The asyncio counterpart of WebhookHttpClient, for delivering one event to
+    many endpoints at once. It belongs to the event loop it was created on.
+    """
+
+    def __init__(self):
+        self._client = httpx.AsyncClient(http2=settings.webhook_http2, limits=_limits())
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(settings.webhook_http_per_host_limit)
+        return self._host_slots[host]
+
+    async def post(self, url: str, timeout: float, **kwargs) -> tuple:
+        """POST and return (response, DeliveryTiming), giving up after ``timeout`` seconds in total."""
+        trace = _Trace()
+        # The deadline covers waiting for a host slot as well as the request
+        async with asyncio.timeout(timeout):
+            async with self._slot(url):
+                start = time.perf_counter()
+                response = await self._client.post(url, timeout=timeout, extensions={"trace": trace.atrace}, **kwargs)
+                total_ms = (time.perf_counter() - start) * 1000
+        return response, trace.timing(total_ms)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[WebhookHttpClient] = None
+_client_lock = threading.Lock()
+
+# Async deliveries run on one long-lived event loop per process, in its own
+# thread, so the async client's kept-alive connections outlive each task
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_async_client: Optional[AsyncWebhookHttpClient] = None
+
+T = TypeVar("T")
+
+
+def get_webhook_client() -> WebhookHttpClient:
+    """This process's shared client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WebhookHttpClient()
+        return _client
+
+
+def _delivery_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_thread
+    with _client_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="webhook-delivery-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def run_async_delivery(deliver: Callable[[AsyncWebhookHttpClient], Awaitable[T]]) -> T:
+    """Run ``deliver(client)`` on this process's delivery loop and wait for its result."""
+    async def run() -> T:
+        global _async_client
+        if _async_client is None:
+            _async_client = AsyncWebhookHttpClient()
+        return await deliver(_async_client)
+
+    return asyncio.run_coroutine_threadsafe(run(), _delivery_loop()).result()
+
+
+def open_webhook_client() -> None:
+    """
+    Start a fresh client for this process (on worker startup). Clients and
+    the delivery loop inherited over fork are abandoned, not closed: their
+    sockets belong to the parent, and the loop's thread did not survive.
+    """
+    global _client, _loop, _loop_thread, _async_client
+    with _client_lock:
+        _client = WebhookHttpClient()
+        _loop = _loop_thread = _async_client = None
+
+
+def close_webhook_client() -> None:
+    """Close this process's clients and their kept-alive connections (on worker shutdown)."""
+    global _client, _loop, _loop_thread, _async_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        loop, thread, async_client = _loop, _loop_thread, _async_client
+        _client = _loop = _loop_thread = _async_client = None
+
+    if loop is not None:
+        if async_client is not None:
+            asyncio.run_coroutine_threadsafe(async_client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,121 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import cast, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from .cache import get_webhooks_version
+from .config import settings
+from .models import Webhook
+from .webhook_circuit import CIRCUIT_CLOSED
+
+
+@dataclass(frozen=True)
+class WebhookConfig:
+    """Delivery settings of one active webhook, as held in the subscription index."""
+    id: int
+    url: str
+    event_types: Tuple[str, ...]
+    headers: Optional[Dict[str, str]]
+    secret_key: Optional[str]
+    timeout_seconds: int
+    batch_window_seconds: Optional[int]
+    batch_max_events: int
+    circuit_open: bool  # Open or half-open: deliveries are deferred for replay
+
+    @classmethod
+    def from_model(cls, webhook: Webhook) -> "WebhookConfig":
+        return cls(
+            id=webhook.id,
+            url=webhook.url,
+            event_types=tuple(webhook.event_types or ()),
+            headers=dict(webhook.headers) if webhook.headers else None,
+            secret_key=webhook.secret_key,
+            timeout_seconds=webhook.timeout_seconds or 30,
+            batch_window_seconds=webhook.batch_window_seconds,
+            batch_max_events=webhook.batch_max_events or 1,
+            circuit_open=(webhook.circuit_state or CIRCUIT_CLOSED) != CIRCUIT_CLOSED
+        )
+
+
+def _load_for_event(db: Session, event_type: str) -> List[WebhookConfig]:
+    """Active webhooks subscribed to an event type, from the database."""
+    query = select(Webhook).where(Webhook.is_active == True).order_by(Webhook.id)
+    if db.bind.dialect.name == "postgresql":
+        # Served by the GIN index on (event_types::jsonb)
+        webhooks = db.scalars(query.where(cast(Webhook.event_types, JSONB).contains([event_type]))).all()
+    else:
+        webhooks = [webhook for webhook in db.scalars(query) if event_type in (webhook.event_types or ())]
+    return [WebhookConfig.from_model(webhook) for webhook in webhooks]
+
+
+class WebhookSubscriptionIndex:
+    """
+    Per-process map of event type -> active webhook configs.
+
+    Each event type is loaded from the database the first time it is
+    dispatched; after that, dispatching needs no query. Webhook writes and
+    circuit changes bump the webhooks version in Redis, checked at most every
+    ``webhook_index_check_seconds``; a new version drops every entry. While
+    Redis is unavailable, entries are dropped every
+    ``webhook_index_fallback_ttl_seconds`` instead.
+    """
+
+    def __init__(self):
+        self._by_event: Dict[str, List[WebhookConfig]] = {}
+        self._by_id: Dict[int, Optional[WebhookConfig]] = {}
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._loaded_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def for_event(self, db: Session, event_type: str) -> List[WebhookConfig]:
+        """Active webhooks subscribed to ``event_type``."""
+        with self._lock:
+            self._check_version()
+            if event_type not in self._by_event:
+                configs = _load_for_event(db, event_type)
+                self._by_event[event_type] = configs
+                for config in configs:
+                    self._by_id[config.id] = config
+            return self._by_event[event_type]
+
+    def get(self, db: Session, webhook_id: int) -> Optional[WebhookConfig]:
+        """One webhook's config, or None if it does not exist or is inactive."""
+        with self._lock:
+            self._check_version()
+            if webhook_id not in self._by_id:
+                webhook = db.get(Webhook, webhook_id)
+                self._by_id[webhook_id] = (
+                    WebhookConfig.from_model(webhook) if webhook is not None and webhook.is_active else None
+                )
+            return self._by_id[webhook_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear(time.monotonic())
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.webhook_index_check_seconds:
+            return
+        self._checked_at = now
+
+        version = get_webhooks_version()
+        if version is None:
+            if now - self._loaded_at >= settings.webhook_index_fallback_ttl_seconds:
+                self._clear(now)
+        elif version != self._version:
+            self._clear(now)
+        self._version = version
+
+    def _clear(self, now: float) -> None:
+        self._by_event = {}
+        self._by_id = {}
+        self._loaded_at = now
+
+
+webhook_subscriptions = WebhookSubscriptionIndex()
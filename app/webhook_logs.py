@@ -0,0 +1,218 @@
+import hashlib
+import json
+import re
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal
+from .models import WebhookLog, WebhookPayload
+
+# Daily partitions of webhook_logs on PostgreSQL, named after their UTC day
+PARTITION_PREFIX = "webhook_logs_p"
+DEFAULT_PARTITION = "webhook_logs_default"
+_PARTITION_NAME = re.compile(r"^webhook_logs_p(\d{8})$")
+
+# A stored payload's last_seen_at is only refreshed once it is this old, so
+# the deliveries and retries of one event do not all rewrite its row
+PAYLOAD_REFRESH_INTERVAL = timedelta(days=1)
+
+# Rows deleted per statement when pruning
+PRUNE_CHUNK_SIZE = 10000
+
+
+def payload_digest(payload: Dict[str, Any]) -> str:
+    """The key a payload is stored under: sha256 of its canonical JSON."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _upsert(db: Session):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+def write_webhook_logs(db: Session, logs: List[Dict[str, Any]], payloads: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Insert delivery logs and the payloads they reference (commit is left to
+    the caller).
+
+    ``payloads`` maps digest -> payload; one already stored is left as it
+    is, apart from a stale last_seen_at.
+    """
+    now = datetime.now(timezone.utc)
+    statement = _upsert(db)(WebhookPayload)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["digest"],
+            set_={"last_seen_at": statement.excluded.last_seen_at},
+            where=WebhookPayload.last_seen_at < now - PAYLOAD_REFRESH_INTERVAL
+        ),
+        # In digest order, so concurrent flushes lock shared payloads in the same order
+        [{"digest": digest, "payload": payloads[digest], "last_seen_at": now} for digest in sorted(payloads)]
+    )
+    db.execute(insert(WebhookLog), logs)
+
+
+class WebhookLogBuffer:
+    """
+    Per-process write buffer for webhook delivery logs.
+
+    Logs are inserted in bulk, in their own transaction, with each distinct
+    payload stored once in webhook_payloads. The buffer is flushed
+    ``webhook_log_buffer_window_ms`` after its first log arrived, as soon as
+    ``webhook_log_buffer_max_rows`` logs are waiting, and when the worker
+    shuts down. Logs still buffered when a worker is killed are lost.
+    """
+
+    def __init__(self):
+        self._logs: List[Dict[str, Any]] = []
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def add(self, logs: List[Dict[str, Any]], payload: Dict[str, Any]) -> None:
+        """Buffer the logs of deliveries of one payload (WebhookLog columns apart from payload_digest)."""
+        digest = payload_digest(payload)
+        with self._lock:
+            self._payloads.setdefault(digest, payload)
+            self._logs.extend(dict(log, payload_digest=digest) for log in logs)
+            full = len(self._logs) >= settings.webhook_log_buffer_max_rows
+            if not full and self._timer is None:
+                self._timer = threading.Timer(settings.webhook_log_buffer_window_ms / 1000, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered log now and return how many were written."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            logs, self._logs = self._logs, []
+            payloads, self._payloads = self._payloads, {}
+        if not logs:
+            return 0
+
+        db = SessionLocal()
+        try:
+            write_webhook_logs(db, logs, payloads)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Failed to write {len(logs)} webhook logs: {e}")
+            return 0
+        finally:
+            db.close()
+        return len(logs)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _is_partitioned(db: Session) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    return bool(db.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('webhook_logs'))"
+    )))
+
+
+def _partition_days(db: Session) -> Dict[date, str]:
+    names = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'webhook_logs'::regclass"
+    ))
+    days = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            days[datetime.strptime(match.group(1), "%Y%m%d").date()] = name
+    return days
+
+
+def _create_partition(db: Session, day: date) -> str:
+    """
+    Create one day's partition, moving in any of that day's logs the default
+    partition caught meanwhile (PostgreSQL refuses to attach it otherwise).
+    """
+    name = f"{PARTITION_PREFIX}{day:%Y%m%d}"
+    start, end = _day_start(day).isoformat(), _day_start(day + timedelta(days=1)).isoformat()
+    db.execute(text(f"CREATE TABLE {name} (LIKE webhook_logs INCLUDING DEFAULTS)"))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= '{start}' AND created_at < '{end}' RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    db.execute(text(f"ALTER TABLE webhook_logs ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return name
+
+
+def _default_partition_days(db: Session) -> List[date]:
+    return list(db.scalars(text(
+        f"SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::date FROM {DEFAULT_PARTITION}"
+    )))
+
+
+def _delete_in_chunks(db: Session, model, key, condition) -> int:
+    deleted = 0
+    while True:
+        chunk = select(key).where(condition).limit(PRUNE_CHUNK_SIZE).scalar_subquery()
+        result = db.execute(delete(model).where(key.in_(chunk)).execution_options(synchronize_session=False))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < PRUNE_CHUNK_SIZE:
+            return deleted
+
+
+def maintain_webhook_logs(db: Session) -> Dict[str, Any]:
+    """
+    Apply webhook log retention.
+
+    With a partitioned table, the next few days' partitions are created, as
+    are those of any days the default partition caught logs for (e.g. while
+    beat was stopped), and those wholly older than
+    ``webhook_log_retention_days`` are dropped; otherwise (not PostgreSQL)
+    old logs are deleted in chunks. Payloads no retained log can reference
+    are deleted in both cases.
+    """
+    today = datetime.now(timezone.utc).date()
+    cutoff = today - timedelta(days=settings.webhook_log_retention_days)
+    result: Dict[str, Any] = {}
+
+    if _is_partitioned(db):
+        existing = _partition_days(db)
+        days = {today + timedelta(days=offset) for offset in range(settings.webhook_log_partitions_ahead_days + 1)}
+        days.update(day for day in _default_partition_days(db) if day >= cutoff)
+        created = [_create_partition(db, day) for day in sorted(days) if day not in existing]
+        # Caught logs already past retention are not worth a partition
+        db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < '{_day_start(cutoff).isoformat()}'"))
+
+        dropped = []
+        for day, name in sorted(existing.items()):
+            if day < cutoff:
+                db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+        db.commit()
+        result.update(created_partitions=created, dropped_partitions=dropped)
+    else:
+        result["deleted_logs"] = _delete_in_chunks(db, WebhookLog, WebhookLog.id, WebhookLog.created_at < _day_start(cutoff))
+
+    # A retained log's payload was seen at most PAYLOAD_REFRESH_INTERVAL before it
+    result["deleted_payloads"] = _delete_in_chunks(
+        db,
+        WebhookPayload,
+        WebhookPayload.digest,
+        WebhookPayload.last_seen_at < _day_start(cutoff) - PAYLOAD_REFRESH_INTERVAL
+    )
+    return result
+
+
+webhook_log_buffer = WebhookLogBuffer()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Load comparison: async API routes vs. the previous threadpool (sync) routes.
+
+Starts the real app (async routes) and benchmarks/sync_app.py (sync routes)
+under uvicorn with one worker each, then drives both with the same mix of
+product detail, product list and import job list requests at increasing
+concurrency. The response cache is disabled so every request hits the
+database. Server errors (e.g. pool checkout timeouts) show up in the
+errors column.
+
+    DATABASE_URL=postgresql://... python benchmarks/async_vs_sync_load.py --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import get_engine, print_table, seed_products
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(app_path: str, port: int, app_dir: str) -> subprocess.Popen:
+    env = dict(os.environ, RESPONSE_CACHE_ENABLED="false", DEBUG="false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(port),
+         "--app-dir", app_dir, "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_until_ready(base_url: str, path: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(path)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, max_id: int) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                roll = random.random()
+                if roll < 0.6:
+                    path = f"/api/v1/products/{random.randint(1, max_id)}"
+                elif roll < 0.9:
+                    path = f"/api/v1/products/?page={random.randint(1, 50)}&size=50"
+                else:
+                    path = "/api/v1/import/jobs?limit=20"
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "req_per_s": count / duration,
+        "p50_ms": latencies[count // 2] if count else None,
+        "p99_ms": latencies[min(count - 1, int(count * 0.99))] if count else None,
+    }
+
+
+async def main_async(args) -> None:
+    servers = {
+        "async": ("app.main:app", args.port, ROOT),
+        "sync": ("sync_app:app", args.port + 1, os.path.join(ROOT, "benchmarks")),
+    }
+    processes = [start_server(app_path, port, app_dir) for app_path, port, app_dir in servers.values()]
+    try:
+        for _, port, _ in servers.values():
+            await wait_until_ready(f"http://127.0.0.1:{port}", "/api/v1/import/jobs")
+
+        results = []
+        for concurrency in args.concurrency:
+            for label, (_, port, _) in servers.items():
+                stats = await run_load(f"http://127.0.0.1:{port}", concurrency, args.duration, args.rows)
+                results.append({"stack": label, "concurrency": concurrency, **stats})
+                print(f"{label:5} c={concurrency}: {stats['req_per_s']:.0f} req/s")
+
+        print()
+        print_table(results, ["stack", "concurrency", "requests", "errors", "req_per_s", "p50_ms", "p99_ms"])
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Minimum catalog size to seed")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    seed_products(get_engine(), args.rows)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
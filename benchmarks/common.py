@@ -0,0 +1,116 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against the database in DATABASE_URL, so point it at a
+disposable database: seeding adds millions of synthetic products.
+"""
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+
+
+SEED_SQL = """
+INSERT INTO products (sku, name, description, price, category, brand, inventory_count, is_active)
+SELECT
+    'BENCH-' || lpad(i::text, 9, '0'),
+    (ARRAY['Ultra', 'Classic', 'Pro', 'Eco', 'Smart', 'Mini', 'Max', 'Prime', 'Lite', 'Turbo'])[1 + i % 10]
+        || ' ' || (ARRAY['Widget', 'Gadget', 'Blender', 'Lamp', 'Chair', 'Kettle', 'Drill', 'Speaker', 'Backpack', 'Monitor'])[1 + (i / 10) % 10]
+        || ' ' || i,
+    'Synthetic benchmark product ' || i || ' with a longer description used to pad rows to a realistic width',
+    round(((i * 37) % 100000) / 100.0, 2),
+    'Category ' || (i % 40),
+    'Brand ' || (i % 250),
+    (i * 13) % 500,
+    i % 10 <> 0
+FROM generate_series(:start, :stop) AS i
+"""
+
+
+def get_engine() -> Engine:
+    """Create an engine for the configured database without SQL echo."""
+    return create_engine(settings.database_url, echo=False)
+
+
+def seed_products(engine: Engine, rows: int, batch_size: int = 500_000) -> int:
+    """Top the products table up to at least ``rows`` synthetic products."""
+    with engine.connect() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM products")).scalar()
+
+    if existing >= rows:
+        return existing
+
+    start = existing + 1
+    while start <= rows:
+        stop = min(start + batch_size - 1, rows)
+        with engine.begin() as conn:
+            conn.execute(text(SEED_SQL), {"start": start, "stop": stop})
+        print(f"Seeded products {start:,}..{stop:,}")
+        start = stop + 1
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE products"))
+
+    return rows
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Run ``func`` repeatedly and return latency statistics in milliseconds."""
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
+
+
+def explain_analyze(conn: Connection, sql: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Return the JSON EXPLAIN ANALYZE plan for a statement."""
+    plan = conn.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params or {}
+    ).scalar()
+    return plan[0]
+
+
+def plan_node_types(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the node types of a JSON plan, e.g. ['Limit', 'Seq Scan']."""
+    nodes = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_node_types(child))
+    return nodes
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    """Print a list of dicts as a fixed-width table."""
+    widths = {
+        column: max([len(column)] + [len(format_cell(row.get(column))) for row in rows])
+        for column in columns
+    }
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    print("  ".join("-" * widths[column] for column in columns))
+    for row in rows:
+        print("  ".join(format_cell(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def format_cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "" if value is None else str(value)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark /products/export throughput and memory.
+
+Seeds a synthetic catalog, then drains app.export.stream_products_export
+in-process for every format, with and without gzip, discarding the bytes.
+Reports rows/s, output MB/s and the peak RSS growth of the process while
+streaming, which should stay flat as the catalog grows.
+
+    DATABASE_URL=postgresql://... python benchmarks/export_throughput.py --rows 5000000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import time
+
+from sqlalchemy import text
+
+from common import get_engine, print_table, seed_products
+
+from app.export import stream_products_export
+from app.schemas import ProductFilter
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        # Not Linux: fall back to the (monotonic) peak RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_export(export_format: str, compress: bool, filters: ProductFilter) -> dict:
+    start_rss = peak_rss = current_rss_mb()
+    output_bytes = 0
+    chunks = 0
+
+    start = time.perf_counter()
+    async for chunk in stream_products_export(filters, export_format, compress):
+        output_bytes += len(chunk)
+        chunks += 1
+        if chunks % 20 == 0:
+            peak_rss = max(peak_rss, current_rss_mb())
+    elapsed = time.perf_counter() - start
+    peak_rss = max(peak_rss, current_rss_mb())
+
+    return {
+        "seconds": elapsed,
+        "output_mb": output_bytes / 2 ** 20,
+        "mb_per_s": output_bytes / 2 ** 20 / elapsed,
+        "chunks": chunks,
+        "rss_growth_mb": peak_rss - start_rss,
+    }
+
+
+async def run_all(formats, filters: ProductFilter, total: int) -> list:
+    # One event loop for every run: the app's async engine pool is bound to it
+    results = []
+    for export_format in formats:
+        for compress in (False, True):
+            stats = await run_export(export_format, compress, filters)
+            results.append({
+                "format": export_format,
+                "gzip": "yes" if compress else "no",
+                "rows_per_s": f"{total / stats['seconds']:,.0f}",
+                **stats,
+            })
+            print(f"{export_format} gzip={compress}: {stats['seconds']:.1f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000, help="Minimum catalog size to seed")
+    parser.add_argument("--formats", nargs="+", default=["csv", "ndjson", "parquet"])
+    parser.add_argument("--category", help="Export only this category (e.g. 'Category 7') instead of everything")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    total = seed_products(engine, args.rows)
+    filters = ProductFilter(category=args.category)
+    if args.category:
+        with engine.connect() as conn:
+            total = conn.execute(
+                text("SELECT count(*) FROM products WHERE category ILIKE :pattern"),
+                {"pattern": f"%{args.category}%"}
+            ).scalar()
+    print(f"Exporting {total:,} products\n")
+
+    results = asyncio.run(run_all(args.formats, filters, total))
+
+    print()
+    print_table(results, ["format", "gzip", "seconds", "rows_per_s", "output_mb", "mb_per_s", "chunks", "rss_growth_mb"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Replay listing, search and suggestion requests and audit their query plans.
+
+Seeds a synthetic catalog, then sends a matrix of filter / pagination /
+count combinations for GET /products, plus search and suggestion queries,
+through the real app in-process (response cache off). Each case records
+request latency and every SQL statement the endpoint ran; the statements
+are then re-run under EXPLAIN (ANALYZE, BUFFERS) with the same parameters.
+
+The report flags, per case:
+
+- sequential scans reading more than --scan-rows rows
+- index scans whose filter discards more than --scan-rows rows
+- sorts over more than --scan-rows rows (no index delivers the order)
+
+and lists the products indexes that no case used. --save writes the
+results as a JSON baseline; --compare reports cases that got slower than
+a baseline by more than --threshold, or gained a flag, and exits non-zero
+when there are any.
+
+    DATABASE_URL=postgresql://... python benchmarks/listing_query_plans.py --rows 5000000 --save baseline.json
+    DATABASE_URL=postgresql://... python benchmarks/listing_query_plans.py --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import event, text
+
+from common import get_engine, plan_node_types, print_table, seed_products
+
+from app.config import settings
+from app.database import async_engine, async_read_engine
+from app.main import app
+
+
+# Listing filters, chosen to match a small, medium and large share of the
+# synthetic catalog from common.SEED_SQL
+LISTING_FILTERS: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "sku": {"sku": "00123"},
+    "name": {"name": "blender 77"},
+    "category": {"category": "Category 17"},
+    "brand": {"brand": "Brand 123"},
+    "active": {"is_active": "true"},
+    "inactive": {"is_active": "false"},
+    "price": {"min_price": 100, "max_price": 150},
+    "category+active": {"category": "Category 17", "is_active": "true"},
+    "category+brand+price": {"category": "Category 3", "brand": "Brand 3", "max_price": 500},
+}
+
+# Offset depths stay within settings.max_pagination_offset at size 50
+LISTING_PAGES: Dict[str, Dict[str, Any]] = {
+    "page 1": {"page": 1},
+    "page 20": {"page": 20},
+    "page 200": {"page": 200},
+}
+
+COUNT_STRATEGIES = ("exact", "estimated")
+
+SEARCH_QUERIES = ("blender", "smart kettle", "pro drill 4242")
+SUGGESTION_QUERIES = ("bl", "kettle 42", "Brand 12", "BENCH-0000")
+
+Case = Tuple[str, str, Dict[str, Any]]
+
+
+def build_cases() -> List[Case]:
+    """(label, path, query params) for every request in the matrix."""
+    cases: List[Case] = []
+    for filter_label, filters in LISTING_FILTERS.items():
+        for page_label, page in LISTING_PAGES.items():
+            cases.append((f"list {filter_label} {page_label}", "/api/v1/products/", {**filters, **page}))
+        for strategy in COUNT_STRATEGIES:
+            cases.append((f"list {filter_label} count={strategy}", "/api/v1/products/", {**filters, "count": strategy}))
+        # Cursor pages after the first, forwards and backwards, are filled in
+        # from the previous response's cursors at run time
+        cases.append((f"list {filter_label} cursor next", "/api/v1/products/", {**filters, "pagination": "cursor"}))
+        cases.append((f"list {filter_label} cursor prev", "/api/v1/products/", {**filters, "pagination": "cursor"}))
+    for q in SEARCH_QUERIES:
+        cases.append((f"search '{q}'", "/api/v1/products/search", {"q": q}))
+        cases.append((f"search '{q}' active", "/api/v1/products/search", {"q": q, "is_active": "true"}))
+    for q in SUGGESTION_QUERIES:
+        cases.append((f"suggest '{q}'", "/api/v1/products/search/suggestions", {"q": q}))
+    return cases
+
+
+class StatementRecorder:
+    """Collects the SQL sent on the app's async engines while recording."""
+
+    def __init__(self):
+        self.recording = False
+        self.statements: List[Tuple[str, Any]] = []
+        engines = {id(engine): engine for engine in (async_engine, async_read_engine)}
+        for engine in engines.values():
+            event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+    def start(self) -> None:
+        self.statements = []
+        self.recording = True
+
+    def stop(self) -> List[Tuple[str, Any]]:
+        self.recording = False
+        return self.statements
+
+
+async def resolve_cursor(client: httpx.AsyncClient, label: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a cursor case into a request for the second page (next) or back to the first (prev)."""
+    first = (await client.get("/api/v1/products/", params=params)).json()
+    if not first.get("next_cursor"):
+        return params
+    if label.endswith("next"):
+        return {**params, "cursor": first["next_cursor"]}
+    second = (await client.get("/api/v1/products/", params={**params, "cursor": first["next_cursor"]})).json()
+    return {**params, "cursor": second.get("prev_cursor") or first["next_cursor"]}
+
+
+async def time_request(client: httpx.AsyncClient, path: str, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Latency statistics in milliseconds over ``repeat`` requests, after one warmup."""
+    response = await client.get(path, params=params)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get(path, params=params)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "status": response.status_code,
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+async def explain_statement(statement: str, parameters: Any) -> Dict[str, Any]:
+    """EXPLAIN ANALYZE one captured statement with its original driver parameters."""
+    async with async_engine.connect() as conn:
+        plan = (await conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+        )).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+def walk(node: Dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def rows_removed(node: Dict[str, Any]) -> int:
+    """Rows a scan node read and its filter then discarded, over all loops."""
+    return int(node.get("Rows Removed by Filter", 0) * node.get("Actual Loops", 1))
+
+
+def rows_read(node: Dict[str, Any]) -> int:
+    """Rows a scan node read, including those its filter discarded, over all loops."""
+    return int(node.get("Actual Rows", 0) * node.get("Actual Loops", 1)) + rows_removed(node)
+
+
+def audit_plan(plan: Dict[str, Any], scan_rows: int) -> Dict[str, Any]:
+    """Indexes used and flagged nodes in one EXPLAIN ANALYZE plan."""
+    indexes = set()
+    flags = []
+    for node in walk(plan["Plan"]):
+        node_type = node["Node Type"]
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        if node_type in ("Seq Scan", "Parallel Seq Scan"):
+            scanned = rows_read(node)
+            if scanned > scan_rows:
+                condition = f" filter {node['Filter']}" if "Filter" in node else ""
+                flags.append(f"seq scan {node.get('Relation Name')} ({scanned:,} rows){condition}")
+        elif node_type in ("Index Scan", "Index Only Scan", "Bitmap Heap Scan"):
+            # An index that supplies order but not selectivity, e.g. walking
+            # the name index while filtering on category
+            removed = rows_removed(node)
+            if removed > scan_rows:
+                index = node.get("Index Name", "bitmap")
+                flags.append(f"{node_type.lower()} {index} ({removed:,} rows discarded) filter {node.get('Filter')}")
+        elif node_type == "Sort":
+            sorted_rows = sum(int(child.get("Actual Rows", 0) * child.get("Actual Loops", 1)) for child in node.get("Plans", []))
+            if sorted_rows > scan_rows:
+                flags.append(f"sort {sorted_rows:,} rows by {', '.join(node.get('Sort Key', []))}")
+    return {
+        "indexes": indexes,
+        "flags": flags,
+        "execution_ms": plan.get("Execution Time", 0.0),
+        "nodes": plan_node_types(plan["Plan"]),
+    }
+
+
+async def run_cases(cases: List[Case], repeat: int, scan_rows: int) -> List[Dict[str, Any]]:
+    # One event loop for every case: the app's async engine pool is bound to it
+    recorder = StatementRecorder()
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as client:
+        for label, path, params in cases:
+            if "cursor" in label:
+                params = await resolve_cursor(client, label, params)
+
+            timing = await time_request(client, path, params, repeat)
+
+            recorder.start()
+            await client.get(path, params=params)
+            statements = recorder.stop()
+
+            indexes, flags, db_ms = set(), [], 0.0
+            for statement, parameters in statements:
+                audit = audit_plan(await explain_statement(statement, parameters), scan_rows)
+                indexes |= audit["indexes"]
+                flags += audit["flags"]
+                db_ms += audit["execution_ms"]
+
+            results.append({
+                "case": label,
+                **timing,
+                "statements": len(statements),
+                "db_ms": db_ms,
+                "indexes": sorted(indexes),
+                "flags": flags,
+            })
+            print(f"{label}: {timing['median_ms']:.1f}ms{' FLAGGED' if flags else ''}")
+    return results
+
+
+def product_indexes(engine) -> List[str]:
+    with engine.connect() as conn:
+        return list(conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = 'products' ORDER BY indexname")
+        ).scalars())
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """Cases slower than the baseline beyond both limits, or with flags the baseline did not have."""
+    previous = {result["case"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["case"])
+        if before is None:
+            continue
+        delta = result["median_ms"] - before["median_ms"]
+        slower = delta > min_delta_ms and result["median_ms"] > before["median_ms"] * (1 + threshold)
+        new_flags = [flag for flag in result["flags"] if flag.split(" (")[0] not in {f.split(" (")[0] for f in before["flags"]}]
+        if slower or new_flags:
+            regressions.append({
+                "case": result["case"],
+                "before_ms": before["median_ms"],
+                "after_ms": result["median_ms"],
+                "change": f"{delta / before['median_ms'] * 100:+.0f}%" if before["median_ms"] else None,
+                "new_flags": "; ".join(new_flags),
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Minimum catalog size to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed requests per case")
+    parser.add_argument("--scan-rows", type=int, default=10_000, help="Flag seq scans and sorts reading more rows than this")
+    parser.add_argument("--match", help="Only run cases whose label contains this text")
+    parser.add_argument("--save", help="Write results to this JSON file as a baseline")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Query plan benchmarks require PostgreSQL (EXPLAIN ANALYZE JSON plans)")
+
+    total = seed_products(engine, args.rows)
+    print(f"Catalog size: {total:,} products\n")
+
+    # Every request must reach the database
+    settings.response_cache_enabled = False
+
+    cases = [case for case in build_cases() if not args.match or args.match in case[0]]
+    results = asyncio.run(run_cases(cases, args.repeat, args.scan_rows))
+
+    print()
+    print_table(
+        [{**result, "indexes": ", ".join(result["indexes"]), "flags": len(result["flags"])} for result in results],
+        ["case", "status", "median_ms", "p95_ms", "statements", "db_ms", "flags", "indexes"]
+    )
+
+    flagged = [result for result in results if result["flags"]]
+    print(f"\nFlagged cases: {len(flagged)} of {len(results)}")
+    for result in flagged:
+        for flag in result["flags"]:
+            print(f"  {result['case']}: {flag}")
+
+    used = set().union(*(result["indexes"] for result in results))
+    unused = [index for index in product_indexes(engine) if index not in used]
+    print("\nproducts indexes used by no case (candidates to drop, or missing a query shape):")
+    for index in unused:
+        print(f"  {index}")
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({"rows": total, "results": results}, output, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        print(f"\nRegressions against {args.compare}: {len(regressions)}")
+        if regressions:
+            print_table(regressions, ["case", "before_ms", "after_ms", "change", "new_flags"])
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
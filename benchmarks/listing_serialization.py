@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark product listing serialization: ORM + Pydantic vs column tuples + orjson.
+
+Builds the same listing page both ways against the seeded catalog:
+
+- "orm": load Product objects and dump them through ProductListResponse
+  (the previous get_products path)
+- "tuples": select columns as tuples and encode plain dicts with orjson
+  (the current path), with all fields and with a fields= subset
+
+    DATABASE_URL=postgresql://... python benchmarks/listing_serialization.py --size 100
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from common import get_engine, print_table, seed_products, time_call
+
+from app.database import AsyncSessionLocal
+from app.models import Product
+from app.schemas import ProductListResponse
+from app.serialization import CURSOR_FIELDS, dumps, parse_fields, product_columns, rows_to_items
+
+
+async def orm_page(db, size: int) -> bytes:
+    products = (await db.scalars(select(Product).order_by(Product.name, Product.id).limit(size))).all()
+    response = ProductListResponse(items=products, total=size, page=1, size=size, pages=1)
+    return response.model_dump_json().encode("utf-8")
+
+
+async def tuple_page(db, size: int, fields) -> bytes:
+    query = select(*product_columns(fields, extra=CURSOR_FIELDS)).order_by(Product.name, Product.id).limit(size)
+    rows = (await db.execute(query)).all()
+    return dumps({
+        "items": rows_to_items(rows, fields),
+        "total": size,
+        "total_is_exact": True,
+        "page": 1,
+        "size": size,
+        "pages": 1,
+        "next_cursor": None,
+        "prev_cursor": None
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Minimum catalog size to seed")
+    parser.add_argument("--size", type=int, default=100, help="Page size")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per variant")
+    parser.add_argument("--fields", default="id,sku,name,price,category,is_active", help="Subset for the fields= variant")
+    args = parser.parse_args()
+
+    seed_products(get_engine(), args.rows)
+    loop = asyncio.new_event_loop()
+    db = AsyncSessionLocal()
+
+    variants = [
+        ("orm + pydantic", lambda: orm_page(db, args.size)),
+        ("tuples + orjson", lambda: tuple_page(db, args.size, parse_fields(None))),
+        (f"tuples + orjson, fields={args.fields}", lambda: tuple_page(db, args.size, parse_fields(args.fields))),
+    ]
+
+    results = []
+    for label, build in variants:
+        body = loop.run_until_complete(build())
+        # Drop loaded objects so the ORM variant pays for identity-map work every time
+        timings = time_call(lambda: (loop.run_until_complete(build()), db.expunge_all()), repeat=args.repeat, warmup=3)
+        results.append({"variant": label, "bytes": len(body), **timings})
+
+    loop.run_until_complete(db.close())
+    loop.close()
+    print_table(results, ["variant", "bytes", "median_ms", "p95_ms", "min_ms"])
+
+
+if __name__ == "__main__":
+    main()
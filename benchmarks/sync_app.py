@@ -0,0 +1,44 @@
+"""
+Reference app with the pre-async (threadpool) versions of the read endpoints
+exercised by async_vs_sync_load.py. Not used by the application itself.
+"""
+import math
+from typing import List
+
+from fastapi import Depends, FastAPI, HTTPException, Query
+from sqlalchemy.orm import Session
+
+import common  # noqa: F401 - puts the project root on sys.path
+
+from app.database import get_db
+from app.models import ImportJob, Product
+from app.schemas import ImportJobResponse, ProductListResponse, ProductResponse
+
+
+app = FastAPI(title="Product Importer (sync reference)")
+
+
+@app.get("/api/v1/products/{product_id}", response_model=ProductResponse)
+def get_product(product_id: int, db: Session = Depends(get_db)):
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+@app.get("/api/v1/products/", response_model=ProductListResponse)
+def get_products(
+    page: int = Query(1, ge=1),
+    size: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Product)
+    total = query.count()
+    products = query.order_by(Product.name, Product.id).offset((page - 1) * size).limit(size).all()
+    pages = math.ceil(total / size) if total > 0 else 1
+    return ProductListResponse(items=products, total=total, page=page, size=size, pages=pages)
+
+
+@app.get("/api/v1/import/jobs", response_model=List[ImportJobResponse])
+def get_import_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return db.query(ImportJob).order_by(ImportJob.created_at.desc()).offset(skip).limit(limit).all()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark substring filters with and without the pg_trgm GIN indexes.
+
+Seeds a synthetic catalog, then times each listing filter and search
+suggestion query twice: once with the trigram indexes dropped inside a
+rolled-back transaction ("before") and once with them in place ("after").
+Run `alembic upgrade head` first so the indexes exist.
+
+    DATABASE_URL=postgresql://... python benchmarks/trigram_filters.py --rows 5000000
+"""
+import argparse
+
+from sqlalchemy import text
+
+from common import explain_analyze, get_engine, plan_node_types, print_table, seed_products, time_call
+
+
+TRIGRAM_INDEXES = {
+    "sku": "idx_products_sku_trgm",
+    "name": "idx_products_name_trgm",
+    "category": "idx_products_category_trgm",
+    "brand": "idx_products_brand_trgm",
+}
+
+# (label, column, SQL, pattern) mirroring app.filters and get_search_suggestions
+QUERIES = [
+    ("filter sku", "sku",
+     "SELECT * FROM products WHERE sku ILIKE :pattern ORDER BY name, id LIMIT 50", "%00123%"),
+    ("filter name", "name",
+     "SELECT * FROM products WHERE name ILIKE :pattern ORDER BY name, id LIMIT 50", "%blender 77%"),
+    ("filter category", "category",
+     "SELECT * FROM products WHERE category ILIKE :pattern ORDER BY name, id LIMIT 50", "%gory 17%"),
+    ("filter brand", "brand",
+     "SELECT * FROM products WHERE brand ILIKE :pattern ORDER BY name, id LIMIT 50", "%and 123%"),
+    ("suggest sku", "sku",
+     "SELECT sku FROM products WHERE sku ILIKE :pattern LIMIT 10", "%99999%"),
+    ("suggest name", "name",
+     "SELECT name FROM products WHERE name ILIKE :pattern LIMIT 10", "%kettle 4242%"),
+    ("suggest category", "category",
+     "SELECT DISTINCT category FROM products WHERE category ILIKE :pattern LIMIT 10", "%gory 3%"),
+    ("suggest brand", "brand",
+     "SELECT DISTINCT brand FROM products WHERE brand ILIKE :pattern LIMIT 10", "%and 24%"),
+]
+
+
+def run_query(engine, sql, pattern, drop_index=None, repeat=5):
+    """Time a query, optionally with one trigram index dropped for the duration."""
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            if drop_index:
+                # Transactional DDL: the index reappears on rollback
+                conn.execute(text(f"DROP INDEX IF EXISTS {drop_index}"))
+            timings = time_call(
+                lambda: conn.execute(text(sql), {"pattern": pattern}).fetchall(),
+                repeat=repeat
+            )
+            plan = explain_analyze(conn, sql, {"pattern": pattern})
+        finally:
+            trans.rollback()
+
+    return timings, plan_node_types(plan["Plan"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Minimum catalog size to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Trigram benchmarks require PostgreSQL")
+
+    total = seed_products(engine, args.rows)
+    print(f"Catalog size: {total:,} products\n")
+
+    results = []
+    for label, column, sql, pattern in QUERIES:
+        before, before_plan = run_query(engine, sql, pattern, TRIGRAM_INDEXES[column], args.repeat)
+        after, after_plan = run_query(engine, sql, pattern, None, args.repeat)
+        results.append({
+            "query": label,
+            "before_ms": before["median_ms"],
+            "after_ms": after["median_ms"],
+            "speedup": before["median_ms"] / after["median_ms"] if after["median_ms"] else None,
+            "uses_trgm": "Bitmap Index Scan" in after_plan,
+        })
+
+    print_table(results, ["query", "before_ms", "after_ms", "speedup", "uses_trgm"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark webhook delivery: a new HTTP client per delivery vs the pooled keep-alive client.
+
+Starts a local stub webhook receiver and POSTs a product event payload to it:
+
+- "fresh": a new client per delivery, so every request sets up its own
+  connection (the previous send_webhook_task path)
+- "pooled": one WebhookHttpClient for all deliveries, reusing kept-alive
+  connections (the current path)
+
+Reports throughput and the median split of each delivery into connection
+setup and server time. --tls serves HTTPS with a throwaway self-signed
+certificate, where setup costs the most; --delay-ms adds server think time.
+No database is needed.
+
+    python benchmarks/webhook_delivery.py --deliveries 2000 --tls
+"""
+import argparse
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import print_table
+
+from app.webhook_http import WebhookHttpClient
+
+
+PAYLOAD = {
+    "id": 12345,
+    "sku": "BENCH-000012345",
+    "name": "Smart Kettle 12345",
+    "timestamp": "2026-01-01T00:00:00"
+}
+
+
+def make_handler(delay_seconds: float):
+    class StubReceiver(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep connections open between requests
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if delay_seconds:
+                time.sleep(delay_seconds)
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubReceiver
+
+
+def write_self_signed_cert(directory: str) -> tuple:
+    """A certificate for 127.0.0.1 and its key, as PEM files."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+def start_server(delay_seconds: float, tls_dir: str = None) -> tuple:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(delay_seconds))
+    scheme = "http"
+    if tls_dir:
+        cert_path, key_path = write_self_signed_cert(tls_dir)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        # httpx trusts SSL_CERT_FILE, so clients verify the throwaway certificate
+        os.environ["SSL_CERT_FILE"] = cert_path
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/hook"
+
+
+def run_variant(name: str, url: str, deliveries: int, concurrency: int) -> dict:
+    pooled = WebhookHttpClient() if name == "pooled" else None
+
+    def deliver(_):
+        client = pooled or WebhookHttpClient()
+        try:
+            response, timing = client.post(url, timeout=10, json=PAYLOAD)
+            response.raise_for_status()
+            return timing
+        finally:
+            if pooled is None:
+                client.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(deliver, range(deliveries)))
+    elapsed = time.perf_counter() - start
+    if pooled is not None:
+        pooled.close()
+
+    return {
+        "variant": name,
+        "deliveries_per_s": deliveries / elapsed,
+        "median_total_ms": statistics.median(timing.total_ms for timing in timings),
+        "median_connect_ms": statistics.median(timing.connect_ms for timing in timings),
+        "median_server_ms": statistics.median(timing.server_ms or 0 for timing in timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deliveries", type=int, default=1000, help="Webhook POSTs per variant")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent deliveries (1 matches a solo worker)")
+    parser.add_argument("--delay-ms", type=float, default=0, help="Stub server think time per request")
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tls_dir:
+        server, url = start_server(args.delay_ms / 1000, tls_dir if args.tls else None)
+        print(f"Stub receiver at {url}\n")
+        try:
+            results = [run_variant(name, url, args.deliveries, args.concurrency) for name in ("fresh", "pooled")]
+        finally:
+            server.shutdown()
+
+    print_table(results, [
+        "variant", "deliveries_per_s", "median_total_ms", "median_connect_ms", "median_server_ms"
+    ])
+    print(json.dumps({"speedup": round(results[1]["deliveries_per_s"] / results[0]["deliveries_per_s"], 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ class ProductImporter {
         this.progressInterval = null;
         this.jobsRefreshInterval = null;
         this.webhooks = []; // Store webhooks for testing
+        this.validators = new Map(); // url -> { etag, data } for conditional GETs
         
         this.init();
     }
@@ -272,21 +273,46 @@ class ProductImporter {
         }
     }
     
+    async fetchWithValidators(url) {
+        // Send the stored ETag; on 304 Not Modified reuse the payload we already have
+        const cached = this.validators.get(url);
+        const response = await fetch(url, {
+            cache: 'no-store',
+            headers: cached ? { 'If-None-Match': cached.etag } : {}
+        });
+        
+        if (response.status === 304 && cached) {
+            return { data: cached.data, changed: false };
+        }
+        if (!response.ok) {
+            throw new Error(`Request failed with status ${response.status}`);
+        }
+        
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            this.validators.delete(url);
+            this.validators.set(url, { etag, data });
+            // Keep only the most recently used URLs
+            if (this.validators.size > 50) {
+                this.validators.delete(this.validators.keys().next().value);
+            }
+        }
+        return { data, changed: true };
+    }
+    
     async loadProducts() {
         const filters = this.getProductFilters();
         const queryParams = new URLSearchParams({
             page: this.currentPage,
             size: this.pageSize,
+            // Only the columns the table shows; editProduct loads the full record
+            fields: 'id,sku,name,price,category,is_active',
             ...filters
         });
         
         try {
-            const response = await fetch(`/api/v1/products?${queryParams}`);
-            if (!response.ok) {
-                throw new Error('Failed to load products');
-            }
-            
-            const data = await response.json();
+            const { data } = await this.fetchWithValidators(`/api/v1/products?${queryParams}`);
             this.renderProducts(data.items);
             this.renderPagination(data);
             
@@ -474,12 +500,7 @@ class ProductImporter {
     
     async editProduct(productId) {
         try {
-            const response = await fetch(`/api/v1/products/${productId}`);
-            if (!response.ok) {
-                throw new Error('Failed to load product');
-            }
-            
-            const product = await response.json();
+            const { data: product } = await this.fetchWithValidators(`/api/v1/products/${productId}`);
             this.showProductModal(product);
             
         } catch (error) {
@@ -579,6 +600,12 @@ class ProductImporter {
                     <span class="badge bg-${webhook.is_active ? 'success' : 'secondary'}">
                         ${webhook.is_active ? 'Active' : 'Inactive'}
                     </span>
+                    ${webhook.circuit_state && webhook.circuit_state !== 'closed' ?
+                        `<br><span class="badge bg-warning text-dark" title="${webhook.skipped_deliveries} deliveries deferred">
+                            Circuit ${webhook.circuit_state === 'half_open' ? 'half-open' : 'open'}
+                        </span>` :
+                        ''
+                    }
                 </td>
                 <td>
                     ${webhook.last_response_code ? 
@@ -866,14 +893,12 @@ class ProductImporter {
     
     async loadImportJobs() {
         try {
-            const response = await fetch('/api/v1/import/jobs');
-            if (!response.ok) {
-                throw new Error('Failed to load import jobs');
+            // Auto-refresh polls this every few seconds; unchanged lists come back as 304
+            const { data: jobs, changed } = await this.fetchWithValidators('/api/v1/import/jobs');
+            if (changed) {
+                this.renderImportJobs(jobs);
             }
             
-            const jobs = await response.json();
-            this.renderImportJobs(jobs);
-            
         } catch (error) {
             console.error('Load import jobs error:', error);
             this.showToast('Failed to load import jobs', 'error');